@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Courses', '0013_remove_studentcourseprogress_total_lessons'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['course', 'user'], name='enrollment_course_user_idx'),
+        ),
+    ]
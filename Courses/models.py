@@ -58,6 +58,11 @@ class Enrollment(models.Model):
     progress = models.DecimalField(max_digits=5, decimal_places=2, default=0.00) 
     enrolled_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'user'], name='enrollment_course_user_idx'),
+        ]
+
     def __str__(self):
         """
         String representation of the enrollment.
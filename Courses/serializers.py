@@ -6,8 +6,11 @@ import cloudinary.api
 import io
 from teacher.models import Instructor
 from django.shortcuts import get_object_or_404
+from django.http import Http404
+from teacher.instructors import require_instructor
 from .models import Enrollment, Course, CourseReport, StudentCourseProgress
 from accounts.models import CustomUser as User
+from accounts.avatars import avatar_url
 from Lessons.models import Lesson
 
 
@@ -52,8 +55,10 @@ class CourseSerializer(serializers.ModelSerializer):
         Custom creation method for a course, including file uploads for thumbnail and preview video.
         """
         request = self.context["request"]
-        user = request.user
-        instructor = get_object_or_404(Instructor, user=user.id)
+        try:
+            instructor = require_instructor(request)
+        except Instructor.DoesNotExist:
+            raise Http404("Instructor not found")
         validated_data["instructor"] = instructor  # Assign instructor
         thumbnail = request.FILES.get("thumbnail")
         preview_video = request.FILES.get("prev_vdo")
@@ -178,9 +183,7 @@ class ReportUserSerializer(serializers.ModelSerializer):
         """
         Retrieve the avatar URL of the user or a placeholder image if none exists.
         """
-        if obj.profile_picture:
-            return obj.profile_picture.url
-        return "https://via.placeholder.com/60"
+        return avatar_url(obj) or "https://via.placeholder.com/60"
 
 
 class ReportCourseSerializer(serializers.ModelSerializer):
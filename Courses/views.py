@@ -5,6 +5,7 @@ from .models import Course, CourseReport
 from .serializers import *
 from .models import Enrollment, CourseReport, StudentCourseProgress
 from teacher.models import Instructor
+from teacher.instructors import require_instructor
 from .serializers import CourseSerializer, CourseReportViewSerializer
 from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.permissions import IsAdminUser
@@ -24,7 +25,7 @@ class CourseListView(generics.ListCreateAPIView):
         """
         Override the default queryset to filter courses based on the instructor.
         """
-        instructor = Instructor.objects.get(user=self.request.user)
+        instructor = self.request.instructor
         if instructor:
             return Course.objects.filter(instructor=instructor) 
         return Course.objects.none()
@@ -119,8 +120,7 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
         """
         Retrieve course details for the instructor.
         """
-        user = request.user 
-        instructor = Instructor.objects.get(user=user)
+        instructor = require_instructor(request)
         courses = Course.objects.filter(instructor=instructor) 
         serializer = self.get_serializer(courses, many=True) 
         return Response(
@@ -9,6 +9,7 @@ from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.db.models import Prefetch
 from .models import CourseComment
+from accounts.avatars import avatar_url
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -78,7 +79,7 @@ class CommentConsumer(AsyncWebsocketConsumer):
                 'id': str(chat_message.id),
                 'message': message,
                 'username': self.user.username,
-                'avatar': self.user.profile_picture.url if hasattr(self.user, 'profile_picture') and self.user.profile_picture else '',
+                'avatar': (avatar_url(self.user) or '') if hasattr(self.user, 'profile_picture') else '',
                 'mentions': mentions,
                 'replyTo': reply_to,
                 'replyToUsername': reply_to_username,
@@ -179,7 +180,7 @@ class CommentConsumer(AsyncWebsocketConsumer):
                 'id': str(message.id),
                 'message': message.message,
                 'username': message.user.username,
-                'avatar': message.user.profile_picture.url if hasattr(message.user, 'profile_picture') and message.user.profile_picture else '',
+                'avatar': (avatar_url(message.user) or '') if hasattr(message.user, 'profile_picture') else '',
                 'mentions': message.mentions,
                 'replyTo': reply_to_id,
                 'replyToUsername': reply_to_username,
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Lesson, LessonProgress, CourseComment
 from Courses.models import Course
+from accounts.avatars import avatar_url
 import cloudinary.uploader
 
 
@@ -125,8 +126,7 @@ class CourseCommentSerializer(serializers.ModelSerializer):
         return {
             'id': obj.user.id,
             'username': obj.user.username,
-            'profile_picture': obj.user.profile_picture.url
-            if obj.user.profile_picture else None
+            'profile_picture': avatar_url(obj.user)
         }
 
     def get_reply_to(self, obj):
@@ -1,56 +1,125 @@
 import json
+import logging
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.db import database_sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from . import roster
+
+logger = logging.getLogger(__name__)
+
+# Signaling actions addressed to a single peer rather than the whole meeting.
+TARGETED_ACTIONS = ('new-offer', 'new-answer')
+
 
 class MeetingConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
-        self.room_group_name="test-room"
+        self.meeting_id = self.scope['url_route']['kwargs']['meeting_id']
+        self.user_id = await self.get_user_id()
+
+        try:
+            peers = await roster.join(self.meeting_id, self.channel_name, self.user_id)
+        except roster.RosterBusy:
+            logger.warning("Roster of meeting %s is busy; refusing join", self.meeting_id)
+            await self.close(code=4013)
+            return
+
+        # Set only once joined: disconnect() uses it to know there is
+        # something to clean up.
+        self.room_group_name = roster.group_name(self.meeting_id)
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
         await self.accept()
-        
-    async def disconnect(self,close_code):
+        await self.send(text_data=json.dumps({
+            'action': 'roster',
+            'message': {
+                'receiver_channel_name': self.channel_name,
+                'peers': [
+                    {'channel_name': channel_name, 'user_id': user_id}
+                    for channel_name, user_id in peers.items()
+                ],
+            },
+        }))
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, 'room_group_name'):
+            return
+        try:
+            await roster.leave(self.meeting_id, self.channel_name)
+        except roster.RosterBusy:
+            # The stale entry expires with the roster; sends to it are dropped.
+            logger.warning("Roster of meeting %s is busy; %s left unlisted", self.meeting_id, self.channel_name)
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
-        
-        print("disconnected")
-        
-    async def receive(self,text_data):
-        receive_dict=json.loads(text_data)
-        message=receive_dict["message"]
-        action=receive_dict['action']
-        
-        if(action == 'new-offer') or (action == 'new-answer'):
-            receiver_channel_name=receive_dict['message']['receiver_channel_name']
-            
-            receive_dict['message']['receiver_channel_name']=self.channel_name
-            
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': "send.sdp",
+                'receive_dict': {
+                    'action': 'peer-left',
+                    'message': {
+                        'receiver_channel_name': self.channel_name,
+                        'user_id': self.user_id,
+                    },
+                },
+            }
+        )
+
+    async def receive(self, text_data):
+        try:
+            receive_dict = json.loads(text_data)
+            action = receive_dict['action']
+            message = receive_dict['message']
+        except (json.JSONDecodeError, KeyError, TypeError):
+            logger.warning("Malformed signaling message in meeting %s", self.meeting_id)
+            return
+        if not isinstance(message, dict):
+            return
+
+        if action in TARGETED_ACTIONS:
+            receiver_channel_name = message.get('receiver_channel_name')
+            # Only peers of this meeting can be addressed.
+            if receiver_channel_name not in await roster.members(self.meeting_id):
+                return
+
+            message['receiver_channel_name'] = self.channel_name
             await self.channel_layer.send(
                 receiver_channel_name,
                 {
-                    'type':"send.sdp",
-                    'receive_dict':receive_dict,
+                    'type': "send.sdp",
+                    'receive_dict': receive_dict,
                 }
-            
             )
             return
-                
-        receive_dict["message"]['receiver_channel_name']=self.channel_name
-        
+
+        message['receiver_channel_name'] = self.channel_name
         await self.channel_layer.group_send(
             self.room_group_name,
             {
-                'type':"send.sdp",
-                'receive_dict':receive_dict,
+                'type': "send.sdp",
+                'receive_dict': receive_dict,
             }
         )
-        
-    async def send_sdp(self,event): 
-        receive_dict=event["receive_dict"]
+
+    async def send_sdp(self, event):
+        receive_dict = event["receive_dict"]
         await self.send(text_data=json.dumps(receive_dict))
 
-        
-              
\ No newline at end of file
+    @database_sync_to_async
+    def get_user_id(self):
+        """User id from the ``token`` query param or session, else None."""
+        params = parse_qs(self.scope['query_string'].decode())
+        token_key = params.get('token', [None])[0]
+        if token_key:
+            try:
+                return AccessToken(token_key)['user_id']
+            except (InvalidToken, TokenError):
+                logger.warning("Invalid token on meeting %s", self.meeting_id)
+        user = self.scope.get('user')
+        return user.id if user is not None and user.is_authenticated else None
@@ -0,0 +1,75 @@
+"""
+Participants of each meeting, shared across ASGI workers through the cache.
+
+A roster maps each connected channel name to its user id (None for
+anonymous peers). Consumers use it to address signaling messages to one
+peer with ``channel_layer.send`` and to refuse channel names that belong
+to another meeting. Updates are read-modify-write under a short cache lock;
+entries of workers that died without disconnecting expire with the roster.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 3.0
+LOCK_POLL = 0.01
+
+
+def group_name(meeting_id):
+    return f"meeting_{meeting_id}"
+
+
+def _key(meeting_id):
+    return f"meeting:roster:{meeting_id}"
+
+
+class RosterBusy(Exception):
+    """Raised when the roster lock could not be taken within LOCK_WAIT."""
+
+
+async def _update(meeting_id, change):
+    key = _key(meeting_id)
+    deadline = time.monotonic() + LOCK_WAIT
+    while not await cache.aadd(key + ":lock", True, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            # Writing without the lock could drop another peer's entry.
+            raise RosterBusy(meeting_id)
+        await asyncio.sleep(LOCK_POLL)
+    try:
+        roster = await cache.aget(key) or {}
+        change(roster)
+        if roster:
+            await cache.aset(key, roster, settings.MEETING_ROSTER_TTL)
+        else:
+            await cache.adelete(key)
+        return roster
+    finally:
+        await cache.adelete(key + ":lock")
+
+
+async def join(meeting_id, channel_name, user_id):
+    """
+    Add a channel to the roster and return the roster before it joined.
+    Raises RosterBusy if the roster stays locked.
+    """
+    before = {}
+
+    def add(roster):
+        before.update(roster)
+        roster[channel_name] = user_id
+
+    await _update(meeting_id, add)
+    return before
+
+
+async def leave(meeting_id, channel_name):
+    """Remove a channel from the roster. Raises RosterBusy if it stays locked."""
+    await _update(meeting_id, lambda roster: roster.pop(channel_name, None))
+
+
+async def members(meeting_id):
+    """Return the roster as ``{channel_name: user_id}``."""
+    return await cache.aget(_key(meeting_id)) or {}
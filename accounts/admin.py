@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CustomUser
+from .models import CustomUser, OutboundEmail
 from .forms import CustomUserCreationForm,CustomUserChangeForm
 from django.contrib.auth.admin import UserAdmin
 
@@ -10,3 +10,9 @@ class CustomAdminUser(UserAdmin):
     form=CustomUserChangeForm
 
     model=CustomUser
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
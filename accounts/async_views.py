@@ -0,0 +1,158 @@
+"""
+Async versions of the password-hashing auth endpoints.
+
+They behave like their DRF counterparts in ``views.py``, but password
+hashing runs on the bounded ``hashing_pool`` rather than on the request.
+When that pool is saturated they answer 503 with Retry-After at once,
+leaving worker capacity for the rest of the API.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.tokens import default_token_generator
+from django.http import JsonResponse
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import CachedJWTAuthentication
+from .hashing import HashingBusy, acheck_user_password, amake_password
+from .models import CustomUser
+from .serializers import CustomUserSerializer, UserRegistrationSerializer
+from .throttling import LoginRateThrottle, check_rate
+
+
+def _payload(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+    return request.POST
+
+
+def _busy():
+    response = JsonResponse({"error": "Server is busy, please retry shortly."}, status=503)
+    response["Retry-After"] = "1"
+    return response
+
+
+def _login_response(user):
+    refresh = RefreshToken.for_user(user)
+    access_token = refresh.access_token
+    access_token["is_staff"] = user.is_staff
+    access_token["is_superuser"] = user.is_superuser
+
+    data = dict(CustomUserSerializer(user).data)
+    data["tokens"] = {
+        "refresh": str(refresh),
+        "access": str(access_token),
+    }
+    return data
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    data = _payload(request)
+    email, password = data.get("email"), data.get("password")
+    retry_after = check_rate("login", LoginRateThrottle().get_ident(request), email)
+    if retry_after is not None:
+        response = JsonResponse({"detail": "Request was throttled."}, status=429)
+        response["Retry-After"] = str(retry_after)
+        return response
+    if not email or not password:
+        return JsonResponse({"non_field_errors": ["incorrect Credential"]}, status=400)
+
+    try:
+        user = await CustomUser.objects.filter(email=email).afirst()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            await amake_password(password)
+            valid = False
+        else:
+            valid = await acheck_user_password(user, password)
+    except HashingBusy:
+        return _busy()
+
+    if not valid or not user.is_active:
+        return JsonResponse({"non_field_errors": ["incorrect Credential"]}, status=400)
+
+    return JsonResponse(await sync_to_async(_login_response)(user))
+
+
+@csrf_exempt
+@require_POST
+async def register(request):
+    serializer = UserRegistrationSerializer(data=_payload(request))
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        password_hash = await amake_password(serializer.validated_data["password1"])
+    except HashingBusy:
+        return _busy()
+
+    user = await sync_to_async(serializer.save)(password_hash=password_hash)
+    return JsonResponse(
+        {
+            "message": "OTP sent to your email. Please verify to activate your account.",
+            "user": await sync_to_async(lambda: dict(UserRegistrationSerializer(user).data))(),
+        },
+        status=201,
+    )
+
+
+@csrf_exempt
+@require_POST
+async def reset_password(request, uidb64, token):
+    try:
+        uid = force_str(urlsafe_base64_decode(uidb64))
+        user = await CustomUser.objects.aget(pk=uid)
+    except (CustomUser.DoesNotExist, ValueError, TypeError):
+        return JsonResponse({"error": "Invalid request."}, status=400)
+
+    if not default_token_generator.check_token(user, token):
+        return JsonResponse({"error": "Invalid or expired token."}, status=400)
+
+    new_password = _payload(request).get("password") or ""
+    if len(new_password) < 8:
+        return JsonResponse({"error": "Password must be at least 8 characters long."}, status=400)
+
+    try:
+        user.password = await amake_password(new_password)
+    except HashingBusy:
+        return _busy()
+    await user.asave(update_fields=["password"])
+    return JsonResponse({"message": "Password reset successful."})
+
+
+@csrf_exempt
+@require_POST
+async def change_password(request):
+    try:
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except APIException as e:
+        return JsonResponse({"detail": str(e.detail)}, status=e.status_code)
+    if result is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    user, _ = result
+
+    data = _payload(request)
+    current_password = data.get("current_password") or ""
+    new_password = data.get("new_password") or ""
+
+    try:
+        if not await acheck_user_password(user, current_password):
+            return JsonResponse({"error": "Current password is incorrect."}, status=400)
+        if len(new_password) < 8:
+            return JsonResponse({"error": "New password must be at least 8 characters long."}, status=400)
+        user.password = await amake_password(new_password)
+    except HashingBusy:
+        return _busy()
+
+    await user.asave(update_fields=["password"])
+    return JsonResponse({"message": "Password changed successfully."})
@@ -0,0 +1,66 @@
+"""
+JWT authentication with a cached user lookup.
+
+``CachedJWTAuthentication`` behaves like simplejwt's ``JWTAuthentication``
+but keeps the authenticated user in the shared cache for
+``AUTH_USER_CACHE_TTL`` seconds. Entries are keyed by a per-user version
+that ``bump_user_version`` increments whenever the user is saved. A
+password change, deactivation or profile edit therefore takes effect on
+the next request, and a lookup that raced with the save can only write
+to the old, now unused key.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _version_key(user_id):
+    return f"auth:user-version:{user_id}"
+
+
+def _user_key(user_id, version):
+    return f"auth:user:{user_id}:{version}"
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached copy of the user."""
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), 1, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves users from a version-stamped cache."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            # Let simplejwt raise its usual InvalidToken error.
+            return super().get_user(validated_token)
+
+        key = _user_key(user_id, cache.get(_version_key(user_id), 0))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+            return user
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        self._check_revoked(user, validated_token)
+        return user
+
+    def _check_revoked(self, user, validated_token):
+        # Mirrors simplejwt's password-change revocation check, when enabled.
+        if not getattr(api_settings, "CHECK_REVOKE_TOKEN", False):
+            return
+        from rest_framework_simplejwt.utils import get_md5_hash_password
+
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
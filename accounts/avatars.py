@@ -0,0 +1,128 @@
+"""
+Resized avatar variants for profile pictures.
+
+When a picture is uploaded, ``schedule_variants`` renders square WebP and
+JPEG thumbnails next to the original in a background process pool, then
+records the picture's name in ``CustomUser.avatar_variants``. Serializers
+call ``avatar_url``, which compares the two names instead of touching
+storage: it returns the small variant once rendered and the original until
+then.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from .authentication import bump_user_version
+from .models import CustomUser
+from .storage import avatar_storage
+
+logger = logging.getLogger(__name__)
+
+
+AVATAR_SIZES = {
+    "small": 64,
+    "medium": 256,
+}
+AVATAR_FORMATS = {
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+}
+QUALITY = 82
+
+_pool = None
+
+
+def variant_name(name, size, fmt):
+    """Storage name of the ``size``-pixel ``fmt`` variant of ``name``."""
+    return f"{os.path.splitext(name)[0]}_{size}.{fmt}"
+
+
+def render_variants(source_path, targets):
+    """
+    Render variants of the image at ``source_path``. Runs in a worker process.
+
+    Args:
+        source_path: Absolute path of the original image
+        targets: List of ``(absolute path, size, pillow format)`` tuples
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for path, size, pillow_format in targets:
+            if os.path.exists(path):
+                continue
+            thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            thumbnail.save(tmp_path, pillow_format, quality=QUALITY)
+            os.replace(tmp_path, path)
+
+
+def _targets(name):
+    return [
+        (avatar_storage.path(variant_name(name, size, fmt)), size, pillow_format)
+        for size in AVATAR_SIZES.values()
+        for fmt, pillow_format in AVATAR_FORMATS.items()
+    ]
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # Spawn rather than fork: the server already runs threads (snapshot
+        # refreshers, the hashing pool) whose held locks a fork would copy.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.AVATAR_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def mark_variants_ready(user_id, name):
+    """Record that the variants of ``name`` exist, if it is still the user's picture."""
+    updated = CustomUser.objects.filter(id=user_id, profile_picture=name).update(avatar_variants=name)
+    if updated:
+        bump_user_version(user_id)
+
+
+def _variants_rendered(future, user_id, name):
+    # Runs on the pool's management thread, which keeps no connection open.
+    try:
+        if future.exception() is not None:
+            logger.error("Rendering avatar variants of %s failed", name, exc_info=future.exception())
+            return
+        mark_variants_ready(user_id, name)
+    finally:
+        connection.close()
+
+
+def schedule_variants(user_id, name):
+    """Render the variants of the user's picture ``name`` in the background."""
+    if name:
+        future = _get_pool().submit(render_variants, avatar_storage.path(name), _targets(name))
+        future.add_done_callback(lambda done: _variants_rendered(done, user_id, name))
+
+
+def generate_variants(user_id, name):
+    """Render the variants of the user's picture ``name`` in this process."""
+    render_variants(avatar_storage.path(name), _targets(name))
+    mark_variants_ready(user_id, name)
+
+
+def avatar_url(user, size="small", request=None):
+    """
+    URL of the user's avatar at ``size``, or None without a picture.
+    Falls back to the original until the variants have been rendered.
+    """
+    if not user.profile_picture:
+        return None
+    name = user.profile_picture.name
+    if user.avatar_variants == name:
+        url = avatar_storage.url(variant_name(name, AVATAR_SIZES[size], settings.AVATAR_FORMAT))
+    else:
+        url = user.profile_picture.url
+    return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,191 @@
+"""
+Bloom-filter fast path for the refresh-token blacklist.
+
+Every process keeps a Bloom filter of blacklisted JTIs whose tokens have
+not expired. A JTI the filter has never seen is certainly not blacklisted,
+so most refreshes skip the blacklist table. A filter hit (a real entry or
+a rare false positive) falls back to the normal database check.
+
+The filter catches up with blacklists made by other processes by reading
+``BlacklistedToken`` rows added since its previous scan, plus a trailing
+``SAFETY_LAG`` window for rows that committed out of id order. It does this
+whenever the shared ``jwt:blacklist-generation`` counter moves, and at
+least every ``JWT_BLOOM_SYNC_INTERVAL`` seconds in case the cache is not
+shared between processes. The filter is rebuilt from scratch every
+``JWT_BLOOM_REBUILD_INTERVAL`` seconds to drop expired tokens, or sooner if
+it outgrows its capacity.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+GENERATION_KEY = "jwt:blacklist-generation"
+FALSE_POSITIVE_RATE = 0.01
+# Blacklist transactions are assumed to commit within this long, so a
+# catch-up re-reads rows this much older than the previous scan.
+SAFETY_LAG = timedelta(seconds=10)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.sha256(value.encode()).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:16], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BlacklistFilter:
+    """Process-wide Bloom filter kept in sync with ``BlacklistedToken``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._syncing = False
+        self._filter = None
+        self._generation = None
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        # Wall-clock start of the last rebuild or catch-up.
+        self._scanned_from = None
+
+    def _rebuild(self):
+        started = now()
+        rows = (
+            BlacklistedToken.objects.filter(token__expires_at__gt=started)
+            .values_list("token__jti", flat=True)
+        )
+        jtis = list(rows)
+        bloom = BloomFilter(max(settings.JWT_BLOOM_CAPACITY, len(jtis) * 2))
+        for jti in jtis:
+            bloom.add(jti)
+        return bloom, started
+
+    def _catch_up(self, since):
+        """
+        Return JTIs blacklisted since the previous scan, re-reading rows
+        from ``SAFETY_LAG`` before it: ids are allocated in insert order but
+        commit in any order, so a lower id can appear after a higher one
+        was already seen.
+        """
+        started = now()
+        floor = (
+            BlacklistedToken.objects.filter(blacklisted_at__lt=since - SAFETY_LAG)
+            .order_by("-id")
+            .values_list("id", flat=True)
+            .first()
+        ) or 0
+        jtis = list(
+            BlacklistedToken.objects.filter(id__gt=floor).values_list("token__jti", flat=True)
+        )
+        return jtis, started
+
+    def _sync(self):
+        """
+        Bring the filter up to date. Only one thread queries the database at
+        a time and it does so outside the lock; other threads keep using the
+        current filter meanwhile, unless there is none yet.
+        """
+        while True:
+            with self._lock:
+                generation = cache.get(GENERATION_KEY, 0)
+                stale = time.monotonic() - self._built_at > settings.JWT_BLOOM_REBUILD_INTERVAL
+                behind = (
+                    generation != self._generation
+                    or time.monotonic() - self._synced_at > settings.JWT_BLOOM_SYNC_INTERVAL
+                )
+                if self._filter is not None and not stale and not behind:
+                    return
+                if not self._syncing:
+                    self._syncing = True
+                    rebuild = self._filter is None or stale
+                    since = self._scanned_from
+                    break
+                if self._filter is not None:
+                    return
+            time.sleep(0.005)
+
+        try:
+            if rebuild:
+                bloom, started = self._rebuild()
+                # Rows that commit late are picked up by the next catch-up.
+                jtis = []
+            else:
+                bloom, (jtis, started) = None, self._catch_up(since)
+            with self._lock:
+                if bloom is not None:
+                    self._filter = bloom
+                    self._built_at = time.monotonic()
+                for jti in jtis:
+                    if jti not in self._filter:
+                        self._filter.add(jti)
+                if self._filter.count > self._filter.capacity:
+                    # Forces a rebuild on the next check.
+                    self._built_at = 0.0
+                self._generation = generation
+                self._synced_at = time.monotonic()
+                self._scanned_from = started
+        finally:
+            with self._lock:
+                self._syncing = False
+
+    def might_contain(self, jti):
+        self._sync()
+        return jti in self._filter
+
+    def add(self, jti):
+        """Record a JTI blacklisted by this process and tell the others."""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        try:
+            generation = cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, None)
+            generation = 1
+        with self._lock:
+            # Our own bump needs no catch-up, but only if nobody else bumped
+            # the counter since this process last synced.
+            if self._generation is not None and generation == self._generation + 1:
+                self._generation = generation
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class BloomRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check consults the Bloom filter first."""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -0,0 +1,107 @@
+"""
+Bounded worker pool for password hashing.
+
+PBKDF2 takes hundreds of milliseconds of CPU per call. Running it on the
+request thread or the event loop lets a login flood starve unrelated
+endpoints. The async auth views hand hashing to ``hashing_pool`` instead.
+It runs at most ``PASSWORD_HASHING_WORKERS`` hashes at once, queues at most
+``PASSWORD_HASHING_QUEUE`` more, and rejects anything beyond that with
+``HashingBusy`` so callers can answer 503 straight away.
+
+Threads are enough: ``hashlib.pbkdf2_hmac`` releases the GIL while it
+works.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class HashingPool:
+    """Thread pool with a hard cap on queued work and simple metrics."""
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def submit(self, func, *args):
+        """Schedule ``func(*args)`` and return a Future. Raises HashingBusy."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingBusy("Password hashing queue is full")
+
+        queued_at = time.monotonic()
+        with self._lock:
+            self._submitted += 1
+            self._pending += 1
+
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+                self._wait_seconds += started - queued_at
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_seconds += time.monotonic() - started
+                self._slots.release()
+
+        try:
+            return self._executor.submit(task)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+            raise
+
+    async def run(self, func, *args):
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self):
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds / completed * 1000, 2),
+                "avg_run_ms": round(self._run_seconds / completed * 1000, 2),
+            }
+
+
+hashing_pool = HashingPool(settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE)
+
+
+async def acheck_user_password(user, raw_password):
+    """Check ``raw_password`` against the user's stored hash off the event loop."""
+    return await hashing_pool.run(check_password, raw_password, user.password)
+
+
+async def amake_password(raw_password):
+    return await hashing_pool.run(make_password, raw_password)
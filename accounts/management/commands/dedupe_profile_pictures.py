@@ -0,0 +1,79 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from accounts.authentication import bump_user_version
+from accounts.avatars import generate_variants
+from accounts.models import CustomUser
+from accounts.storage import avatar_storage
+
+
+UPLOAD_DIR = CustomUser._meta.get_field("profile_picture").upload_to.rstrip("/")
+
+
+class Command(BaseCommand):
+    help = (
+        "Move profile pictures to content-addressed names so identical "
+        "uploads share one file, render missing avatar variants, and "
+        "optionally delete legacy files nobody references any more."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument(
+            "--delete-orphans",
+            action="store_true",
+            help="Delete legacy profile_pictures/ files no user points at.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        moved = missing = 0
+        users = (
+            CustomUser.objects.exclude(profile_picture="")
+            .exclude(profile_picture__isnull=True)
+            .only("id", "profile_picture")
+            .order_by("id")
+        )
+        for user in users.iterator(chunk_size=options["batch_size"]):
+            old_name = user.profile_picture.name
+            if not avatar_storage.exists(old_name):
+                missing += 1
+                continue
+
+            with avatar_storage.open(old_name) as content:
+                new_name = avatar_storage.content_name(
+                    os.path.join(UPLOAD_DIR, os.path.basename(old_name)), content
+                )
+                if new_name != old_name and not dry_run:
+                    new_name = avatar_storage.save(new_name, content)
+
+            if new_name != old_name:
+                moved += 1
+                if not dry_run:
+                    CustomUser.objects.filter(id=user.id).update(profile_picture=new_name)
+                    bump_user_version(user.id)
+            if not dry_run:
+                generate_variants(user.id, new_name)
+
+        self.stdout.write(f"{moved} pictures renamed, {missing} missing files skipped")
+
+        if options["delete_orphans"]:
+            self._delete_orphans(dry_run)
+
+        self.stdout.write(self.style.SUCCESS("Done." if not dry_run else "Dry run, nothing changed."))
+
+    def _delete_orphans(self, dry_run):
+        referenced = set(
+            CustomUser.objects.exclude(profile_picture="").values_list("profile_picture", flat=True)
+        )
+        _, files = avatar_storage.listdir(UPLOAD_DIR)
+        orphans = [
+            os.path.join(UPLOAD_DIR, filename) for filename in files
+            if os.path.join(UPLOAD_DIR, filename) not in referenced
+        ]
+        for name in orphans:
+            if not dry_run:
+                avatar_storage.delete(name)
+        self.stdout.write(f"{len(orphans)} orphaned legacy files {'found' if dry_run else 'deleted'}")
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens, and their blacklist "
+        "entries, in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches to limit load on the database.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = now()
+        total = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    OutstandingToken.objects.filter(expires_at__lt=cutoff)
+                    .order_by("id")
+                    .values_list("id", flat=True)[:options["batch_size"]]
+                )
+                if not ids:
+                    break
+                # Deleting an outstanding token cascades to its blacklist entry.
+                OutstandingToken.objects.filter(id__in=ids).delete()
+            total += len(ids)
+            self.stdout.write(f"Deleted {total} expired tokens so far")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {total} expired tokens."))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local SMTP server that accepts and discards every message. "
+        "Point EMAIL_HOST/EMAIL_PORT at it (with EMAIL_USE_TLS=False) to "
+        "exercise or benchmark send_outbox_emails. Requires aiosmtpd."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=1025)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds to wait before accepting each message.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError("aiosmtpd is not installed (pip install aiosmtpd).")
+
+        import asyncio
+
+        stats = {"received": 0}
+        latency = options["latency"]
+
+        class SinkHandler:
+            async def handle_DATA(self, server, session, envelope):
+                if latency:
+                    await asyncio.sleep(latency)
+                stats["received"] += 1
+                return "250 Message accepted for delivery"
+
+        controller = Controller(SinkHandler(), hostname=options["host"], port=options["port"])
+        controller.start()
+        self.stdout.write(f"SMTP sink listening on {options['host']}:{options['port']}")
+        try:
+            last = 0
+            while True:
+                time.sleep(1)
+                received = stats["received"]
+                if received != last:
+                    self.stdout.write(f"{received} messages received (+{received - last}/s)")
+                    last = received
+        except KeyboardInterrupt:
+            pass
+        finally:
+            controller.stop()
+        self.stdout.write(self.style.SUCCESS(f"Stopped after {stats['received']} messages."))
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import open_connection, send_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails over a single persistent SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the outbox instead of exiting once nothing is due.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep between polls of an empty outbox when looping.",
+        )
+
+    def handle(self, *args, **options):
+        connection = open_connection()
+        total_sent = total_failed = 0
+        started = time.monotonic()
+        try:
+            while True:
+                sent, failed = send_batch(connection, options["batch_size"])
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed} ({total_sent} sent total)")
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        finally:
+            connection.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox drained: {total_sent} sent, {total_failed} failed in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-19 13:50
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.get_avatar_storage, upload_to='profile_pictures/'),
+        ),
+    ]
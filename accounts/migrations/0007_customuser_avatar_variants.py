@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_alter_customuser_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='avatar_variants',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
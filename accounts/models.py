@@ -4,6 +4,8 @@ from django.utils.timezone import now, timedelta
 import random
 import string
 
+from .storage import get_avatar_storage
+
 
 class CustomUser(AbstractUser):
     """
@@ -13,9 +15,13 @@ class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     profile_picture = models.ImageField(
         upload_to='profile_pictures/',
+        storage=get_avatar_storage,
         null=True,
         blank=True
     )
+    # Name of the profile picture whose resized variants are rendered;
+    # avatar_url serves the variants only while it matches profile_picture.
+    avatar_variants = models.CharField(max_length=255, blank=True, default="")
     otp = models.CharField(max_length=6, blank=True, null=True)
     otp_expiration = models.DateTimeField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
@@ -34,4 +40,34 @@ class CustomUser(AbstractUser):
         """
         self.otp = ''.join(random.choices(string.digits, k=6))
         self.otp_expiration = now() + timedelta(minutes=5)
-        self.save()
\ No newline at end of file
+        self.save()
+
+class OutboundEmail(models.Model):
+    """
+    Transactional email outbox. Requests only insert a row; the
+    ``send_outbox_emails`` command delivers it.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
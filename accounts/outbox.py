@@ -0,0 +1,112 @@
+"""
+Transactional email outbox.
+
+``enqueue_email`` inserts an ``OutboundEmail`` row in the caller's
+transaction, and the request never waits on SMTP. Callers wrap the change
+that triggers an email and the ``enqueue_email`` call in one
+``transaction.atomic()`` block (there are no ATOMIC_REQUESTS), so the
+email exists if and only if the change committed. ``send_batch`` claims
+due rows with a short lease and delivers them over one SMTP connection.
+Failures are retried with exponential backoff until ``OUTBOX_MAX_ATTEMPTS``.
+"""
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import OutboundEmail
+
+
+# A claimed row is invisible to other senders for this long.
+LEASE = timedelta(minutes=5)
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """Queue an email for background delivery and return the outbox row."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def _claim(batch_size):
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now())
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=ids).update(next_attempt_at=now() + LEASE)
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by("id"))
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def send_batch(connection, batch_size=100):
+    """
+    Deliver up to ``batch_size`` due emails over ``connection``, an already
+    opened mail backend. Returns ``(sent, failed)`` counts.
+    """
+    emails = _claim(batch_size)
+    sent_ids, done, failed = [], set(), 0
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, email.from_email, email.to, connection=connection)
+            try:
+                connection.send_messages([message])
+            except SMTPServerDisconnected:
+                # Reconnect once; the persistent connection may have timed out.
+                # If the server cannot be reached the error propagates.
+                connection.close()
+                connection.open()
+                try:
+                    connection.send_messages([message])
+                except Exception as e:
+                    _record_failure(email, e)
+                    done.add(email.id)
+                    failed += 1
+                    continue
+            except Exception as e:
+                _record_failure(email, e)
+                done.add(email.id)
+                failed += 1
+                continue
+            sent_ids.append(email.id)
+            done.add(email.id)
+    finally:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(status="sent", sent_at=now(), last_error="")
+        # Hand back what this call claimed but never got to, instead of
+        # leaving it leased. No attempt is counted: the mail server failed.
+        unsent = [email.id for email in emails if email.id not in done]
+        if unsent:
+            OutboundEmail.objects.filter(id__in=unsent).update(
+                next_attempt_at=now() + timedelta(seconds=BACKOFF_BASE)
+            )
+    return len(sent_ids), failed
+
+
+def _record_failure(email, error):
+    attempts = email.attempts + 1
+    OutboundEmail.objects.filter(id=email.id).update(
+        attempts=attempts,
+        status="failed" if attempts >= settings.OUTBOX_MAX_ATTEMPTS else "pending",
+        next_attempt_at=now() + _retry_delay(attempts),
+        last_error=str(error)[:1000],
+    )
+
+
+def open_connection():
+    """Open a mail backend connection that stays up until closed."""
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    return connection
@@ -1,6 +1,6 @@
 from django.contrib.auth import authenticate, get_user_model
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
+from django.db import transaction
 from django.utils.timezone import now
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
@@ -10,6 +10,9 @@ import logging
 import random
 
 from .models import CustomUser
+from .outbox import enqueue_email
+from .blacklist import BloomRefreshToken
+from .avatars import schedule_variants
 
 
 logger = logging.getLogger(__name__)
@@ -49,23 +52,28 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """Create user with OTP verification."""
         password = validated_data.pop("password1")
         validated_data.pop("password2")
+        # Pre-computed by the async register view on the hashing pool.
+        password_hash = validated_data.pop("password_hash", None)
 
         otp = str(random.randint(100000, 999999))
         otp_expiration = now() + datetime.timedelta(minutes=10)
 
-        user = CustomUser.objects.create_user(
-            password=password,
-            otp=otp,
-            otp_expiration=otp_expiration,
-            **validated_data
-        )
-        user.is_active = False  # User is inactive until OTP is verified
-        user.save()
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(
+                password=None if password_hash else password,
+                otp=otp,
+                otp_expiration=otp_expiration,
+                **validated_data
+            )
+            if password_hash:
+                user.password = password_hash
+            user.is_active = False  # User is inactive until OTP is verified
+            user.save()
 
-        # Send OTP via email
-        subject = "Your OTP for Account Verification"
-        message = f"Your OTP is {otp}. It will expire in 10 minutes."
-        send_mail(subject, message, "no-reply@sonic.com", [user.email])
+            # Send OTP via email
+            subject = "Your OTP for Account Verification"
+            message = f"Your OTP is {otp}. It will expire in 10 minutes."
+            enqueue_email(subject, message, [user.email], "no-reply@sonic.com")
 
         return user
 
@@ -96,17 +104,22 @@ class UserProfileSerializer(serializers.ModelSerializer):
         if "profile_picture" in validated_data:
             instance.profile_picture = validated_data["profile_picture"]
         instance.save()
+        if validated_data.get("profile_picture"):
+            user_id, name = instance.id, instance.profile_picture.name
+            transaction.on_commit(lambda: schedule_variants(user_id, name))
         return instance
 
 
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
     """Custom JWT token refresh serializer with additional user data."""
+    token_class = BloomRefreshToken
+
     def validate(self, attrs):
         """Validate and refresh token with additional user claims."""
         try:
             logger.info(f"Received data: {attrs}")  # Log input data
 
-            refresh = RefreshToken(attrs["refresh"])  # Decode refresh token
+            refresh = BloomRefreshToken(attrs["refresh"])  # Decode refresh token
             logger.info(f"Decoded refresh token: {refresh}")
 
             data = super().validate(attrs)  # Process normally
@@ -0,0 +1,53 @@
+"""
+Content-addressed file storage.
+
+Files are stored as ``<upload_to>/<aa>/<sha256><ext>``, where ``aa`` is the
+first two hex digits of the digest. Identical uploads map to the same name,
+so a repeated upload costs a hash and an ``exists`` check and writes
+nothing. Because names are shared, a file must never be deleted while any
+row still points at it.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def content_digest(content):
+    """Return the sha256 hex digest of a Django File, leaving it rewound."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by the hash of their content."""
+
+    def content_name(self, name, content):
+        directory, filename = os.path.split(name)
+        digest = content_digest(content)
+        stem, extension = os.path.splitext(filename)
+        if stem == digest and os.path.basename(directory) == digest[:2]:
+            # Already content-addressed, e.g. by dedupe_profile_pictures.
+            return name
+        return os.path.join(directory, digest[:2], digest + extension.lower())
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+avatar_storage = ContentAddressedStorage()
+
+
+def get_avatar_storage():
+    return avatar_storage
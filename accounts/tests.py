@@ -1,3 +1,294 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from backend import ratelimit
+from .avatars import AVATAR_SIZES, avatar_url, variant_name
+from .blacklist import GENERATION_KEY, BlacklistFilter, BloomFilter
+from .models import CustomUser
+from .storage import ContentAddressedStorage, avatar_storage
+from .throttling import check_rate
+
+
+class BloomFilterTests(TestCase):
+    def test_added_values_are_found(self):
+        bloom = BloomFilter(1000)
+        for i in range(100):
+            bloom.add(f"jti-{i}")
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(100)))
+        self.assertEqual(bloom.count, 100)
+
+    def test_false_positive_rate_is_bounded(self):
+        bloom = BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(JWT_BLOOM_SYNC_INTERVAL=60, JWT_BLOOM_REBUILD_INTERVAL=3600)
+class BlacklistFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="student@example.com", username="student", password="password123"
+        )
+
+    def blacklist(self, jti, expires_in=timedelta(days=1), **kwargs):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=f"token-{jti}", expires_at=now() + expires_in
+        )
+        return BlacklistedToken.objects.create(token=token, **kwargs)
+
+    def test_rebuild_loads_existing_blacklist(self):
+        self.blacklist("revoked")
+        bloom = BlacklistFilter()
+        self.assertTrue(bloom.might_contain("revoked"))
+        self.assertFalse(bloom.might_contain("never-issued"))
+
+    @override_settings(JWT_BLOOM_REBUILD_INTERVAL=0)
+    def test_rebuild_drops_expired_tokens(self):
+        self.blacklist("expired", expires_in=timedelta(days=-1))
+        self.assertFalse(BlacklistFilter().might_contain("expired"))
+
+    def test_catch_up_on_generation_change(self):
+        bloom = BlacklistFilter()
+        self.assertFalse(bloom.might_contain("revoked"))
+
+        # Blacklisted by another process, which bumps the generation.
+        self.blacklist("revoked")
+        cache.set(GENERATION_KEY, 7, None)
+        self.assertTrue(bloom.might_contain("revoked"))
+
+    def test_catch_up_finds_rows_committed_out_of_id_order(self):
+        first = self.blacklist("first")
+        self.blacklist("after-gap", id=first.id + 2)
+        bloom = BlacklistFilter()
+        self.assertTrue(bloom.might_contain("after-gap"))
+
+        # A transaction that took the lower id commits last.
+        self.blacklist("late", id=first.id + 1)
+        cache.set(GENERATION_KEY, 7, None)
+        self.assertTrue(bloom.might_contain("late"))
+
+    def test_own_blacklist_does_not_force_catch_up(self):
+        bloom = BlacklistFilter()
+        bloom.might_contain("warm-up")
+        self.blacklist("mine")
+        bloom.add("mine")
+
+        with self.assertNumQueries(0):
+            self.assertTrue(bloom.might_contain("mine"))
+            self.assertFalse(bloom.might_contain("someone-else"))
+
+    def test_foreign_bump_after_own_blacklist_still_catches_up(self):
+        bloom = BlacklistFilter()
+        bloom.might_contain("warm-up")
+        cache.set(GENERATION_KEY, 5, None)
+        self.blacklist("theirs")
+        self.blacklist("mine")
+        bloom.add("mine")
+        self.assertTrue(bloom.might_contain("theirs"))
+
+
+def png_bytes(color="red"):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 300), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=self.root)
+
+    def test_identical_content_shares_one_file(self):
+        digest = hashlib.sha256(b"same bytes").hexdigest()
+        first = self.storage.save("profile_pictures/a.PNG", ContentFile(b"same bytes"))
+        second = self.storage.save("profile_pictures/b.png", ContentFile(b"same bytes"))
+
+        self.assertEqual(first, f"profile_pictures/{digest[:2]}/{digest}.png")
+        self.assertEqual(first, second)
+        self.assertEqual(os.listdir(os.path.join(self.root, "profile_pictures", digest[:2])), [f"{digest}.png"])
+
+    def test_different_content_gets_different_names(self):
+        first = self.storage.save("profile_pictures/a.png", ContentFile(b"one"))
+        second = self.storage.save("profile_pictures/a.png", ContentFile(b"two"))
+        self.assertNotEqual(first, second)
+
+    def test_content_addressed_name_is_kept(self):
+        name = self.storage.save("profile_pictures/a.png", ContentFile(b"bytes"))
+        self.assertEqual(self.storage.save(name, ContentFile(b"bytes")), name)
+
+
+class DedupeProfilePicturesTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.legacy = FileSystemStorage(location=self.root)
+
+    def user_with_legacy_picture(self, username, filename, content):
+        self.legacy.save(f"profile_pictures/{filename}", ContentFile(content))
+        user = CustomUser.objects.create_user(
+            email=f"{username}@example.com", username=username, password="password123"
+        )
+        CustomUser.objects.filter(id=user.id).update(profile_picture=f"profile_pictures/{filename}")
+        return user
+
+    def picture(self, user):
+        return CustomUser.objects.get(id=user.id).profile_picture.name
+
+    def test_identical_legacy_pictures_match_fresh_uploads(self):
+        image = png_bytes()
+        first = self.user_with_legacy_picture("first", "first.png", image)
+        second = self.user_with_legacy_picture("second", "second.png", image)
+        uploaded = avatar_storage.save("profile_pictures/upload.png", ContentFile(image))
+
+        call_command("dedupe_profile_pictures", stdout=io.StringIO())
+
+        self.assertEqual(self.picture(first), uploaded)
+        self.assertEqual(self.picture(second), uploaded)
+        self.assertTrue(avatar_storage.exists(uploaded))
+
+    def test_dedupe_records_rendered_variants(self):
+        user = self.user_with_legacy_picture("first", "first.png", png_bytes())
+        self.assertEqual(avatar_url(CustomUser.objects.get(id=user.id)), "/media/profile_pictures/first.png")
+
+        call_command("dedupe_profile_pictures", stdout=io.StringIO())
+
+        user = CustomUser.objects.get(id=user.id)
+        self.assertEqual(user.avatar_variants, user.profile_picture.name)
+        variant = variant_name(user.profile_picture.name, AVATAR_SIZES["small"], settings.AVATAR_FORMAT)
+        self.assertTrue(avatar_storage.exists(variant))
+        with mock.patch.object(avatar_storage, "exists") as exists:
+            self.assertTrue(avatar_url(user).endswith(variant))
+        exists.assert_not_called()
+
+    def test_dry_run_changes_nothing(self):
+        user = self.user_with_legacy_picture("first", "first.png", png_bytes())
+        call_command("dedupe_profile_pictures", "--dry-run", stdout=io.StringIO())
+        self.assertEqual(self.picture(user), "profile_pictures/first.png")
+
+    def test_delete_orphans_keeps_referenced_files(self):
+        user = self.user_with_legacy_picture("first", "first.png", png_bytes())
+        self.legacy.save("profile_pictures/orphan.png", ContentFile(png_bytes("blue")))
+
+        call_command("dedupe_profile_pictures", "--delete-orphans", stdout=io.StringIO())
+
+        self.assertFalse(self.legacy.exists("profile_pictures/orphan.png"))
+        self.assertFalse(self.legacy.exists("profile_pictures/first.png"))
+        self.assertTrue(avatar_storage.exists(self.picture(user)))
+
+
+class RateLimitBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def assert_token_bucket(self, backend):
+        self.assertEqual(backend.token_bucket("k", 2, 0.5, now=0), (True, 0))
+        self.assertEqual(backend.token_bucket("k", 2, 0.5, now=0), (True, 0))
+        self.assertEqual(backend.token_bucket("k", 2, 0.5, now=0), (False, 2.0))
+        self.assertEqual(backend.token_bucket("k", 2, 0.5, now=1), (False, 1.0))
+        self.assertEqual(backend.token_bucket("k", 2, 0.5, now=2), (True, 0))
+        self.assertEqual(backend.token_bucket("other", 2, 0.5, now=2), (True, 0))
+
+    def assert_sliding_window(self, backend):
+        for now in (100, 101, 102):
+            self.assertEqual(backend.sliding_window("k", 3, 10, now=now), (True, 0))
+        # Full current window: wait for it to end.
+        self.assertEqual(backend.sliding_window("k", 3, 10, now=103), (False, 7))
+
+        # Halfway through the next window the previous count weighs 1.5.
+        self.assertEqual(backend.sliding_window("k", 3, 10, now=115), (True, 0))
+        self.assertEqual(backend.sliding_window("k", 3, 10, now=115), (True, 0))
+        allowed, retry = backend.sliding_window("k", 3, 10, now=115)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry, 5 / 3)
+
+        # Two windows later nothing is carried over.
+        for _ in range(3):
+            self.assertEqual(backend.sliding_window("k", 3, 10, now=130), (True, 0))
+
+    def test_local_token_bucket(self):
+        self.assert_token_bucket(ratelimit.LocalBackend())
+
+    def test_local_sliding_window(self):
+        self.assert_sliding_window(ratelimit.LocalBackend())
+
+    def test_cache_token_bucket(self):
+        self.assert_token_bucket(ratelimit.CacheBackend())
+
+    def test_cache_sliding_window(self):
+        self.assert_sliding_window(ratelimit.CacheBackend())
+
+    def test_local_backend_evicts_least_recently_used(self):
+        backend = ratelimit.LocalBackend(max_keys=2)
+        backend.token_bucket("a", 1, 0.01, now=0)
+        backend.token_bucket("b", 1, 0.01, now=0)
+        backend.token_bucket("a", 1, 0.01, now=0)
+        backend.token_bucket("c", 1, 0.01, now=0)
+        self.assertFalse(backend.token_bucket("a", 1, 0.01, now=0)[0])
+        self.assertTrue(backend.token_bucket("b", 1, 0.01, now=0)[0])
+
+
+@override_settings(
+    RATELIMIT_BACKEND="local",
+    RATELIMIT_RULES={"login": {"burst": 1, "refill_per_second": 0.01, "limit": 30, "window": 900}},
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        ratelimit._backends.clear()
+        self.addCleanup(ratelimit._backends.clear)
+
+    def test_second_burst_request_gets_retry_after(self):
+        payload = {"email": "student@example.com", "password": "wrong"}
+        first = self.client.post(reverse("login-user"), payload)
+        self.assertNotEqual(first.status_code, 429)
+
+        second = self.client.post(reverse("login-user"), payload)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(second["Retry-After"], "100")
+
+    def test_refused_ip_does_not_spend_the_email_allowance(self):
+        self.assertIsNone(check_rate("login", "10.0.0.1", "a@example.com"))
+        self.assertIsNotNone(check_rate("login", "10.0.0.1", "victim@example.com"))
+        self.assertIsNone(check_rate("login", "10.0.0.2", "victim@example.com"))
+
+    @override_settings(
+        RATELIMIT_RULES={"login": {"burst": 5, "refill_per_second": 0.0001, "limit": 1, "window": 900}}
+    )
+    def test_window_refusal_does_not_take_a_token(self):
+        self.assertIsNone(check_rate("login", "10.0.0.1"))
+        for _ in range(3):
+            self.assertIsNotNone(check_rate("login", "10.0.0.1"))
+        tokens, _ = ratelimit.get_backend()._state["tb:login:ip:10.0.0.1"]
+        self.assertAlmostEqual(tokens, 4, places=2)
+
+    def test_limit_is_per_email_and_ip(self):
+        self.client.post(reverse("login-user"), {"email": "a@example.com", "password": "wrong"})
+        response = self.client.post(
+            reverse("login-user"),
+            {"email": "b@example.com", "password": "wrong"},
+            REMOTE_ADDR="10.0.0.2",
+        )
+        self.assertNotEqual(response.status_code, 429)
@@ -0,0 +1,69 @@
+"""
+DRF throttles for the login, OTP and password-reset endpoints.
+
+Each request is checked against the client IP and, when the body carries
+one, the target email. Both get a token bucket for bursts and a
+sliding-window counter for sustained volume, with limits from the
+``RATELIMIT_RULES`` setting. A request is only counted once every limit
+has let it through, so a refused request costs nothing; otherwise anyone
+could spend a victim's email allowance and lock them out. DRF turns a refusal into a 429 response with a
+Retry-After header.
+"""
+import math
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from backend.ratelimit import get_backend
+
+
+def check_rate(scope, ident, email=None):
+    """
+    Count one request against ``scope`` for the client ``ident`` and
+    ``email``. Returns None when allowed, else whole seconds to wait.
+    """
+    rule = settings.RATELIMIT_RULES[scope]
+    backend = get_backend()
+    keys = [f"{scope}:ip:{ident}"]
+    if email:
+        keys.append(f"{scope}:email:{str(email).strip().lower()}")
+
+    for key in keys:
+        allowed, wait = backend.token_bucket(key, rule["burst"], rule["refill_per_second"], consume=False)
+        if allowed:
+            allowed, wait = backend.sliding_window(key, rule["limit"], rule["window"], consume=False)
+        if not allowed:
+            return max(1, math.ceil(wait))
+
+    for key in keys:
+        backend.token_bucket(key, rule["burst"], rule["refill_per_second"])
+        backend.sliding_window(key, rule["limit"], rule["window"])
+    return None
+
+
+class AuthRateThrottle(BaseThrottle):
+    """Token-bucket plus sliding-window throttle keyed by IP and email."""
+    scope = None
+
+    def __init__(self):
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        self.retry_after = check_rate(self.scope, self.get_ident(request), email)
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginRateThrottle(AuthRateThrottle):
+    scope = "login"
+
+
+class OTPRateThrottle(AuthRateThrottle):
+    scope = "otp"
+
+
+class PasswordResetRateThrottle(AuthRateThrottle):
+    scope = "password_reset"
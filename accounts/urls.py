@@ -12,7 +12,9 @@ from .views import (
     ForgotPasswordView,
     ResetPasswordView,
     ChangePasswordView,
+    HashingStatsView,
 )
+from . import async_views
 
 urlpatterns = [
     path("register/", UserRegistrationAPIView.as_view(), name="register-user"),
@@ -25,4 +27,9 @@ urlpatterns = [
     path("forgot-password/", ForgotPasswordView.as_view(), name="forgot-password"),
     path("reset-password/<uidb64>/<token>/",ResetPasswordView.as_view(),name="reset-password",),
     path("change-password/", ChangePasswordView.as_view(), name="change-password"),
+    path("async/login/", async_views.login, name="async-login-user"),
+    path("async/register/", async_views.register, name="async-register-user"),
+    path("async/reset-password/<uidb64>/<token>/", async_views.reset_password, name="async-reset-password"),
+    path("async/change-password/", async_views.change_password, name="async-change-password"),
+    path("hashing/stats/", HashingStatsView.as_view(), name="hashing-stats"),
 ]
\ No newline at end of file
@@ -1,8 +1,7 @@
-from django.core.mail import send_mail
-from django.conf import settings
+from .outbox import enqueue_email
 
 def send_otp_email(email, otp):
-    """Send OTP to the user's email."""
+    """Queue the OTP email for the user."""
     subject = "Your OTP Code for Verification"
     message = f"Your OTP code is {otp}. It is valid for 5 minutes."
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+    enqueue_email(subject, message, [email])
@@ -1,18 +1,18 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.tokens import default_token_generator
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
+from django.db import transaction
 from django.shortcuts import render
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.timezone import now
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -28,6 +28,10 @@ from .serializers import (
     CustomTokenRefreshSerializer,
 )
 from .utils import send_otp_email
+from .outbox import enqueue_email
+from .blacklist import BloomRefreshToken
+from .hashing import hashing_pool
+from .throttling import LoginRateThrottle, OTPRateThrottle, PasswordResetRateThrottle
 
 
 class UserRegistrationAPIView(GenericAPIView):
@@ -54,6 +58,7 @@ class UserRegistrationAPIView(GenericAPIView):
 class VerifyOTPAPIView(APIView):
     """Verify OTP for user account activation."""
     permission_classes = (AllowAny,)
+    throttle_classes = [OTPRateThrottle]
 
     def post(self, request):
         email = request.data.get("email")
@@ -101,6 +106,7 @@ class VerifyOTPAPIView(APIView):
 class ResendOTPAPIView(APIView):
     """Handle resending OTP for account verification."""
     permission_classes = (AllowAny,)
+    throttle_classes = [OTPRateThrottle]
 
     def post(self, request):
         email = request.data.get("email")
@@ -116,15 +122,16 @@ class ResendOTPAPIView(APIView):
 
             # Generate new OTP
             otp = str(random.randint(100000, 999999))
-            otp_expiration = now() + datetime.timedelta(minutes=10)
+            otp_expiration = now() + timedelta(minutes=10)
             user.otp = otp
             user.otp_expiration = otp_expiration
-            user.save()
 
             # Send OTP via email
             subject = "Your New OTP for Account Verification"
             message = f"Your new OTP is {otp}. It will expire in 10 minutes."
-            send_mail(subject, message, "no-reply@sonic.com", [user.email])
+            with transaction.atomic():
+                user.save()
+                enqueue_email(subject, message, [user.email], "no-reply@sonic.com")
 
             return Response(
                 {"message": "New OTP sent to your email!"},
@@ -141,6 +148,7 @@ class ResendOTPAPIView(APIView):
 class UserLoginAPIView(GenericAPIView):
     """Handle user authentication and JWT token generation."""
     permission_classes = (AllowAny,)
+    throttle_classes = [LoginRateThrottle]
     serializer_class = UserLoginSerializer
 
     def post(self, request, *args, **kwargs):
@@ -174,7 +182,7 @@ class UserLogoutAPIView(GenericAPIView):
     def post(self, request, *args, **kwargs):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = BloomRefreshToken(refresh_token)
             token.blacklist()
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
@@ -228,6 +236,7 @@ class CustomTokenRefreshView(TokenRefreshView):
 class ForgotPasswordView(APIView):
     """Handle password reset requests."""
     permission_classes = [AllowAny]
+    throttle_classes = [PasswordResetRateThrottle]
     
     def post(self, request):
         email = request.data.get("email")
@@ -237,12 +246,11 @@ class ForgotPasswordView(APIView):
             token = default_token_generator.make_token(user)
             reset_link = f"http://localhost:5173/reset-password/{uid}/{token}/"
             
-            send_mail(
+            enqueue_email(
                 "Password Reset Request",
                 f"Click the link to reset your password: {reset_link}",
-                "no-reply@elern.com",
                 [user.email],
-                fail_silently=False,
+                "no-reply@elern.com",
             )
             
             return Response(
@@ -321,4 +329,11 @@ class ChangePasswordView(APIView):
         return Response(
             {"message": "Password changed successfully."},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+class HashingStatsView(APIView):
+    """Report queue depth and timings of the password hashing pool."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(hashing_pool.stats(), status=status.HTTP_200_OK)
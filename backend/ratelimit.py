@@ -0,0 +1,133 @@
+"""
+Rate-limiting engine.
+
+Two algorithms, each O(1) time and memory per key:
+
+* Token bucket: ``capacity`` tokens refilled at ``rate`` per second. It
+  absorbs short bursts and then settles to the refill rate.
+* Sliding-window counter: the current and previous fixed-window counts,
+  weighted by how much of the previous window still overlaps. It
+  approximates a true sliding log without storing timestamps.
+
+``LocalBackend`` keeps state in a bounded in-process LRU. ``CacheBackend``
+keeps it in the shared Django cache so limits hold across processes. Pick
+one with the ``RATELIMIT_BACKEND`` setting. Every check returns
+``(allowed, retry_after_seconds)``; with ``consume=False`` it only looks and
+counts nothing, so callers can check several limits before charging any.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class LocalBackend:
+    """Per-process state, evicting the least recently used keys."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._state = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key, default):
+        value = self._state.get(key)
+        if value is None:
+            value = default
+            self._state[key] = value
+            if len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+        else:
+            self._state.move_to_end(key)
+        return value
+
+    def token_bucket(self, key, capacity, rate, now=None, consume=True):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._get(f"tb:{key}", [capacity, now])
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed and consume:
+                tokens -= 1
+            self._state[f"tb:{key}"] = [tokens, now]
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def sliding_window(self, key, limit, window, now=None, consume=True):
+        now = time.time() if now is None else now
+        index = int(now // window)
+        with self._lock:
+            state = self._get(f"sw:{key}", [index, 0, 0])
+            if state[0] != index:
+                # Roll forward; anything older than one window is gone.
+                state[:] = [index, 0, state[1] if state[0] == index - 1 else 0]
+            current, previous = state[1], state[2]
+            allowed = _weighted(current, previous, now, window) < limit
+            if allowed and consume:
+                state[1] += 1
+        return allowed, 0 if allowed else _window_retry(current, previous, limit, now, window)
+
+
+class CacheBackend:
+    """
+    State in the shared cache. Window counters use atomic ``incr``; the
+    token bucket is read-modify-write, so concurrent requests can overshoot
+    it slightly, which is acceptable for abuse throttling.
+    """
+
+    def token_bucket(self, key, capacity, rate, now=None, consume=True):
+        now = time.time() if now is None else now
+        cache_key = f"ratelimit:tb:{key}"
+        tokens, updated = cache.get(cache_key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if not consume:
+            return allowed, 0 if allowed else (1 - tokens) / rate
+        if allowed:
+            tokens -= 1
+        cache.set(cache_key, (tokens, now), math.ceil(capacity / rate) + 1)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def sliding_window(self, key, limit, window, now=None, consume=True):
+        now = time.time() if now is None else now
+        index = int(now // window)
+        current_key = f"ratelimit:sw:{key}:{index}"
+        counts = cache.get_many([current_key, f"ratelimit:sw:{key}:{index - 1}"])
+        current = counts.get(current_key, 0)
+        previous = counts.get(f"ratelimit:sw:{key}:{index - 1}", 0)
+        if _weighted(current, previous, now, window) >= limit:
+            return False, _window_retry(current, previous, limit, now, window)
+        if not consume:
+            return True, 0
+        if not cache.add(current_key, 1, window * 2):
+            try:
+                cache.incr(current_key)
+            except ValueError:
+                cache.set(current_key, 1, window * 2)
+        return True, 0
+
+
+def _weighted(current, previous, now, window):
+    elapsed = (now % window) / window
+    return current + previous * (1 - elapsed)
+
+
+def _window_retry(current, previous, limit, now, window):
+    """Seconds until the weighted count drops below ``limit``."""
+    remaining = window - now % window
+    if current >= limit or not previous:
+        return remaining
+    # previous * (1 - t/window) + current < limit, solved for t.
+    needed = window * (1 - (limit - current) / previous) - (now % window)
+    return min(max(needed, 0.001), remaining)
+
+
+_backends = {}
+
+
+def get_backend():
+    name = getattr(settings, "RATELIMIT_BACKEND", "local")
+    if name not in _backends:
+        _backends[name] = CacheBackend() if name == "cache" else LocalBackend()
+    return _backends[name]
@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "teacher.middleware.InstructorMiddleware",
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -83,6 +84,73 @@ TEMPLATES = [
 
 ASGI_APPLICATION = 'backend.asgi.application'
 
+# Shared cache used for idempotency keys and other short-lived state. Set
+# REDIS_URL in production so every worker process sees the same entries.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Background threads per process that refresh stale dashboard snapshots.
+SNAPSHOT_WORKERS = int(os.getenv("SNAPSHOT_WORKERS", 4))
+
+# Seconds an Instructor profile lookup stays in the shared cache, and in
+# each process's local LRU.
+INSTRUCTOR_CACHE_TTL = int(os.getenv("INSTRUCTOR_CACHE_TTL", 300))
+INSTRUCTOR_LOCAL_CACHE_TTL = int(os.getenv("INSTRUCTOR_LOCAL_CACHE_TTL", 30))
+
+# Seconds an authenticated user stays cached by CachedJWTAuthentication.
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 30))
+
+# Refresh-token blacklist Bloom filter: expected entries, seconds between
+# catch-up syncs when the cache is not shared, and seconds between rebuilds.
+JWT_BLOOM_CAPACITY = int(os.getenv("JWT_BLOOM_CAPACITY", 100000))
+JWT_BLOOM_SYNC_INTERVAL = float(os.getenv("JWT_BLOOM_SYNC_INTERVAL", 1))
+JWT_BLOOM_REBUILD_INTERVAL = int(os.getenv("JWT_BLOOM_REBUILD_INTERVAL", 3600))
+
+# Password hashes computed concurrently by the async auth views, and how
+# many more may wait before they answer 503.
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", 2))
+PASSWORD_HASHING_QUEUE = int(os.getenv("PASSWORD_HASHING_QUEUE", 32))
+
+# Auth endpoint rate limits, applied per client IP and per email: a token
+# bucket of "burst" requests refilled at "refill_per_second", plus at most
+# "limit" requests per sliding "window" seconds. RATELIMIT_BACKEND is
+# "local" (per process) or "cache" (shared through CACHES).
+RATELIMIT_BACKEND = os.getenv("RATELIMIT_BACKEND", "local")
+RATELIMIT_RULES = {
+    "login": {"burst": 5, "refill_per_second": 0.2, "limit": 30, "window": 15 * 60},
+    "otp": {"burst": 3, "refill_per_second": 0.05, "limit": 10, "window": 60 * 60},
+    "password_reset": {"burst": 3, "refill_per_second": 0.02, "limit": 5, "window": 60 * 60},
+}
+
+# Seconds a test's packed answer key stays cached for grading; edits to
+# the test change its cache key, so this only bounds memory.
+ANSWER_KEY_CACHE_TTL = int(os.getenv("ANSWER_KEY_CACHE_TTL", 24 * 60 * 60))
+
+# Seconds a quiz leaderboard stays cached between reads; a cold board is
+# reloaded from its persisted snapshot.
+LEADERBOARD_CACHE_TTL = int(os.getenv("LEADERBOARD_CACHE_TTL", 24 * 60 * 60))
+
+# Without REDIS_URL every process keeps its own leaderboards and only sees
+# the attempts it graded. Seconds before such a board is reloaded from the
+# database, which bounds how stale it can be after other workers' grades
+# and regrades.
+LEADERBOARD_LOCAL_TTL = int(os.getenv("LEADERBOARD_LOCAL_TTL", 60))
+
+# Seconds a meeting roster outlives its last join or leave, which bounds
+# how long entries of crashed workers linger.
+MEETING_ROSTER_TTL = int(os.getenv("MEETING_ROSTER_TTL", 6 * 60 * 60))
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': "channels.layers.InMemoryChannelLayer"
@@ -148,12 +216,22 @@ AUTH_USER_MODEL="accounts.CustomUser"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     
 }
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
+# Override to point at the fake gateway (manage.py run_fake_gateway).
+RAZORPAY_BASE_URL = os.getenv("RAZORPAY_BASE_URL")
+RAZORPAY_TIMEOUT = float(os.getenv("RAZORPAY_TIMEOUT", 5))
+RAZORPAY_MAX_RETRIES = int(os.getenv("RAZORPAY_MAX_RETRIES", 2))
+RAZORPAY_POOL_SIZE = int(os.getenv("RAZORPAY_POOL_SIZE", 20))
+RAZORPAY_BREAKER_THRESHOLD = int(os.getenv("RAZORPAY_BREAKER_THRESHOLD", 5))
+RAZORPAY_BREAKER_RESET = int(os.getenv("RAZORPAY_BREAKER_RESET", 30))
+RAZORPAY_WEBHOOK_SECRET = os.getenv("RAZORPAY_WEBHOOK_SECRET")
+# Seconds a stored response is replayed for a repeated Idempotency-Key.
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=200),
@@ -216,13 +294,27 @@ CORS_ALLOW_ALL_ORIGINS=True
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Worker processes that render avatar thumbnails, and the format served.
+AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", 2))
+AVATAR_FORMAT = os.getenv("AVATAR_FORMAT", "webp")
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587  
-EMAIL_USE_TLS = True
+EMAIL_HOST = os.getenv("EMAIL_HOST", 'smtp.gmail.com')
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", 30))
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
+# Delivery attempts before an outbox email is marked failed.
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+
+# Days a notification is kept, per notification kind. Used by the
+# prune_notifications management command.
+NOTIFICATION_RETENTION_DAYS = {
+    "default": int(os.getenv("NOTIFICATION_RETENTION_DAYS", 90)),
+    "course": 30,
+    "system": 180,
+}
 
 
 
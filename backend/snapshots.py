@@ -0,0 +1,118 @@
+"""
+Stale-while-revalidate snapshots for dashboard metrics.
+
+A metric is a function registered with ``@snapshot(name, ttl)``. Reading it
+returns the last computed value straight from the cache. Once that value is
+older than ``ttl`` one background worker recomputes it, guarded by a cache
+lock, while every other reader keeps getting the stale value. Only a cold
+cache blocks, and even then concurrent readers wait for the first
+computation instead of running their own.
+"""
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+
+# How long a refresh may hold its lock before another worker may retry.
+LOCK_TIMEOUT = 120
+# Entries expire this many ttls after they were computed, so values that
+# nobody reads any more (e.g. rare filter combinations) leave the cache.
+EXPIRY_FACTOR = 10
+# How long a cold read waits for another request's computation.
+COLD_WAIT = 5.0
+COLD_POLL = 0.05
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "SNAPSHOT_WORKERS", 4),
+    thread_name_prefix="snapshot",
+)
+
+
+class Snapshot:
+    """A registered metric computation and its cached value."""
+
+    def __init__(self, name, func, ttl):
+        self.name = name
+        self.func = func
+        self.ttl = ttl
+
+    def key(self, *args, **kwargs):
+        if not args and not kwargs:
+            return f"snapshot:{self.name}"
+        params = repr((args, sorted(kwargs.items())))
+        return f"snapshot:{self.name}:" + hashlib.sha1(params.encode()).hexdigest()
+
+    def get(self, *args, **kwargs):
+        """Return the cached value, scheduling a refresh if it is stale."""
+        key = self.key(*args, **kwargs)
+        entry = cache.get(key)
+        if entry is None:
+            return self._cold(key, args, kwargs)
+
+        if time.time() - entry["computed_at"] > self.ttl and cache.add(key + ":lock", True, LOCK_TIMEOUT):
+            _executor.submit(self._background_refresh, key, args, kwargs)
+        return entry["value"]
+
+    def refresh(self, *args, **kwargs):
+        """Recompute the value now and store it."""
+        return self._store(self.key(*args, **kwargs), args, kwargs)
+
+    def invalidate(self, *args, **kwargs):
+        cache.delete(self.key(*args, **kwargs))
+
+    def _store(self, key, args, kwargs):
+        value = self.func(*args, **kwargs)
+        # Staleness is judged on read; expiry only evicts unread entries.
+        cache.set(key, {"computed_at": time.time(), "value": value}, self.ttl * EXPIRY_FACTOR)
+        return value
+
+    def _cold(self, key, args, kwargs):
+        if not cache.add(key + ":lock", True, LOCK_TIMEOUT):
+            deadline = time.monotonic() + COLD_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(COLD_POLL)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry["value"]
+            # The other computation is taking too long; do our own.
+            return self._store(key, args, kwargs)
+
+        try:
+            return self._store(key, args, kwargs)
+        finally:
+            cache.delete(key + ":lock")
+
+    def _background_refresh(self, key, args, kwargs):
+        try:
+            self._store(key, args, kwargs)
+        except Exception:
+            logger.exception(f"Snapshot refresh failed for {self.name}")
+        finally:
+            cache.delete(key + ":lock")
+            # Worker threads own their database connections.
+            connections.close_all()
+
+
+def snapshot(name, ttl=60):
+    """Register ``func`` as a snapshot metric and return its ``Snapshot``."""
+    def decorator(func):
+        entry = Snapshot(name, func, ttl)
+        _registry[name] = entry
+        return entry
+    return decorator
+
+
+def get_snapshot(name):
+    return _registry[name]
+
+
+def registered_snapshots():
+    return dict(_registry)
@@ -0,0 +1,86 @@
+"""
+Per-course analytics for the admin dashboard.
+
+Enrollment count, average rating and revenue are correlated subqueries on
+one ``Course`` query, so a page costs two queries (rows + count) however
+many courses exist. Revenue comes from the revenue ledger facts.
+"""
+from django.db.models import Avg, Count, DecimalField, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from backend.snapshots import snapshot
+from Courses.models import Course, Enrollment
+from payment.models import DailyRevenueFact
+from reviews.models import Review
+
+
+ORDERING_FIELDS = {"title", "created_at", "total_enrollment", "avg_review", "revenue"}
+DEFAULT_ORDERING = "-revenue"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SNAPSHOT_TTL = 300
+# Only unfiltered-by-search requests for the first pages are snapshotted,
+# which keeps the number of cached parameter combinations bounded.
+MAX_SNAPSHOT_PAGE = 5
+
+
+def _per_course(queryset, aggregate, output_field):
+    subquery = (
+        queryset.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(value=aggregate)
+        .values("value")[:1]
+    )
+    return Coalesce(Subquery(subquery, output_field=output_field), Value(0), output_field=output_field)
+
+
+def course_analytics_queryset(search=None, is_active=None, ordering=DEFAULT_ORDERING):
+    """Annotated, filtered and ordered course analytics rows."""
+    queryset = Course.objects.all()
+    if search:
+        queryset = queryset.filter(title__icontains=search)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+
+    return (
+        queryset
+        .annotate(
+            total_enrollment=_per_course(Enrollment.objects, Count("id"), IntegerField()),
+            avg_review=_per_course(Review.objects, Avg("rating"), FloatField()),
+            revenue=_per_course(
+                DailyRevenueFact.objects, Sum("gross_amount"), DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+        .order_by(ordering, "id")
+        .values("id", "title", "total_enrollment", "avg_review", "revenue", "is_active")
+    )
+
+
+def _rows(queryset):
+    return [{**row, "avg_review": round(row["avg_review"], 2)} for row in queryset]
+
+
+def course_analytics_rows(search=None, is_active=None, ordering=DEFAULT_ORDERING):
+    """Return every matching course's analytics as a list."""
+    return _rows(course_analytics_queryset(search, is_active, ordering))
+
+
+def course_analytics_page(page=1, page_size=DEFAULT_PAGE_SIZE, search=None, is_active=None,
+                          ordering=DEFAULT_ORDERING):
+    """Return one page of course analytics as a plain dict."""
+    queryset = course_analytics_queryset(search, is_active, ordering)
+    offset = (page - 1) * page_size
+    results = _rows(queryset[offset:offset + page_size])
+    return {
+        "count": queryset.count(),
+        "page": page,
+        "page_size": page_size,
+        "results": results,
+    }
+
+
+@snapshot("admin:course-analytics", ttl=SNAPSHOT_TTL)
+def course_analytics_snapshot(**params):
+    """``course_analytics_page`` served as a stale-while-revalidate snapshot."""
+    return course_analytics_page(**params)
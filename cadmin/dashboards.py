@@ -0,0 +1,43 @@
+"""Admin dashboard metrics, served through ``backend.snapshots``."""
+import calendar
+
+from django.db.models import Count, Sum
+
+from backend.snapshots import snapshot
+from Courses.models import Course, Enrollment, StudentCourseProgress
+from payment.models import DailyRevenueFact
+from payment.timeseries import revenue_series, series, year_to_date
+
+
+@snapshot("admin:total-enrolled", ttl=60)
+def total_enrolled():
+    return Enrollment.objects.count()
+
+
+@snapshot("admin:total-revenue", ttl=60)
+def total_revenue():
+    return DailyRevenueFact.objects.aggregate(total=Sum('gross_amount'))['total'] or 0
+
+
+@snapshot("admin:monthly-revenue", ttl=300)
+def monthly_revenue():
+    """Revenue, enrollments, new courses and completions per month this year."""
+    start, end = year_to_date()
+    revenue = revenue_series(start, end, bucket="month")[0]["points"]
+    courses = series(
+        Course.objects.all(), "created_at", {"count": Count("id")}, start, end, bucket="month"
+    )[0]["points"]
+    completed = series(
+        StudentCourseProgress.objects.filter(is_completed=True),
+        "updated_at", {"count": Count("id")}, start, end, bucket="month",
+    )[0]["points"]
+
+    result = {}
+    for sales, created, completions in zip(revenue, courses, completed):
+        result[calendar.month_name[sales["period"].month]] = {
+            'revenue': float(sales["revenue"]),
+            'created_course_count': created["count"],
+            'enrollment_count': sales["enrollments"],
+            'completed_student_count': completions["count"],
+        }
+    return result
@@ -48,8 +48,9 @@ class CourseAnalyticsSerializer(serializers.Serializer):
     Serializer to represent analytical data for a course, including
     title, total enrollment, average review, revenue, and active status.
     """
+    id = serializers.IntegerField()
     title = serializers.CharField()
     total_enrollment = serializers.IntegerField()
     avg_review = serializers.FloatField()
-    revenue = serializers.DecimalField(max_digits=10, decimal_places=2)
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
     is_active = serializers.BooleanField()
@@ -2,7 +2,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import CachedJWTAuthentication
 from django.contrib.auth import authenticate, get_user_model
 from django.db.models import Sum, F, Count, Avg
 from django.db.models.functions import TruncMonth
@@ -14,7 +14,19 @@ from accounts.models import CustomUser
 from Courses.models import Course, Enrollment, StudentCourseProgress
 from reviews.models import Review
 from notifications.models import Notification
+from payment.models import DailyRevenueFact
 from rest_framework.permissions import IsAdminUser
+from .dashboards import total_enrolled, total_revenue, monthly_revenue
+from .analytics import (
+    course_analytics_page,
+    course_analytics_rows,
+    course_analytics_snapshot,
+    MAX_SNAPSHOT_PAGE,
+    ORDERING_FIELDS,
+    DEFAULT_ORDERING,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
 
 User = get_user_model()
 
@@ -83,7 +95,7 @@ class IsSuperUser(permissions.BasePermission):
 
 class InactiveCourseListView(APIView):
     """Returns a list of inactive courses."""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsSuperUser]
 
     def get(self, request):
@@ -94,7 +106,7 @@ class InactiveCourseListView(APIView):
 
 class ActivateCourseView(APIView):
     """Activates an inactive course and sends notifications."""
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAdminUser]
 
     def patch(self, request, pk):
@@ -108,7 +120,7 @@ class ActivateCourseView(APIView):
             message = f"Course is created successfully! Enjoy the course {course.title}."
 
             notifications = [
-                Notification(sender=sender, recipient=recipient, message=message)
+                Notification(sender=sender, recipient=recipient, message=message, kind="course")
                 for recipient in recipients
             ]
             Notification.objects.bulk_create(notifications)
@@ -124,22 +136,16 @@ class TotalEnrolledStudentsAPIView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        count = Enrollment.objects.count()
-        serializer = TotalEnrolledStudentsSerializer({'total_enrolled': count})
+        serializer = TotalEnrolledStudentsSerializer({'total_enrolled': total_enrolled.get()})
         return Response(serializer.data)
 
 
 class TotalRevenueAPIView(APIView):
-    """Returns the total revenue generated from paid enrollments."""
+    """Returns the total revenue booked in the revenue ledger."""
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        total_revenue = Enrollment.objects.filter(payment=True).aggregate(
-            total=Sum(F('course__price'))
-        )['total'] or 0
-
-        data = {'total_revenue': total_revenue}
-        serializer = TotalRevenueSerializer(data)
+        serializer = TotalRevenueSerializer({'total_revenue': total_revenue.get()})
         return Response(serializer.data)
 
 
@@ -149,82 +155,69 @@ class MonthlyRevenueAPIView(APIView):
 
     def get(self, request):
         try:
-            current_year = now().year
-            current_month = now().month
-
-            revenue_data = (
-                Enrollment.objects.filter(payment=True, enrolled_at__year=current_year)
-                .annotate(month=TruncMonth('enrolled_at'))
-                .values('month')
-                .annotate(revenue=Sum(F('course__price')))
-                .order_by('month')
-            )
-            revenue_by_month = {entry['month'].month: float(entry['revenue']) for entry in revenue_data}
-
-            enrollment_data = (
-                Enrollment.objects.filter(payment=True, enrolled_at__year=current_year)
-                .annotate(month=TruncMonth('enrolled_at'))
-                .values('month')
-                .annotate(count=Count('id'))
-                .order_by('month')
-            )
-            enrollment_by_month = {entry['month'].month: entry['count'] for entry in enrollment_data}
-
-            course_data = (
-                Course.objects.filter(created_at__year=current_year)
-                .annotate(month=TruncMonth('created_at'))
-                .values('month')
-                .annotate(count=Count('id'))
-                .order_by('month')
-            )
-            course_by_month = {entry['month'].month: entry['count'] for entry in course_data}
-
-            completed_students_data = (
-                StudentCourseProgress.objects.filter(is_completed=True, updated_at__year=current_year)
-                .annotate(month=TruncMonth('updated_at'))
-                .values('month')
-                .annotate(count=Count('id'))
-                .order_by('month')
-            )
-            completed_by_month = {entry['month'].month: entry['count'] for entry in completed_students_data}
-
-            result = {}
-            for month in range(1, current_month + 1):
-                month_name = calendar.month_name[month]
-                result[month_name] = {
-                    'revenue': revenue_by_month.get(month, 0.00),
-                    'created_course_count': course_by_month.get(month, 0),
-                    'enrollment_count': enrollment_by_month.get(month, 0),
-                    'completed_student_count': completed_by_month.get(month, 0)
-                }
-
-            return Response(result)
+            return Response(monthly_revenue.get())
 
         except Exception as e:
             return Response({"error": "An error occurred while processing data."}, status=500)
 
 
 class CourseAnalyticsView(APIView):
-    """Returns analytics for each course including enrollments, average rating, revenue, and status."""
+    """
+    Returns analytics for each course including enrollments, average
+    rating, revenue, and status.
+
+    Without ``page`` or ``page_size`` the response is the plain list of all
+    courses, as before pagination was added. With either of them it is a
+    ``{count, page, page_size, results}`` page.
+
+    Query params:
+        page, page_size: Pagination (page_size capped at 200)
+        ordering: title, created_at, total_enrollment, avg_review or revenue,
+            prefixed with "-" for descending (default "-revenue")
+        is_active: "true" or "false"
+        search: Case-insensitive match on the course title
+        snapshot: "true" to serve a cached snapshot refreshed in the
+            background; honoured for the first pages without ``search``
+    """
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        courses = Course.objects.all()
-        results = []
-
-        for course in courses:
-            enrollments = Enrollment.objects.filter(course=course)
-            total_enrollment = enrollments.count()
-            avg_review = Review.objects.filter(course=course).aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0.0
-            revenue = enrollments.filter(payment=True).aggregate(total=Sum('course__price'))['total'] or 0.0
-
-            results.append({
-                "title": course.title,
-                "total_enrollment": total_enrollment,
-                "avg_review": round(avg_review, 2),
-                "revenue": revenue,
-                "is_active": course.is_active
-            })
-
-        serializer = CourseAnalyticsSerializer(results, many=True)
-        return Response(serializer.data)
+        params = request.query_params
+        ordering = params.get('ordering', DEFAULT_ORDERING)
+        if ordering.lstrip('-') not in ORDERING_FIELDS:
+            return Response({"error": f"Invalid ordering '{ordering}'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        is_active = params.get('is_active')
+        if is_active is not None:
+            is_active = is_active.lower() in ('true', '1')
+        search = params.get('search') or None
+
+        if 'page' not in params and 'page_size' not in params:
+            rows = course_analytics_rows(search, is_active, ordering)
+            return Response(CourseAnalyticsSerializer(rows, many=True).data)
+
+        try:
+            page = max(int(params.get('page', 1)), 1)
+            page_size = min(max(int(params.get('page_size', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "page and page_size must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = {
+            "page": page,
+            "page_size": page_size,
+            "search": search,
+            "is_active": is_active,
+            "ordering": ordering,
+        }
+        use_snapshot = (
+            params.get('snapshot', '').lower() in ('true', '1')
+            and search is None
+            and page <= MAX_SNAPSHOT_PAGE
+        )
+        if use_snapshot:
+            data = course_analytics_snapshot.get(**query)
+        else:
+            data = course_analytics_page(**query)
+
+        serializer = CourseAnalyticsSerializer(data['results'], many=True)
+        return Response({**data, "results": serializer.data})
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import ChatMessage
 from accounts.models import CustomUser
+from accounts.avatars import avatar_url
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -32,9 +33,14 @@ class ProfileSerializer(serializers.ModelSerializer):
     Serializer for CustomUser model.
 
     Used to serialize basic profile data including ID, username, email,
-    and profile picture.
+    and profile picture (the small avatar variant).
     """
+    profile_picture = serializers.SerializerMethodField()
+
     class Meta:
         model = CustomUser
         fields = ["id", "username", "email", "profile_picture"]
         read_only_fields = ["email"]
+
+    def get_profile_picture(self, obj):
+        return avatar_url(obj, request=self.context.get('request'))
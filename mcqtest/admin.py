@@ -1,6 +1,6 @@
 
 from django.contrib import admin
-from .models import Test, Question, Answer
+from .models import Test, Question, Answer, QuizAttempt, LeaderboardSnapshot
 
 @admin.register(Test)
 class TestAdmin(admin.ModelAdmin):
@@ -17,3 +17,14 @@ class AnswerAdmin(admin.ModelAdmin):
     list_display = ('text', 'question', 'is_correct')
     list_filter = ('is_correct',)
 
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'test', 'score', 'total', 'percentage', 'submitted_at')
+    list_select_related = ('user', 'test')
+    raw_id_fields = ('user', 'test')
+
+@admin.register(LeaderboardSnapshot)
+class LeaderboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'object_id', 'last_attempt_id', 'computed_at')
+    list_filter = ('scope',)
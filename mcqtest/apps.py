@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class McqtestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mcqtest'
+
+    def ready(self):
+        import mcqtest.signals
@@ -0,0 +1,170 @@
+"""
+Server-side quiz grading.
+
+``AnswerKey`` packs a test's answers into parallel arrays sorted by answer
+id: the owning question's index and whether the answer is correct. Scoring
+a submission is then one binary search per selected answer plus one pass
+over the questions, with no queries. Keys are cached per
+``(test, key_version)``, so editing a question or answer, which bumps
+``Test.key_version``, makes the next grade load a fresh key.
+
+A question counts as correct when every correct answer and no wrong answer
+of it was selected.
+"""
+from array import array
+from bisect import bisect_left
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from .leaderboards import rebuild_leaderboard, record_attempts
+from .models import Answer, Question, QuizAttempt, Test
+
+
+class AnswerKey:
+    """Array-backed answer key of one test version."""
+
+    def __init__(self, version, question_count, answer_ids, answer_question, answer_correct):
+        self.version = version
+        self.question_count = question_count
+        self.answer_ids = answer_ids
+        self.answer_question = answer_question
+        self.answer_correct = answer_correct
+        self.correct_per_question = array("i", [0] * question_count)
+        for question, correct in zip(answer_question, answer_correct):
+            if correct:
+                self.correct_per_question[question] += 1
+
+    @classmethod
+    def load(cls, test_id, version):
+        question_ids = list(
+            Question.objects.filter(test_id=test_id).order_by("id").values_list("id", flat=True)
+        )
+        question_index = {question_id: index for index, question_id in enumerate(question_ids)}
+        rows = (
+            Answer.objects.filter(question__test_id=test_id)
+            .order_by("id")
+            .values_list("id", "question_id", "is_correct")
+        )
+        answer_ids, answer_question, answer_correct = array("q"), array("i"), bytearray()
+        for answer_id, question_id, is_correct in rows:
+            answer_ids.append(answer_id)
+            answer_question.append(question_index[question_id])
+            answer_correct.append(1 if is_correct else 0)
+        return cls(version, len(question_ids), answer_ids, answer_question, answer_correct)
+
+    def score(self, selected_ids):
+        """Return the number of correctly answered questions."""
+        hits = array("i", [0] * self.question_count)
+        wrong = bytearray(self.question_count)
+        for answer_id in set(selected_ids):
+            position = bisect_left(self.answer_ids, answer_id)
+            if position == len(self.answer_ids) or self.answer_ids[position] != answer_id:
+                continue  # Not an answer of this test.
+            question = self.answer_question[position]
+            if self.answer_correct[position]:
+                hits[question] += 1
+            else:
+                wrong[question] = 1
+        return sum(
+            1 for question in range(self.question_count)
+            if self.correct_per_question[question]
+            and hits[question] == self.correct_per_question[question]
+            and not wrong[question]
+        )
+
+
+def get_answer_key(test):
+    """Return the cached AnswerKey for the test's current version."""
+    key = f"mcq:answer-key:{test.id}:{test.key_version}"
+    answer_key = cache.get(key)
+    if answer_key is None:
+        answer_key = AnswerKey.load(test.id, test.key_version)
+        cache.set(key, answer_key, settings.ANSWER_KEY_CACHE_TTL)
+    return answer_key
+
+
+def bump_key_version(test_id):
+    """Mark every cached key and graded attempt of the test as stale."""
+    Test.objects.filter(pk=test_id).update(key_version=F("key_version") + 1)
+
+
+def _percentage(score, total):
+    return (Decimal(score) * 100 / total).quantize(Decimal("0.01")) if total else Decimal("0")
+
+
+def _clean(selected_ids):
+    return sorted({int(answer_id) for answer_id in selected_ids})
+
+
+def grade_submissions(test, submissions):
+    """
+    Grade and store attempts.
+
+    Args:
+        test: Test instance
+        submissions: Iterable of ``(user_id, selected answer ids)`` pairs
+
+    Returns:
+        list: Created QuizAttempt instances
+    """
+    answer_key = get_answer_key(test)
+    graded_at = now()
+    attempts = []
+    for user_id, selected_ids in submissions:
+        selected = _clean(selected_ids)
+        score = answer_key.score(selected)
+        attempts.append(QuizAttempt(
+            test=test,
+            user_id=user_id,
+            selected_answers=selected,
+            score=score,
+            total=answer_key.question_count,
+            percentage=_percentage(score, answer_key.question_count),
+            key_version=answer_key.version,
+            graded_at=graded_at,
+        ))
+    created = QuizAttempt.objects.bulk_create(attempts)
+    transaction.on_commit(lambda: record_attempts(created))
+    return created
+
+
+def regrade_test(test, batch_size=1000):
+    """
+    Re-score every attempt of ``test`` graded against an older key version,
+    in one pass over the attempts. Returns the number of attempts updated.
+    """
+    test.refresh_from_db(fields=["key_version"])
+    answer_key = get_answer_key(test)
+    graded_at = now()
+    stale = (
+        QuizAttempt.objects.filter(test=test)
+        .exclude(key_version=answer_key.version)
+        .only("id", "selected_answers")
+        .order_by("id")
+    )
+
+    updated, batch = 0, []
+    fields = ["score", "total", "percentage", "key_version", "graded_at"]
+    for attempt in stale.iterator(chunk_size=batch_size):
+        attempt.score = answer_key.score(attempt.selected_answers)
+        attempt.total = answer_key.question_count
+        attempt.percentage = _percentage(attempt.score, attempt.total)
+        attempt.key_version = answer_key.version
+        attempt.graded_at = graded_at
+        batch.append(attempt)
+        if len(batch) == batch_size:
+            QuizAttempt.objects.bulk_update(batch, fields)
+            updated += len(batch)
+            batch = []
+    if batch:
+        QuizAttempt.objects.bulk_update(batch, fields)
+        updated += len(batch)
+    if updated:
+        rebuild_leaderboard("test", test.id)
+        rebuild_leaderboard("course", test.course_id)
+    return updated
@@ -0,0 +1,333 @@
+"""
+Quiz leaderboards per test and per course.
+
+A test board ranks users by their best score on the test; a course board
+ranks them by the sum of their best scores over the course's tests.
+
+With the Redis cache backend each board is a Redis sorted set, updated in
+place: a user's rank is ``ZSCORE`` plus ``ZCOUNT`` and the top N is
+``ZREVRANGE``, both O(log n). With any other backend boards are kept per
+process in ``Leaderboard`` objects, a list of ``(-score, user_id)`` sorted
+with ``bisect``; reads are O(log n) but an update shifts the list, which is
+O(n) (a memmove, cheap at quiz sizes). A process only sees the attempts it
+graded itself, so its boards are reloaded after ``LEADERBOARD_LOCAL_TTL``
+seconds to pick up other workers' attempts and regrades.
+
+When an attempt is graded, its user's score is recomputed from the
+attempts table and raised on the board, never lowered. That is idempotent
+and independent of the order in which attempts commit, so concurrent
+submissions need no locking. Regrades, which can lower scores, replace the
+whole board.
+
+Boards are persisted to ``LeaderboardSnapshot``. A cold board is reloaded
+from its snapshot when no attempt is newer than it, and otherwise rebuilt
+with one GROUP BY query. ``refresh_leaderboards`` rebuilds boards behind
+their attempts.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils.timezone import now
+
+from .models import LeaderboardSnapshot, QuizAttempt
+
+SCOPES = ("test", "course")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+# Attempts are assumed to commit within this long of being submitted.
+SAFETY_LAG = timedelta(seconds=10)
+
+
+class Leaderboard:
+    """Users ranked by score, highest first; ties share a rank."""
+
+    def __init__(self, entries=()):
+        self.scores = dict(entries)
+        self.ranking = sorted((-score, user_id) for user_id, score in self.scores.items())
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def raise_score(self, user_id, score):
+        old = self.scores.get(user_id)
+        if old is not None and old >= score:
+            return
+        if old is not None:
+            del self.ranking[bisect_left(self.ranking, (-old, user_id))]
+        self.scores[user_id] = score
+        insort(self.ranking, (-score, user_id))
+
+    def rank(self, user_id):
+        """Return ``(rank, score)`` for the user, or None if unranked."""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return bisect_left(self.ranking, (-score,)) + 1, score
+
+    def top(self, limit):
+        """Return ``[(rank, user_id, score), ...]`` for the first ``limit`` users."""
+        return _ranked((user_id, -negative) for negative, user_id in self.ranking[:limit])
+
+    def entries(self):
+        return [[user_id, -negative] for negative, user_id in self.ranking]
+
+
+def _ranked(rows):
+    """Attach competition ranks to ``(user_id, score)`` rows in rank order."""
+    ranked = []
+    for position, (user_id, score) in enumerate(rows):
+        rank = ranked[-1][0] if ranked and ranked[-1][2] == score else position + 1
+        ranked.append((rank, user_id, score))
+    return ranked
+
+
+class LocalStore:
+    """
+    Boards held in this process, least recently used evicted first. A board
+    expires ``ttl`` seconds after it was loaded.
+    """
+
+    def __init__(self, max_boards=1000, ttl=None):
+        self.max_boards = max_boards
+        self.ttl = ttl
+        self._boards = OrderedDict()
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def _board(self, key):
+        board = self._boards.get(key)
+        if board is None:
+            return None
+        if self._expires.get(key, float("inf")) <= time.monotonic():
+            del self._boards[key]
+            del self._expires[key]
+            return None
+        self._boards.move_to_end(key)
+        return board
+
+    def _set(self, key, board):
+        self._boards[key] = board
+        self._boards.move_to_end(key)
+        if self.ttl is not None:
+            self._expires[key] = time.monotonic() + self.ttl
+        if len(self._boards) > self.max_boards:
+            evicted, _ = self._boards.popitem(last=False)
+            self._expires.pop(evicted, None)
+
+    def is_loaded(self, key):
+        with self._lock:
+            return self._board(key) is not None
+
+    def merge(self, key, scores):
+        with self._lock:
+            board = self._board(key)
+            if board is None:
+                board = Leaderboard()
+                self._set(key, board)
+            for user_id, score in scores.items():
+                board.raise_score(user_id, score)
+
+    def replace(self, key, scores):
+        with self._lock:
+            self._set(key, Leaderboard(scores.items()))
+
+    def rank(self, key, user_id):
+        with self._lock:
+            board = self._board(key)
+            return board.rank(user_id) if board is not None else None
+
+    def top(self, key, limit):
+        with self._lock:
+            board = self._board(key)
+            return board.top(limit) if board is not None else []
+
+    def count(self, key):
+        with self._lock:
+            board = self._board(key)
+            return len(board) if board is not None else 0
+
+
+class RedisStore:
+    """
+    Boards as Redis sorted sets. A sentinel member scored ``-inf`` marks a
+    board as loaded, so an empty board is told apart from a missing one.
+    """
+    SENTINEL = "loaded"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, key):
+        return cache.make_key(key)
+
+    def is_loaded(self, key):
+        return self.client.zscore(self._key(key), self.SENTINEL) is not None
+
+    def merge(self, key, scores):
+        key = self._key(key)
+        pipe = self.client.pipeline(transaction=True)
+        if scores:
+            pipe.zadd(key, {str(user_id): score for user_id, score in scores.items()}, gt=True)
+        pipe.zadd(key, {self.SENTINEL: float("-inf")}, nx=True)
+        pipe.expire(key, settings.LEADERBOARD_CACHE_TTL)
+        pipe.execute()
+
+    def replace(self, key, scores):
+        key = self._key(key)
+        mapping = {str(user_id): score for user_id, score in scores.items()}
+        mapping[self.SENTINEL] = float("-inf")
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(key)
+        pipe.zadd(key, mapping)
+        pipe.expire(key, settings.LEADERBOARD_CACHE_TTL)
+        pipe.execute()
+
+    def rank(self, key, user_id):
+        key = self._key(key)
+        score = self.client.zscore(key, str(user_id))
+        if score is None:
+            return None
+        return self.client.zcount(key, f"({score}", "+inf") + 1, int(score)
+
+    def top(self, key, limit):
+        rows = self.client.zrevrange(self._key(key), 0, limit - 1, withscores=True)
+        return _ranked(
+            (int(member), int(score)) for member, score in rows
+            if member.decode() != self.SENTINEL
+        )
+
+    def count(self, key):
+        return max(self.client.zcard(self._key(key)) - 1, 0)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Redis sorted sets with the Redis cache backend, else per-process boards."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.CACHES["default"]["BACKEND"].endswith("redis.RedisCache"):
+                    _store = RedisStore(cache._cache.get_client(write=True))
+                else:
+                    _store = LocalStore(ttl=settings.LEADERBOARD_LOCAL_TTL)
+    return _store
+
+
+def _key(scope, object_id):
+    return f"mcq:leaderboard:{scope}:{object_id}"
+
+
+def _attempts(scope, object_id):
+    if scope == "test":
+        return QuizAttempt.objects.filter(test_id=object_id)
+    return QuizAttempt.objects.filter(test__course_id=object_id)
+
+
+def _aggregate(scope, object_id, user_ids=None):
+    """
+    Return ``({user_id: score}, last attempt id)`` from the attempts table
+    in one query, optionally for some users only.
+    """
+    attempts = _attempts(scope, object_id)
+    if user_ids is not None:
+        attempts = attempts.filter(user_id__in=user_ids)
+    rows = (
+        attempts.values("user_id", "test_id")
+        .annotate(best=Max("score"), last=Max("id"))
+        .order_by()
+    )
+    totals, last_attempt_id = {}, 0
+    for row in rows:
+        totals[row["user_id"]] = totals.get(row["user_id"], 0) + row["best"]
+        last_attempt_id = max(last_attempt_id, row["last"])
+    return totals, last_attempt_id
+
+
+def _persist(scope, object_id, scores, last_attempt_id):
+    LeaderboardSnapshot.objects.update_or_create(
+        scope=scope,
+        object_id=object_id,
+        defaults={
+            "entries": sorted(([user_id, score] for user_id, score in scores.items()), key=lambda e: -e[1]),
+            "last_attempt_id": last_attempt_id,
+        },
+    )
+
+
+def _ensure_loaded(scope, object_id):
+    store, key = get_store(), _key(scope, object_id)
+    if store.is_loaded(key):
+        return
+
+    snapshot = LeaderboardSnapshot.objects.filter(scope=scope, object_id=object_id).first()
+    newer = snapshot and _attempts(scope, object_id).filter(
+        Q(id__gt=snapshot.last_attempt_id) | Q(submitted_at__gte=snapshot.computed_at - SAFETY_LAG)
+    ).exists()
+    if snapshot and not newer:
+        scores = {user_id: score for user_id, score in snapshot.entries}
+    else:
+        scores, last_attempt_id = _aggregate(scope, object_id)
+        _persist(scope, object_id, scores, last_attempt_id)
+    # Merging only raises scores, so racing loaders and updates are harmless.
+    store.merge(key, scores)
+
+
+def top(scope, object_id, limit):
+    """Return ``[(rank, user_id, score), ...]`` for the best ``limit`` users."""
+    _ensure_loaded(scope, object_id)
+    return get_store().top(_key(scope, object_id), limit)
+
+
+def rank(scope, object_id, user_id):
+    """Return ``(rank, score)`` for the user, or None if unranked."""
+    _ensure_loaded(scope, object_id)
+    return get_store().rank(_key(scope, object_id), user_id)
+
+
+def participants(scope, object_id):
+    _ensure_loaded(scope, object_id)
+    return get_store().count(_key(scope, object_id))
+
+
+def _refresh_users(scope, object_id, user_ids):
+    _ensure_loaded(scope, object_id)
+    scores, _ = _aggregate(scope, object_id, user_ids)
+    get_store().merge(_key(scope, object_id), scores)
+
+
+def rebuild_leaderboard(scope, object_id):
+    """Recompute a board from every attempt, e.g. after a regrade."""
+    started = now()
+    scores, last_attempt_id = _aggregate(scope, object_id)
+    get_store().replace(_key(scope, object_id), scores)
+    _persist(scope, object_id, scores, last_attempt_id)
+    # Attempts graded while the aggregate ran may have been overwritten.
+    recent = set(
+        _attempts(scope, object_id)
+        .filter(submitted_at__gte=started - SAFETY_LAG)
+        .values_list("user_id", flat=True)
+    )
+    if recent:
+        _refresh_users(scope, object_id, recent)
+
+
+def record_attempts(attempts):
+    """Raise the test and course scores of the users of new attempts."""
+    tests, courses = {}, {}
+    for attempt in attempts:
+        tests.setdefault(attempt.test_id, set()).add(attempt.user_id)
+        courses.setdefault(attempt.test.course_id, set()).add(attempt.user_id)
+    for test_id, user_ids in tests.items():
+        _refresh_users("test", test_id, user_ids)
+    for course_id, user_ids in courses.items():
+        _refresh_users("course", course_id, user_ids)
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from mcqtest.leaderboards import rebuild_leaderboard
+from mcqtest.models import LeaderboardSnapshot, QuizAttempt
+
+
+class Command(BaseCommand):
+    help = "Rebuild and persist quiz leaderboards that have attempts newer than their snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every board, not only those with new attempts.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep refreshing instead of exiting after one pass.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=300.0,
+            help="Seconds to sleep between passes when looping.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rebuilt = self.refresh(options["all"])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} leaderboards."))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def refresh(self, everything):
+        persisted = {
+            (scope, object_id): last
+            for scope, object_id, last in LeaderboardSnapshot.objects.values_list(
+                "scope", "object_id", "last_attempt_id"
+            )
+        }
+        latest = {}
+        for test_id, course_id, last in (
+            QuizAttempt.objects.values_list("test_id", "test__course_id")
+            .annotate(last=Max("id"))
+            .order_by()
+        ):
+            latest[("test", test_id)] = last
+            latest[("course", course_id)] = max(last, latest.get(("course", course_id), 0))
+
+        rebuilt = 0
+        for (scope, object_id), last in latest.items():
+            if everything or persisted.get((scope, object_id), 0) < last:
+                rebuild_leaderboard(scope, object_id)
+                rebuilt += 1
+        return rebuilt
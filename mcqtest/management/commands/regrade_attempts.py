@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from mcqtest.grading import regrade_test
+from mcqtest.models import QuizAttempt, Test
+
+
+class Command(BaseCommand):
+    help = "Re-score quiz attempts graded against an outdated answer key."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--test",
+            type=int,
+            action="append",
+            help="Only regrade this test id (repeatable). Defaults to every test with stale attempts.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Attempts updated per statement.",
+        )
+
+    def handle(self, *args, **options):
+        tests = Test.objects.all()
+        if options["test"]:
+            tests = tests.filter(pk__in=options["test"])
+            missing = set(options["test"]) - set(tests.values_list("pk", flat=True))
+            if missing:
+                raise CommandError(f"Unknown test ids: {sorted(missing)}")
+        else:
+            stale = QuizAttempt.objects.exclude(key_version=F("test__key_version"))
+            tests = tests.filter(pk__in=stale.values("test_id"))
+
+        total = 0
+        for test in tests.order_by("pk"):
+            regraded = regrade_test(test, options["batch_size"])
+            total += regraded
+            self.stdout.write(f"  test {test.pk}: {regraded} regraded")
+        self.stdout.write(self.style.SUCCESS(f"Regraded {total} attempts."))
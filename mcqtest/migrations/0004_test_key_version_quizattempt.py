@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mcqtest', '0003_alter_answer_question'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='key_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_answers', models.JSONField(default=list)),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('key_version', models.PositiveIntegerField(default=0)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('graded_at', models.DateTimeField(blank=True, null=True)),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='mcqtest.test')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['test', 'score'], name='quiz_attempt_test_score_idx'), models.Index(fields=['user', 'test'], name='quiz_attempt_user_test_idx')],
+            },
+        ),
+    ]
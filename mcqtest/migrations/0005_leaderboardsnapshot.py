@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mcqtest', '0004_test_key_version_quizattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('test', 'Test'), ('course', 'Course')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('entries', models.JSONField(default=list)),
+                ('last_attempt_id', models.PositiveBigIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('scope', 'object_id')},
+            },
+        ),
+    ]
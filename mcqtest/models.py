@@ -1,8 +1,12 @@
 from django.db import models
 from Courses.models import Course
+from accounts.models import CustomUser
 class Test(models.Model):
     course=models.ForeignKey(Course,on_delete=models.CASCADE)
     title=models.CharField(max_length=100)
+    # Bumped whenever a question or answer of the test changes, so cached
+    # answer keys and graded attempts can tell they are out of date.
+    key_version=models.PositiveIntegerField(default=1)
     
 
 class Question(models.Model):
@@ -15,6 +19,48 @@ class Answer(models.Model):
     is_correct=models.BooleanField(default=False)
 
 
+class QuizAttempt(models.Model):
+    """A graded submission of a test by a user."""
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='attempts')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='quiz_attempts')
+    selected_answers = models.JSONField(default=list)
+    score = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    key_version = models.PositiveIntegerField(default=0)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    graded_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['test', 'score'], name='quiz_attempt_test_score_idx'),
+            models.Index(fields=['user', 'test'], name='quiz_attempt_user_test_idx'),
+        ]
 
+    def __str__(self):
+        return f"{self.user} - {self.test.title} ({self.score}/{self.total})"
 
+
+class LeaderboardSnapshot(models.Model):
+    """
+    Persisted copy of a leaderboard, so a cold cache can reload it without
+    aggregating every attempt again.
+    """
+    SCOPE_CHOICES = (
+        ('test', 'Test'),
+        ('course', 'Course'),
+    )
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    # [[user_id, score], ...] in rank order.
+    entries = models.JSONField(default=list)
+    # Highest QuizAttempt id reflected in ``entries``.
+    last_attempt_id = models.PositiveBigIntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('scope', 'object_id')
+
+    def __str__(self):
+        return f"{self.scope} {self.object_id} leaderboard ({len(self.entries)} entries)"
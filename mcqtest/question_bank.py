@@ -0,0 +1,204 @@
+"""
+Bulk question bank import and export.
+
+A bank is a list of questions, each with its answers. On the wire it is
+either nested JSON::
+
+    [{"text": "...", "answers": [{"text": "...", "is_correct": true}, ...]}, ...]
+
+or flat rows with ``question``, ``answer`` and ``is_correct`` columns (CSV,
+or NDJSON objects), where consecutive rows with the same ``question`` text
+belong to one question. Exports use the flat form, so an exported file
+imports back unchanged.
+
+Imports parse and validate the whole file in memory before touching the
+database, then insert every question and answer with two ``bulk_create``
+calls in one transaction. ``bulk_create`` sends no signals, so the test's
+``key_version`` is bumped explicitly.
+"""
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from .grading import bump_key_version
+from .models import Answer, Question
+
+IMPORT_FORMATS = ("json", "csv", "ndjson")
+MAX_QUESTIONS = 5000
+MAX_FILE_SIZE = 5 * 1024 * 1024
+MAX_ANSWERS_PER_QUESTION = 20
+MAX_ERRORS = 50
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "no", "n", "f", ""}
+
+EXPORT_COLUMNS = [
+    ("question", lambda a: a.question.text),
+    ("answer", lambda a: a.text),
+    ("is_correct", lambda a: a.is_correct),
+]
+
+
+class BankError(ValueError):
+    """Raised with the list of problems found in an uploaded bank."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors[:MAX_ERRORS]
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"is_correct must be true or false, got {value!r}")
+
+
+def _group_rows(rows):
+    """Fold flat ``(line, row)`` pairs into nested questions."""
+    questions, errors = [], []
+    for line, row in rows:
+        if not isinstance(row, dict):
+            errors.append(f"line {line}: expected an object")
+            continue
+        question = str(row.get("question") or "").strip()
+        try:
+            answer = {"text": str(row.get("answer") or "").strip(), "is_correct": _flag(row.get("is_correct", ""))}
+        except ValueError as e:
+            errors.append(f"line {line}: {e}")
+            continue
+        if questions and questions[-1]["text"] == question:
+            questions[-1]["answers"].append(answer)
+        else:
+            questions.append({"text": question, "answers": [answer], "where": f"line {line}"})
+    if errors:
+        raise BankError(errors)
+    return questions
+
+
+def parse_bank(content, bank_format):
+    """
+    Decode an uploaded bank into nested question dicts.
+
+    Args:
+        content: File contents as ``str``, or already-parsed JSON data
+        bank_format: One of IMPORT_FORMATS
+
+    Raises:
+        BankError: If the content cannot be decoded
+    """
+    if bank_format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        missing = {"question", "answer", "is_correct"} - set(reader.fieldnames or ())
+        if missing:
+            raise BankError([f"missing CSV columns: {', '.join(sorted(missing))}"])
+        return _group_rows((reader.line_num, row) for row in reader)
+
+    if bank_format == "ndjson":
+        rows = []
+        for line, raw in enumerate(content.splitlines(), start=1):
+            if not raw.strip():
+                continue
+            try:
+                rows.append((line, json.loads(raw)))
+            except json.JSONDecodeError as e:
+                raise BankError([f"line {line}: {e.msg}"])
+        return _group_rows(rows)
+
+    data = content
+    if isinstance(content, str):
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise BankError([f"invalid JSON: {e.msg} (line {e.lineno})"])
+    if isinstance(data, dict):
+        data = data.get("questions")
+    if not isinstance(data, list):
+        raise BankError(["expected a list of questions"])
+    questions, errors = [], []
+    for number, item in enumerate(data, start=1):
+        if not isinstance(item, dict) or not isinstance(item.get("answers"), list):
+            errors.append(f"question {number}: expected an object with an 'answers' list")
+            continue
+        answers = []
+        for answer in item["answers"]:
+            try:
+                answers.append({
+                    "text": str(answer.get("text") or "").strip(),
+                    "is_correct": _flag(answer.get("is_correct", False)),
+                })
+            except (AttributeError, ValueError) as e:
+                errors.append(f"question {number}: {e}")
+        questions.append({"text": str(item.get("text") or "").strip(), "answers": answers, "where": f"question {number}"})
+    if errors:
+        raise BankError(errors)
+    return questions
+
+
+def validate_bank(questions):
+    """
+    Apply the single-question rules to every question at once.
+
+    Question text must be at least 10 characters and answer text at least
+    3, as in QuestionSerializer and AnswerSerializer; each question needs
+    between 2 and MAX_ANSWERS_PER_QUESTION answers with at least one
+    correct.
+
+    Raises:
+        BankError: Listing every problem found
+    """
+    if not questions:
+        raise BankError(["the bank has no questions"])
+    if len(questions) > MAX_QUESTIONS:
+        raise BankError([f"at most {MAX_QUESTIONS} questions can be imported at once"])
+
+    errors = []
+    for question in questions:
+        where = question["where"]
+        if len(question["text"]) < 10:
+            errors.append(f"{where}: text must be at least 10 characters long")
+        answers = question["answers"]
+        if not 2 <= len(answers) <= MAX_ANSWERS_PER_QUESTION:
+            errors.append(f"{where}: needs between 2 and {MAX_ANSWERS_PER_QUESTION} answers")
+        if not any(answer["is_correct"] for answer in answers):
+            errors.append(f"{where}: needs at least one correct answer")
+        if any(len(answer["text"]) < 3 for answer in answers):
+            errors.append(f"{where}: answer text must be at least 3 characters long")
+        if len(errors) >= MAX_ERRORS:
+            break
+    if errors:
+        raise BankError(errors)
+
+
+def import_bank(test, questions):
+    """
+    Insert validated questions and their answers into ``test``.
+
+    Returns:
+        tuple: ``(questions created, answers created)``
+    """
+    with transaction.atomic():
+        created = Question.objects.bulk_create(
+            [Question(test=test, text=question["text"]) for question in questions]
+        )
+        answers = Answer.objects.bulk_create([
+            Answer(question_id=row.pk, text=answer["text"], is_correct=answer["is_correct"])
+            for row, question in zip(created, questions)
+            for answer in question["answers"]
+        ])
+        bump_key_version(test.id)
+    return len(created), len(answers)
+
+
+def export_queryset(test):
+    """Answers of ``test`` in bank order, ready for export_response."""
+    return (
+        Answer.objects.filter(question__test=test)
+        .select_related("question")
+        .order_by("question_id", "id")
+    )
@@ -1,5 +1,5 @@
 from rest_framework import serializers, generics
-from .models import Test, Question, Answer
+from .models import Test, Question, Answer, QuizAttempt
 
 
 class TestSerializer(serializers.ModelSerializer):
@@ -22,6 +22,9 @@ class TestSerializer(serializers.ModelSerializer):
         Returns:
             int: Count of questions for this test
         """
+        # Views annotate question_count; only count when they did not.
+        if hasattr(obj, 'question_count'):
+            return obj.question_count
         return obj.question_set.count()
 
     def validate_title(self, value):
@@ -46,12 +49,19 @@ class TestSerializer(serializers.ModelSerializer):
 
 class AnswerSerializer(serializers.ModelSerializer):
     """
-    Serializer for Answer model with text validation.
+    Serializer for Answer model with text validation. ``is_correct`` is
+    writable but only returned when the context has ``include_correct``.
     """
     class Meta:
         model = Answer
         fields = '__all__'
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not self.context.get('include_correct'):
+            data.pop('is_correct', None)
+        return data
+
     def validate_text(self, value):
         """
         Validate that the answer text is at least 3 characters long.
@@ -99,4 +109,62 @@ class QuestionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Question text must be at least 10 characters long."
             )
-        return value
\ No newline at end of file
+        return value
+
+
+class BundleAnswerSerializer(serializers.ModelSerializer):
+    """
+    Read-only answer for the quiz bundle. ``is_correct`` is dropped unless
+    the serializer context has ``include_correct``.
+    """
+    class Meta:
+        model = Answer
+        fields = ['id', 'text', 'is_correct']
+
+    def to_representation(self, instance):
+        # Nested fields only see the root's context once bound, not in
+        # __init__, so the field is dropped here.
+        data = super().to_representation(instance)
+        if not self.context.get('include_correct'):
+            data.pop('is_correct', None)
+        return data
+
+
+class BundleQuestionSerializer(serializers.ModelSerializer):
+    """
+    Read-only question with its prefetched answers for the quiz bundle.
+    """
+    answers = BundleAnswerSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'text', 'answers']
+
+
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    """
+    Read-only graded attempt. ``stale`` is true when the test changed after
+    grading and the attempt is waiting to be regraded.
+    """
+    stale = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizAttempt
+        fields = [
+            'id', 'test', 'selected_answers', 'score', 'total',
+            'percentage', 'submitted_at', 'graded_at', 'stale',
+        ]
+
+    def get_stale(self, obj):
+        return obj.key_version != obj.test.key_version
+
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    """
+    Validates a quiz submission: the ids of the selected answers.
+    """
+    selected_answers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=True,
+        max_length=1000,
+    )
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .grading import bump_key_version
+from .models import Answer, Question
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    bump_key_version(instance.test_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    test_id = Question.objects.filter(pk=instance.question_id).values_list("test_id", flat=True).first()
+    if test_id is not None:
+        bump_key_version(test_id)
@@ -1,3 +1,319 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from Courses.models import Course
+from accounts.models import CustomUser
+from teacher.models import Instructor
+
+from . import leaderboards
+from .grading import AnswerKey, grade_submissions, regrade_test
+from .models import Answer, LeaderboardSnapshot, Question, QuizAttempt, Test
+
+
+def make_user(username):
+    return CustomUser.objects.create_user(
+        email=f"{username}@example.com", username=username, password="password123"
+    )
+
+
+def make_course(title="Algebra"):
+    instructor = Instructor.objects.create(
+        user=make_user(f"teacher-{title.lower()}"),
+        name="Teacher",
+        phone=9999999999,
+        bio="Bio",
+        experience="5 years",
+        organisation="School",
+    )
+    return Course.objects.create(instructor=instructor, title=title, description="Course", price=100)
+
+
+class AnswerKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.test = Test.objects.create(course=make_course(), title="Quiz")
+        multi = Question.objects.create(test=self.test, text="Pick both primes")
+        self.two = Answer.objects.create(question=multi, text="2", is_correct=True)
+        self.three = Answer.objects.create(question=multi, text="3", is_correct=True)
+        self.four = Answer.objects.create(question=multi, text="4")
+        single = Question.objects.create(test=self.test, text="1 + 1")
+        self.right = Answer.objects.create(question=single, text="2", is_correct=True)
+        self.wrong = Answer.objects.create(question=single, text="3")
+        unanswerable = Question.objects.create(test=self.test, text="No right answer")
+        self.nothing = Answer.objects.create(question=unanswerable, text="None")
+        # The answers above bumped the version through the signals.
+        self.test.refresh_from_db()
+        self.key = AnswerKey.load(self.test.id, self.test.key_version)
+
+    def test_multi_correct_needs_every_correct_answer(self):
+        self.assertEqual(self.key.question_count, 3)
+        self.assertEqual(self.key.score([self.two.id, self.three.id]), 1)
+        self.assertEqual(self.key.score([self.two.id]), 0)
+
+    def test_wrong_answer_fails_the_question(self):
+        self.assertEqual(self.key.score([self.two.id, self.three.id, self.four.id]), 0)
+        self.assertEqual(self.key.score([self.right.id, self.wrong.id]), 0)
+
+    def test_score_counts_each_correct_question(self):
+        self.assertEqual(self.key.score([self.two.id, self.three.id, self.right.id]), 2)
+
+    def test_duplicate_and_foreign_ids_are_ignored(self):
+        other = Test.objects.create(course=self.test.course, title="Other")
+        foreign = Answer.objects.create(
+            question=Question.objects.create(test=other, text="Other"), text="x", is_correct=True
+        )
+        self.assertEqual(self.key.score([self.right.id, self.right.id, foreign.id, 10 ** 9]), 1)
+
+    def test_question_without_correct_answer_never_scores(self):
+        self.assertEqual(self.key.score([self.nothing.id]), 0)
+        self.assertEqual(self.key.score([]), 0)
+
+    def test_regrade_applies_the_new_key(self):
+        student = make_user("student")
+        attempt, = grade_submissions(self.test, [(student.id, [self.two.id, self.three.id, self.right.id])])
+        self.assertEqual(attempt.score, 2)
+        self.assertEqual(attempt.percentage, Decimal("66.67"))
+
+        self.four.is_correct = True
+        self.four.save()
+        self.assertEqual(regrade_test(self.test), 1)
+
+        attempt.refresh_from_db()
+        self.test.refresh_from_db()
+        self.assertEqual(attempt.score, 1)
+        self.assertEqual(attempt.percentage, Decimal("33.33"))
+        self.assertEqual(attempt.key_version, self.test.key_version)
+        self.assertEqual(leaderboards.rank("test", self.test.id, student.id), (1, 1))
+        # Nothing left to regrade.
+        self.assertEqual(regrade_test(self.test), 0)
+
+
+class QuestionEditPermissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        course = make_course()
+        self.teacher = course.instructor.user
+        self.test = Test.objects.create(course=course, title="Quiz")
+        self.question = Question.objects.create(test=self.test, text="Pick the prime")
+        self.answer = Answer.objects.create(question=self.question, text="Two", is_correct=True)
+        self.test.refresh_from_db()
+        self.client = APIClient()
+
+    def test_student_is_refused(self):
+        self.client.force_authenticate(make_user("student"))
+
+        response = self.client.put(f"/mcq/question/{self.question.id}/", {}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("answers", response.data)
+        response = self.client.post(
+            "/mcq/answer/create/",
+            {"question": self.question.id, "text": "Three", "is_correct": True},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            "/mcq/question/create/", {"test": self.test.id, "text": "Another question"}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.assertEqual(Answer.objects.count(), 1)
+        self.assertEqual(Question.objects.count(), 1)
+        version = self.test.key_version
+        self.test.refresh_from_db()
+        self.assertEqual(self.test.key_version, version)
+
+    def test_instructor_sees_the_answer_key(self):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.put(f"/mcq/question/{self.question.id}/", {}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["answers"][0]["is_correct"])
+
+        response = self.client.post(
+            "/mcq/answer/create/",
+            {"question": self.question.id, "text": "Three", "is_correct": False},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data["is_correct"])
+
+class TestBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        course = make_course()
+        self.teacher = course.instructor.user
+        self.test = Test.objects.create(course=course, title="Quiz")
+        for i in range(3):
+            question = Question.objects.create(test=self.test, text=f"Question number {i}")
+            Answer.objects.create(question=question, text="Right", is_correct=True)
+            Answer.objects.create(question=question, text="Wrong")
+        self.url = f"/mcq/tests/{self.test.id}/bundle/"
+        self.client = APIClient()
+
+    def answers(self, response):
+        return [answer for question in response.data["questions"] for answer in question["answers"]]
+
+    def test_student_never_sees_is_correct(self):
+        self.client.force_authenticate(make_user("student"))
+        response = self.client.get(self.url, {"include_correct": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["questions"]), 3)
+        self.assertTrue(all("is_correct" not in answer for answer in self.answers(response)))
+
+    def test_instructor_can_ask_for_is_correct(self):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get(self.url, {"include_correct": "true"})
+        self.assertEqual(
+            [answer["is_correct"] for answer in self.answers(response)], [True, False] * 3
+        )
+        response = self.client.get(self.url)
+        self.assertTrue(all("is_correct" not in answer for answer in self.answers(response)))
+
+    def test_query_count_does_not_grow_with_questions(self):
+        self.client.force_authenticate(make_user("student"))
+        # The test, its questions and their answers.
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        question = Question.objects.create(test=self.test, text="One more question")
+        Answer.objects.create(question=question, text="Right", is_correct=True)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        leaderboards._store = leaderboards.LocalStore()
+        self.addCleanup(setattr, leaderboards, "_store", None)
+        self.course = make_course()
+        self.test = Test.objects.create(course=self.course, title="Quiz")
+
+    def attempt(self, user, score, test=None, **kwargs):
+        return QuizAttempt.objects.create(test=test or self.test, user=user, score=score, total=10, **kwargs)
+
+    def test_ties_share_a_rank(self):
+        users = [make_user(f"user{i}") for i in range(4)]
+        for user, score in zip(users, (5, 7, 5, 2)):
+            self.attempt(user, score)
+
+        self.assertEqual(
+            leaderboards.top("test", self.test.id, 10),
+            [(1, users[1].id, 7), (2, users[0].id, 5), (2, users[2].id, 5), (4, users[3].id, 2)],
+        )
+        self.assertEqual(leaderboards.rank("test", self.test.id, users[2].id), (2, 5))
+        self.assertEqual(leaderboards.rank("test", self.test.id, users[3].id), (4, 2))
+        self.assertEqual(leaderboards.participants("test", self.test.id), 4)
+
+    def test_best_attempt_counts(self):
+        user = make_user("student")
+        for score in (3, 8, 6):
+            self.attempt(user, score)
+        self.assertEqual(leaderboards.rank("test", self.test.id, user.id), (1, 8))
+
+    def test_attempt_committed_out_of_order_is_applied(self):
+        first, second = make_user("first"), make_user("second")
+        placeholder = self.attempt(make_user("placeholder"), 1)
+        self.attempt(second, 3)
+        lower_id = placeholder.id
+        placeholder.delete()
+        self.assertEqual(leaderboards.top("test", self.test.id, 10), [(1, second.id, 3)])
+
+        # Took the lower id but committed after the board was loaded.
+        late = self.attempt(first, 9, id=lower_id)
+        leaderboards.record_attempts([late])
+        self.assertEqual(leaderboards.rank("test", self.test.id, first.id), (1, 9))
+        self.assertEqual(leaderboards.rank("test", self.test.id, second.id), (2, 3))
+
+    def test_course_board_sums_best_scores_idempotently(self):
+        other = Test.objects.create(course=self.course, title="Quiz 2")
+        user = make_user("student")
+        attempts = [self.attempt(user, 3), self.attempt(user, 5), self.attempt(user, 4, test=other)]
+
+        leaderboards.record_attempts(attempts)
+        leaderboards.record_attempts(attempts)
+        self.assertEqual(leaderboards.rank("course", self.course.id, user.id), (1, 9))
+        self.assertEqual(leaderboards.rank("test", other.id, user.id), (1, 4))
+
+    def test_cold_board_reloads_from_snapshot(self):
+        user = make_user("student")
+        self.attempt(user, 4)
+        QuizAttempt.objects.update(submitted_at=now() - timedelta(minutes=5))
+        leaderboards.top("test", self.test.id, 10)
+        snapshot = LeaderboardSnapshot.objects.get(scope="test", object_id=self.test.id)
+        self.assertEqual(snapshot.entries, [[user.id, 4]])
+
+        leaderboards._store = leaderboards.LocalStore()
+        # The snapshot and a check for newer attempts, no aggregate.
+        with self.assertNumQueries(2):
+            self.assertEqual(leaderboards.rank("test", self.test.id, user.id), (1, 4))
+
+
+    def test_local_board_expires(self):
+        store = leaderboards.LocalStore(ttl=60)
+        store.replace("board", {1: 5})
+        self.assertTrue(store.is_loaded("board"))
+        store._expires["board"] = 0
+        self.assertFalse(store.is_loaded("board"))
+        self.assertIsNone(store.rank("board", 1))
+
+    def test_expired_board_sees_another_process_regrade(self):
+        store = leaderboards._store = leaderboards.LocalStore(ttl=60)
+        user = make_user("student")
+        self.attempt(user, 8)
+        self.assertEqual(leaderboards.rank("test", self.test.id, user.id), (1, 8))
+
+        # Lowered by a regrade in another process, which rebuilt its own board.
+        QuizAttempt.objects.update(score=2)
+        leaderboards._persist("test", self.test.id, {user.id: 2}, QuizAttempt.objects.get().id)
+        self.assertEqual(leaderboards.rank("test", self.test.id, user.id), (1, 8))
+        store._expires[leaderboards._key("test", self.test.id)] = 0
+        self.assertEqual(leaderboards.rank("test", self.test.id, user.id), (1, 2))
+
+class ConcurrentLeaderboardTests(TransactionTestCase):
+    def setUp(self):
+        leaderboards._store = leaderboards.LocalStore()
+        self.addCleanup(setattr, leaderboards, "_store", None)
+
+    def test_concurrent_updates_match_the_aggregate(self):
+        course = make_course()
+        tests = [Test.objects.create(course=course, title=f"Quiz {i}") for i in range(2)]
+        # Load the boards before any attempt exists.
+        for test in tests:
+            leaderboards.top("test", test.id, 10)
+        leaderboards.top("course", course.id, 10)
+
+        users = [make_user(f"user{i}") for i in range(6)]
+        attempts = [
+            QuizAttempt.objects.create(test=test, user=user, score=(i * 7 + j * 3) % 10, total=10)
+            for i, user in enumerate(users)
+            for j, test in enumerate(tests)
+            for _ in range(2)
+        ]
+
+        barrier = threading.Barrier(len(attempts))
+        errors = []
+
+        def apply(attempt):
+            try:
+                barrier.wait()
+                leaderboards.record_attempts([attempt])
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=apply, args=(attempt,)) for attempt in attempts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for scope, object_id in [("test", tests[0].id), ("test", tests[1].id), ("course", course.id)]:
+            expected, _ = leaderboards._aggregate(scope, object_id)
+            board = {user_id: score for _, user_id, score in leaderboards.top(scope, object_id, 100)}
+            self.assertEqual(board, expected)
@@ -3,6 +3,13 @@ from .views import *
 
 urlpatterns = [
     path('tests/<int:pk>/', TestView.as_view(), name='test-list'),
+    path('tests/<int:pk>/bundle/', TestBundleView.as_view(), name='test-bundle'),
+    path('tests/<int:pk>/attempts/', QuizAttemptView.as_view(), name='quiz-attempts'),
+    path('tests/<int:pk>/regrade/', QuizRegradeView.as_view(), name='quiz-regrade'),
+    path('tests/<int:pk>/leaderboard/', TestLeaderboardView.as_view(), name='test-leaderboard'),
+    path('courses/<int:pk>/leaderboard/', CourseLeaderboardView.as_view(), name='course-leaderboard'),
+    path('tests/<int:pk>/questions/import/', QuestionBankImportView.as_view(), name='question-bank-import'),
+    path('tests/<int:pk>/questions/export/', QuestionBankExportView.as_view(), name='question-bank-export'),
     path('test/create/', TestCreateView.as_view(), name='test-create'),
     path('test/<int:pk>/', TestCreateView.as_view(), name='test-update'),
     path('questions/<int:testId>/', QuestionView.as_view(), name='question-list'),
@@ -4,10 +4,26 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from django.db.models import Count
 
-from .models import Test, Question, Answer
-from .serializers import TestSerializer, QuestionSerializer, AnswerSerializer
+from .models import Test, Question, Answer, QuizAttempt
+from .serializers import (
+    TestSerializer,
+    QuestionSerializer,
+    AnswerSerializer,
+    BundleQuestionSerializer,
+    QuizAttemptSerializer,
+    QuizSubmissionSerializer,
+)
+from .grading import grade_submissions, regrade_test
+from . import question_bank
+from . import leaderboards
+from backend.exports import EXPORT_FORMATS, export_response
 from teacher.models import Instructor
-from Courses.models import Course
+from Courses.models import Course, Enrollment
+from accounts.models import CustomUser
+
+
+def _is_course_instructor(request, test):
+    return request.user.is_staff or test.course.instructor_id == getattr(request.instructor, 'id', None)
 
 
 class TestView(APIView):
@@ -38,6 +54,352 @@ class TestView(APIView):
             )
 
 
+class TestBundleView(APIView):
+    """API endpoint returning a test with all its questions and answers."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Retrieve a test, its questions and their answers in three queries.
+
+        Args:
+            request: HTTP request object. ``include_correct=true`` adds
+                ``is_correct`` to answers for the course instructor or staff
+            pk: Primary key of the test
+
+        Returns:
+            Response: Test data with nested questions or error message
+        """
+        try:
+            test = Test.objects.select_related('course').annotate(
+                question_count=Count('question')
+            ).get(pk=pk)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        include_correct = (
+            request.query_params.get('include_correct', '').lower() in ('true', '1')
+            and _is_course_instructor(request, test)
+        )
+        questions = (
+            Question.objects.filter(test=test)
+            .prefetch_related('answers')
+            .order_by('id')
+        )
+
+        data = TestSerializer(test).data
+        data['questions'] = BundleQuestionSerializer(
+            questions,
+            many=True,
+            context={'include_correct': include_correct}
+        ).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class QuizAttemptView(APIView):
+    """API endpoint for submitting a test and listing one's own attempts."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        List the requesting user's attempts at a test, newest first.
+
+        Args:
+            request: HTTP request object
+            pk: Primary key of the test
+
+        Returns:
+            Response: List of graded attempts
+        """
+        attempts = (
+            QuizAttempt.objects.filter(test_id=pk, user=request.user)
+            .select_related('test')
+            .order_by('-submitted_at')
+        )
+        serializer = QuizAttemptSerializer(attempts, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def post(self, request, pk):
+        """
+        Grade a submission against the test's answer key and store it.
+
+        Args:
+            request: HTTP request object with ``selected_answers``, a list
+                of answer ids
+            pk: Primary key of the test
+
+        Returns:
+            Response: The graded attempt or error message
+        """
+        try:
+            test = Test.objects.select_related('course').get(pk=pk)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        enrolled = Enrollment.objects.filter(course_id=test.course_id, user=request.user).exists()
+        if not (enrolled or _is_course_instructor(request, test)):
+            return Response(
+                {"error": "You are not enrolled in this course"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = QuizSubmissionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        [attempt] = grade_submissions(
+            test,
+            [(request.user.id, serializer.validated_data['selected_answers'])]
+        )
+        return Response(
+            QuizAttemptSerializer(attempt).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class QuizRegradeView(APIView):
+    """API endpoint for regrading a test's attempts after it was edited."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        Re-score every attempt graded against an older version of the test.
+
+        Args:
+            request: HTTP request object
+            pk: Primary key of the test
+
+        Returns:
+            Response: Number of attempts regraded or error message
+        """
+        try:
+            test = Test.objects.select_related('course').get(pk=pk)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not _is_course_instructor(request, test):
+            return Response(
+                {"error": "Only the course instructor can regrade this test"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        regraded = regrade_test(test)
+        return Response(
+            {"regraded": regraded, "key_version": test.key_version},
+            status=status.HTTP_200_OK
+        )
+
+
+class QuestionBankImportView(APIView):
+    """API endpoint for adding a whole question bank to a test at once."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        Validate an uploaded bank in full, then insert all its questions and
+        answers in one transaction.
+
+        Args:
+            request: HTTP request object with either a ``file`` upload
+                (.json, .csv or .ndjson; ``fmt`` overrides the extension)
+                or a JSON body with a ``questions`` list
+            pk: Primary key of the test
+
+        Returns:
+            Response: Created counts, or the list of validation errors
+        """
+        try:
+            test = Test.objects.select_related('course').get(pk=pk)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not _is_course_instructor(request, test):
+            return Response(
+                {"error": "Only the course instructor can import questions"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            bank_format = request.query_params.get('fmt') or upload.name.rsplit('.', 1)[-1].lower()
+            if bank_format not in question_bank.IMPORT_FORMATS:
+                return Response(
+                    {"error": f"fmt must be one of: {', '.join(question_bank.IMPORT_FORMATS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if upload.size > question_bank.MAX_FILE_SIZE:
+                return Response(
+                    {"error": "File is too large"},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            try:
+                content = upload.read().decode('utf-8-sig')
+            except UnicodeDecodeError:
+                return Response(
+                    {"error": "File must be UTF-8 encoded"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            bank_format, content = 'json', request.data
+
+        try:
+            questions = question_bank.parse_bank(content, bank_format)
+            question_bank.validate_bank(questions)
+        except question_bank.BankError as e:
+            return Response(
+                {"errors": e.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        question_count, answer_count = question_bank.import_bank(test, questions)
+        return Response(
+            {"questions_created": question_count, "answers_created": answer_count},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class QuestionBankExportView(APIView):
+    """API endpoint for streaming a test's questions and answers."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Stream the test's bank, one row per answer, in a form the import
+        endpoint accepts.
+
+        Query params:
+            fmt: "csv" (default) or "ndjson"
+
+        Returns:
+            StreamingHttpResponse: Export file, or an error response
+        """
+        export_format = request.query_params.get('fmt', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"fmt must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            test = Test.objects.select_related('course').get(pk=pk)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not _is_course_instructor(request, test):
+            return Response(
+                {"error": "Only the course instructor can export questions"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return export_response(
+            question_bank.export_queryset(test),
+            question_bank.EXPORT_COLUMNS,
+            export_format,
+            f"test-{test.pk}-questions"
+        )
+
+
+def _leaderboard_response(request, scope, course, object_id):
+    """Top-N rows plus the requesting user's rank for one board."""
+    enrolled = Enrollment.objects.filter(course=course, user=request.user).exists()
+    if not (enrolled or request.user.is_staff or course.instructor_id == getattr(request.instructor, 'id', None)):
+        return Response(
+            {"error": "You are not enrolled in this course"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    try:
+        limit = int(request.query_params.get('limit', leaderboards.DEFAULT_LIMIT))
+        limit = min(max(limit, 1), leaderboards.MAX_LIMIT)
+    except ValueError:
+        return Response(
+            {"error": "limit must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    top = leaderboards.top(scope, object_id, limit)
+    usernames = dict(
+        CustomUser.objects.filter(id__in=[user_id for _, user_id, _ in top])
+        .values_list('id', 'username')
+    )
+    mine = leaderboards.rank(scope, object_id, request.user.id)
+    return Response(
+        {
+            "participants": leaderboards.participants(scope, object_id),
+            "results": [
+                {"rank": rank, "user_id": user_id, "username": usernames.get(user_id), "score": score}
+                for rank, user_id, score in top
+            ],
+            "me": {"rank": mine[0], "score": mine[1]} if mine else None,
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+class TestLeaderboardView(APIView):
+    """API endpoint for the leaderboard of a single test."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Rank users by their best score on the test.
+
+        Query params:
+            limit: Number of top rows, default 10, at most 100
+
+        Returns:
+            Response: Participant count, top rows and the caller's rank
+        """
+        try:
+            test = Test.objects.select_related('course').get(pk=pk)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return _leaderboard_response(request, 'test', test.course, test.pk)
+
+
+class CourseLeaderboardView(APIView):
+    """API endpoint for the leaderboard of all tests in a course."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Rank users by the sum of their best scores over the course's tests.
+
+        Query params:
+            limit: Number of top rows, default 10, at most 100
+
+        Returns:
+            Response: Participant count, top rows and the caller's rank
+        """
+        try:
+            course = Course.objects.get(pk=pk)
+        except Course.DoesNotExist:
+            return Response(
+                {"error": "Course not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return _leaderboard_response(request, 'course', course, course.pk)
+
+
 class TestCreateView(APIView):
     """API endpoint for creating and updating tests."""
     permission_classes = [IsAuthenticated]
@@ -126,9 +488,19 @@ class QuestionView(APIView):
             Response: List of questions or error message
         """
         try:
-            questions = Question.objects.filter(test_id=testId)
-            serializer = QuestionSerializer(questions, many=True)
+            test = Test.objects.select_related('course').get(pk=testId)
+            questions = Question.objects.filter(test=test).prefetch_related('answers')
+            serializer = QuestionSerializer(
+                questions,
+                many=True,
+                context={'include_correct': _is_course_instructor(request, test)}
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
+        except Test.DoesNotExist:
+            return Response(
+                {"error": "Test not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -152,15 +524,20 @@ class QuestionCreateView(APIView):
         """
         try:
             serializer = QuestionSerializer(data=request.data)
-            if serializer.is_valid():
-                serializer.save()
+            if not serializer.is_valid():
                 return Response(
-                    serializer.data,
-                    status=status.HTTP_201_CREATED
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not _is_course_instructor(request, serializer.validated_data['test']):
+                return Response(
+                    {"error": "Only the course instructor can edit this test"},
+                    status=status.HTTP_403_FORBIDDEN
                 )
+            question = serializer.save()
             return Response(
-                serializer.errors,
-                status=status.HTTP_400_BAD_REQUEST
+                QuestionSerializer(question, context={'include_correct': True}).data,
+                status=status.HTTP_201_CREATED
             )
         except Exception as e:
             return Response(
@@ -180,13 +557,26 @@ class QuestionCreateView(APIView):
             Response: Updated question data or error message
         """
         try:
-            question = Question.objects.get(pk=pk)
+            question = Question.objects.select_related('test__course').get(pk=pk)
+            if not _is_course_instructor(request, question.test):
+                return Response(
+                    {"error": "Only the course instructor can edit this test"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             serializer = QuestionSerializer(
                 question,
                 data=request.data,
-                partial=True
+                partial=True,
+                context={'include_correct': True}
             )
             if serializer.is_valid():
+                # Moving the question needs the new test's instructor too.
+                test = serializer.validated_data.get('test', question.test)
+                if not _is_course_instructor(request, test):
+                    return Response(
+                        {"error": "Only the course instructor can edit this test"},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
                 serializer.save()
                 return Response(
                     serializer.data,
@@ -224,9 +614,19 @@ class AnswerView(APIView):
             Response: List of answers or error message
         """
         try:
-            answers = Answer.objects.filter(question_id=questionId)
-            serializer = AnswerSerializer(answers, many=True)
+            question = Question.objects.select_related('test__course').get(pk=questionId)
+            answers = Answer.objects.filter(question=question)
+            serializer = AnswerSerializer(
+                answers,
+                many=True,
+                context={'include_correct': _is_course_instructor(request, question.test)}
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
+        except Question.DoesNotExist:
+            return Response(
+                {"error": "Question not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -250,15 +650,20 @@ class AnswerCreateView(APIView):
         """
         try:
             serializer = AnswerSerializer(data=request.data)
-            if serializer.is_valid():
-                serializer.save()
+            if not serializer.is_valid():
                 return Response(
-                    serializer.data,
-                    status=status.HTTP_201_CREATED
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST
                 )
+            if not _is_course_instructor(request, serializer.validated_data['question'].test):
+                return Response(
+                    {"error": "Only the course instructor can edit this test"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            answer = serializer.save()
             return Response(
-                serializer.errors,
-                status=status.HTTP_400_BAD_REQUEST
+                AnswerSerializer(answer, context={'include_correct': True}).data,
+                status=status.HTTP_201_CREATED
             )
         except Exception as e:
             return Response(
@@ -278,13 +683,26 @@ class AnswerCreateView(APIView):
             Response: Updated answer data or error message
         """
         try:
-            answer = Answer.objects.get(pk=pk)
+            answer = Answer.objects.select_related('question__test__course').get(pk=pk)
+            if not _is_course_instructor(request, answer.question.test):
+                return Response(
+                    {"error": "Only the course instructor can edit this test"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             serializer = AnswerSerializer(
                 answer,
                 data=request.data,
-                partial=True
+                partial=True,
+                context={'include_correct': True}
             )
             if serializer.is_valid():
+                # Moving the answer needs the new test's instructor too.
+                question = serializer.validated_data.get('question', answer.question)
+                if not _is_course_instructor(request, question.test):
+                    return Response(
+                        {"error": "Only the course instructor can edit this test"},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
                 serializer.save()
                 return Response(
                     serializer.data,
@@ -317,7 +735,12 @@ class AnswerCreateView(APIView):
             Response: Success status or error message
         """
         try:
-            answer = Answer.objects.get(pk=pk)
+            answer = Answer.objects.select_related('question__test__course').get(pk=pk)
+            if not _is_course_instructor(request, answer.question.test):
+                return Response(
+                    {"error": "Only the course instructor can edit this test"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             answer.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Answer.DoesNotExist:
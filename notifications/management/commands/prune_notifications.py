@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from notifications import retention
+
+
+class Command(BaseCommand):
+    help = "Expire notifications past their per-kind retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows deleted per statement when falling back to batched deletes.",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Monthly partitions to pre-create after the current month (PostgreSQL only).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be removed without deleting anything.",
+        )
+
+    def handle(self, *args, **options):
+        partitioned = retention.uses_partitions()
+
+        if options["dry_run"]:
+            if partitioned:
+                for name in retention.expired_partitions():
+                    self.stdout.write(f"Would drop partition {name}")
+            for kind, count in retention.count_expired().items():
+                self.stdout.write(f"Would delete {count} '{kind}' notifications")
+            return
+
+        if partitioned:
+            for name in retention.ensure_partitions(options["months_ahead"]):
+                self.stdout.write(f"Created partition {name}")
+
+            expired = retention.expired_partitions()
+            retention.drop_partitions(expired)
+            for name in expired:
+                self.stdout.write(f"Dropped partition {name}")
+
+        def report(kind, deleted):
+            self.stdout.write(f"  {deleted} deleted so far ({kind})")
+
+        deleted = retention.delete_expired(options["batch_size"], progress=report)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired notifications."))
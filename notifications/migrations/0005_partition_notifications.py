@@ -0,0 +1,70 @@
+# Converts notifications_notification into a table range-partitioned by
+# month on PostgreSQL so retention can drop whole months at once. Other
+# database backends keep the plain table and use batched deletes instead.
+
+from dateutil.relativedelta import relativedelta
+from django.db import migrations
+
+
+TABLE = 'notifications_notification'
+
+
+def partition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    execute = schema_editor.execute
+    execute(f'ALTER TABLE "{TABLE}" RENAME TO "{TABLE}_legacy"')
+    execute(
+        f'CREATE TABLE "{TABLE}" (LIKE "{TABLE}_legacy" INCLUDING DEFAULTS) '
+        f'PARTITION BY RANGE ("timestamp")'
+    )
+    execute(f'CREATE SEQUENCE "{TABLE}_pid_seq" OWNED BY "{TABLE}"."id"')
+    execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN "id" SET DEFAULT nextval(\'"{TABLE}_pid_seq"\')')
+    execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY ("id", "timestamp")')
+    execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT DISTINCT date_trunc(\'month\', "timestamp")::date FROM "{TABLE}_legacy"'
+        )
+        months = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT date_trunc('month', now())::date")
+        current = cursor.fetchone()[0]
+    months.update(current + relativedelta(months=offset) for offset in range(4))
+
+    for month in sorted(months):
+        upper = month + relativedelta(months=1)
+        execute(
+            f'CREATE TABLE "{TABLE}_p{month:%Y%m}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+
+    execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{TABLE}_legacy"')
+    execute(
+        f'SELECT setval(\'"{TABLE}_pid_seq"\', '
+        f'COALESCE((SELECT MAX("id") FROM "{TABLE}"), 0) + 1, false)'
+    )
+    execute(f'DROP TABLE "{TABLE}_legacy"')
+
+    execute(f'CREATE INDEX "{TABLE}_recipient_id_part" ON "{TABLE}" ("recipient_id")')
+    execute(f'CREATE INDEX "{TABLE}_sender_id_part" ON "{TABLE}" ("sender_id")')
+    execute(f'CREATE INDEX "notif_kind_ts_idx" ON "{TABLE}" ("kind", "timestamp")')
+    for column in ('recipient_id', 'sender_id'):
+        execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_{column}_part_fk" '
+            f'FOREIGN KEY ("{column}") REFERENCES "accounts_customuser" ("id") '
+            f'DEFERRABLE INITIALLY DEFERRED'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_kind_and_more'),
+        ('accounts', '0004_alter_customuser_is_active'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, migrations.RunPython.noop),
+    ]
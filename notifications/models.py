@@ -32,7 +32,12 @@ class CustomManager(models.Manager):
 
 
 class Notification(models.Model):
-   
+    KIND_CHOICES = (
+        ('general', 'General'),
+        ('course', 'Course'),
+        ('system', 'System'),
+    )
+
     sender = models.ForeignKey(
         CustomUser,
         on_delete=models.CASCADE,
@@ -44,6 +49,7 @@ class Notification(models.Model):
         related_name="received_notifications"
     )
     message = models.TextField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='general')
     is_read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
     
@@ -56,4 +62,7 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-timestamp']
         verbose_name = 'Notification'
-        verbose_name_plural = 'Notifications'
\ No newline at end of file
+        verbose_name_plural = 'Notifications'
+        indexes = [
+            models.Index(fields=['kind', 'timestamp'], name='notif_kind_ts_idx'),
+        ]
\ No newline at end of file
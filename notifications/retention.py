@@ -0,0 +1,164 @@
+"""
+Retention for notifications.
+
+Each notification kind has its own TTL (``NOTIFICATION_RETENTION_DAYS``).
+On PostgreSQL the table is range-partitioned by month, so a month that is
+past every kind's TTL is removed with a partition drop. Anything left over
+(kinds with a shorter TTL, or every row on SQLite) is deleted in primary-key
+batches so no single statement holds a long lock.
+"""
+import re
+from datetime import date, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from .models import Notification
+
+
+TABLE = Notification._meta.db_table
+# Catch-all partition created by migration 0005.
+DEFAULT_PARTITION = f"{TABLE}_default"
+DEFAULT_RETENTION_DAYS = 90
+PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def retention_days(kind):
+    """Return the TTL in days configured for a notification kind."""
+    config = getattr(settings, "NOTIFICATION_RETENTION_DAYS", {})
+    return int(config.get(kind, config.get("default", DEFAULT_RETENTION_DAYS)))
+
+
+def expiry_cutoffs():
+    """Map every notification kind to the timestamp older rows expire at."""
+    current = now()
+    return {
+        kind: current - timedelta(days=retention_days(kind))
+        for kind, _ in Notification.KIND_CHOICES
+    }
+
+
+def uses_partitions():
+    return connection.vendor == "postgresql"
+
+
+def ensure_partitions(months_ahead=3):
+    """
+    Create the monthly partitions for the current month and the next
+    ``months_ahead`` months. Returns the names of partitions created.
+    """
+    start = now().date().replace(day=1)
+    existing = {name for name, _ in list_partitions()}
+    created = []
+
+    for offset in range(months_ahead + 1):
+        lower = start + relativedelta(months=offset)
+        name = f"{TABLE}_p{lower:%Y%m}"
+        if name not in existing:
+            create_partition(name, lower, lower + relativedelta(months=1))
+            created.append(name)
+    return created
+
+
+def create_partition(name, lower, upper):
+    """
+    Create the partition ``name`` for ``[lower, upper)``.
+
+    PostgreSQL refuses to create a partition while the DEFAULT partition
+    holds rows in its range, which happens once a run was missed and rows
+    of the month landed there. In that case the default partition is
+    detached, the new partition created, the rows moved into it, and the
+    default re-attached, all in one transaction.
+    """
+    bounds = [lower.isoformat(), upper.isoformat()]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" '
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s)',
+            bounds,
+        )
+        stranded = cursor.fetchone()[0]
+        if stranded:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{DEFAULT_PARTITION}"')
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+        )
+        if stranded:
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+                f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+                f'INSERT INTO "{name}" SELECT * FROM moved',
+                bounds,
+            )
+            cursor.execute(f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT')
+
+
+def list_partitions():
+    """Return ``(name, month_start)`` for every monthly partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+            partitions.append((name, date(year, month, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def expired_partitions():
+    """Partitions whose whole month is past the longest TTL of any kind."""
+    oldest_cutoff = min(expiry_cutoffs().values()).date()
+    return [
+        name for name, month in list_partitions()
+        if month + relativedelta(months=1) <= oldest_cutoff
+    ]
+
+
+def drop_partitions(names):
+    """Detach and drop the given partitions."""
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+
+
+def delete_expired(batch_size=5000, progress=None):
+    """
+    Delete expired notifications kind by kind in batches of ``batch_size``
+    primary keys. ``progress(kind, deleted_so_far)`` is called after each batch.
+    """
+    total = 0
+    for kind, cutoff in expiry_cutoffs().items():
+        expired = Notification.objects.filter(kind=kind, timestamp__lt=cutoff).order_by()
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = Notification.objects.filter(id__in=ids).delete()
+            total += deleted
+            if progress:
+                progress(kind, total)
+    return total
+
+
+def count_expired():
+    """Number of expired notifications per kind, used for dry runs."""
+    return {
+        kind: Notification.objects.filter(kind=kind, timestamp__lt=cutoff).count()
+        for kind, cutoff in expiry_cutoffs().items()
+    }
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment, MonthlyCourseStats, InstructorPayout
+from .models import Payment, MonthlyCourseStats, InstructorPayout, PaymentEvent, RevenueEntry, DailyRevenueFact
 
 
 @admin.register(Payment)
@@ -19,7 +19,28 @@ class MonthlyCourseStatsAdmin(admin.ModelAdmin):
 
 @admin.register(InstructorPayout)
 class InstructorPayoutAdmin(admin.ModelAdmin):
-    list_display = ('instructor', 'month', 'total_amount', 'payout_method', 'is_paid', 'paid_on')
+    list_display = ('instructor', 'month', 'adjustment', 'total_amount', 'payout_method', 'is_paid', 'paid_on')
     list_filter = ('month', 'is_paid')
     search_fields = ('instructor__user__username', 'payout_reference')
 
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'event_type', 'status', 'received_at', 'processed_at')
+    list_filter = ('status', 'event_type')
+    search_fields = ('event_id',)
+    readonly_fields = ('received_at', 'processed_at')
+
+
+@admin.register(RevenueEntry)
+class RevenueEntryAdmin(admin.ModelAdmin):
+    list_display = ('payment', 'course', 'instructor', 'amount', 'occurred_at')
+    search_fields = ('payment__transaction_id', 'course__title')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(DailyRevenueFact)
+class DailyRevenueFactAdmin(admin.ModelAdmin):
+    list_display = ('date', 'course', 'instructor', 'enrollments', 'gross_amount')
+    list_filter = ('date',)
+    search_fields = ('course__title',)
@@ -0,0 +1,172 @@
+"""
+Razorpay gateway client.
+
+Wraps ``razorpay.Client`` with a pooled HTTP session, per-call timeouts,
+retries with jittered exponential backoff and a circuit breaker, so a slow
+or failing gateway cannot tie up every worker. Async variants run the
+blocking calls in a worker thread and are safe to await from async views.
+"""
+import random
+import threading
+import time
+
+import razorpay
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class GatewayUnavailable(Exception):
+    """Raised when the gateway is failing or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` failures in a row and rejects calls for
+    ``reset_timeout`` seconds. After that a single trial call is let through
+    (half-open); success closes the breaker, failure opens it again.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self):
+        """Return True if a call may be attempted right now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight:
+                return False
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    razorpay.errors.ServerError,
+)
+
+
+class RazorpayGateway:
+    """Razorpay client with pooling, timeouts, retries and a circuit breaker."""
+
+    def __init__(self, key_id, key_secret, base_url=None, timeout=5.0,
+                 max_retries=2, backoff=0.2, pool_size=20, breaker=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        options = {"base_url": base_url} if base_url else {}
+        self.client = razorpay.Client(session=session, auth=(key_id, key_secret), **options)
+
+    def _call(self, func, *args):
+        """Call the gateway, retrying transient failures with full jitter."""
+        if not self.breaker.allow():
+            raise GatewayUnavailable("Payment gateway is temporarily unavailable")
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = func(*args, timeout=self.timeout)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise GatewayUnavailable(str(e)) from e
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            except Exception:
+                # The gateway answered (e.g. a 4xx), so it is healthy.
+                self.breaker.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def create_order(self, data):
+        """Create a gateway order. Raises GatewayUnavailable on failure."""
+        return self._call(self.client.order.create, data)
+
+    def fetch_payment(self, payment_id):
+        """Fetch a payment entity. Raises GatewayUnavailable on failure."""
+        return self._call(self.client.payment.fetch, payment_id)
+
+    def verify_payment_signature(self, params):
+        """
+        Check a checkout signature. This is a local HMAC and never touches
+        the network. Raises razorpay.errors.SignatureVerificationError.
+        """
+        return self.client.utility.verify_payment_signature(params)
+
+    def verify_webhook_signature(self, body, signature):
+        """
+        Check a webhook body against its X-Razorpay-Signature header.
+        Raises razorpay.errors.SignatureVerificationError.
+        """
+        return self.client.utility.verify_webhook_signature(
+            body, signature, settings.RAZORPAY_WEBHOOK_SECRET
+        )
+
+    async def acreate_order(self, data):
+        return await sync_to_async(self.create_order, thread_sensitive=False)(data)
+
+    async def averify_payment_signature(self, params):
+        return await sync_to_async(
+            self.verify_payment_signature, thread_sensitive=False
+        )(params)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Return the process-wide gateway, building it on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = RazorpayGateway(
+                    settings.RAZORPAY_KEY_ID,
+                    settings.RAZORPAY_KEY_SECRET,
+                    base_url=settings.RAZORPAY_BASE_URL,
+                    timeout=settings.RAZORPAY_TIMEOUT,
+                    max_retries=settings.RAZORPAY_MAX_RETRIES,
+                    pool_size=settings.RAZORPAY_POOL_SIZE,
+                    breaker=CircuitBreaker(
+                        failure_threshold=settings.RAZORPAY_BREAKER_THRESHOLD,
+                        reset_timeout=settings.RAZORPAY_BREAKER_RESET,
+                    ),
+                )
+    return _gateway
@@ -0,0 +1,86 @@
+"""
+Idempotency-Key support for retried POSTs.
+
+A client sends the same ``Idempotency-Key`` header on every retry of one
+logical request. The first response (below 500) is stored in the cache
+together with a fingerprint of the request body. Replays get the stored
+response back without running the view again, so they never create a
+second gateway order or enrollment.
+"""
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+
+
+# How long an in-flight request holds its key before a retry may take over.
+IN_PROGRESS_TIMEOUT = 60
+
+
+def _digest(*parts):
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """Decorate an APIView handler to honour the Idempotency-Key header."""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return JsonResponse(
+                {"success": False, "message": "Idempotency-Key is too long"},
+                status=400
+            )
+
+        cache_key = "idempotency:" + _digest(str(request.user.pk), request.path, key)
+        fingerprint = _digest(request.method, request.body.decode(errors="replace"))
+
+        stored = cache.get(cache_key)
+        if stored is None and cache.add(
+            cache_key, {"fingerprint": fingerprint, "in_progress": True}, IN_PROGRESS_TIMEOUT
+        ):
+            return _run_and_store(self, view_method, request, cache_key, fingerprint, args, kwargs)
+
+        stored = stored or cache.get(cache_key) or {}
+        if stored.get("fingerprint") != fingerprint:
+            return JsonResponse(
+                {"success": False, "message": "Idempotency-Key was reused with a different request"},
+                status=422
+            )
+        if stored.get("in_progress"):
+            return JsonResponse(
+                {"success": False, "message": "A request with this Idempotency-Key is in progress"},
+                status=409
+            )
+
+        response = JsonResponse(stored["body"], status=stored["status"], safe=False)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    return wrapper
+
+
+def _run_and_store(view, view_method, request, cache_key, fingerprint, args, kwargs):
+    try:
+        response = view_method(view, request, *args, **kwargs)
+    except Exception:
+        cache.delete(cache_key)
+        raise
+
+    if response.status_code >= 500:
+        # Server errors are worth retrying for real; release the key.
+        cache.delete(cache_key)
+        return response
+
+    body = response.data if hasattr(response, "data") else json.loads(response.content or b"null")
+    cache.set(
+        cache_key,
+        {"fingerprint": fingerprint, "status": response.status_code, "body": body},
+        settings.IDEMPOTENCY_KEY_TTL,
+    )
+    return response
@@ -0,0 +1,208 @@
+"""
+Revenue ledger and rollups.
+
+Purchases only append a ``RevenueEntry``. ``run_rollup`` then walks the
+ledger from its cursor and re-materializes the ``DailyRevenueFact`` rows and
+the ``MonthlyCourseStats`` rows touched by the new entries. Rebuilding a
+fact always re-aggregates it from the ledger, so a rollup run is safe to
+repeat. Dashboards read the facts and never scan enrollments.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils.timezone import now, make_aware
+
+from .models import (
+    Payment,
+    RevenueEntry,
+    DailyRevenueFact,
+    MonthlyCourseStats,
+    RollupCursor,
+    INSTRUCTOR_PERCENT,
+    PLATFORM_PERCENT,
+)
+
+
+CURSOR_NAME = "revenue"
+# Entries younger than this are left for the next run, so a transaction
+# that committed a lower id after a higher one is never skipped.
+SAFETY_LAG = timedelta(seconds=10)
+
+
+def build_entry(payment):
+    """Return an unsaved ledger entry for a successful payment."""
+    amount = Decimal(str(payment.amount))
+    return RevenueEntry(
+        payment=payment,
+        course_id=payment.course_id,
+        instructor_id=payment.course.instructor_id,
+        amount=amount,
+        instructor_share=amount * INSTRUCTOR_PERCENT,
+        platform_share=amount * PLATFORM_PERCENT,
+        occurred_at=payment.created_at or now(),
+    )
+
+
+def record_revenue(payments):
+    """Append ledger entries for a list of successful payments."""
+    return RevenueEntry.objects.bulk_create([build_entry(payment) for payment in payments])
+
+
+def _day_bounds(day):
+    start = make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def refresh_daily_facts(keys):
+    """Re-aggregate the daily facts for a set of ``(course_id, date)`` keys."""
+    by_day = {}
+    for course_id, day in keys:
+        by_day.setdefault(day, set()).add(course_id)
+
+    months = set()
+    for day, course_ids in by_day.items():
+        start, end = _day_bounds(day)
+        rows = (
+            RevenueEntry.objects
+            .filter(course_id__in=course_ids, occurred_at__gte=start, occurred_at__lt=end)
+            .values("course_id", "instructor_id")
+            .annotate(
+                entry_count=Count("id"),
+                amount_sum=Sum("amount"),
+                instructor_share_sum=Sum("instructor_share"),
+                platform_share_sum=Sum("platform_share"),
+            )
+        )
+        facts = [
+            DailyRevenueFact(
+                course_id=row["course_id"],
+                instructor_id=row["instructor_id"],
+                date=day,
+                enrollments=row["entry_count"],
+                gross_amount=row["amount_sum"],
+                instructor_share=row["instructor_share_sum"],
+                platform_share=row["platform_share_sum"],
+            )
+            for row in rows
+        ]
+        DailyRevenueFact.objects.bulk_create(
+            facts,
+            update_conflicts=True,
+            unique_fields=["course", "date"],
+            update_fields=["instructor", "enrollments", "gross_amount", "instructor_share", "platform_share"],
+        )
+        present = {fact.course_id for fact in facts}
+        DailyRevenueFact.objects.filter(date=day, course_id__in=course_ids - present).delete()
+        months.update((course_id, day.replace(day=1)) for course_id in course_ids)
+
+    refresh_monthly_stats(months)
+
+
+def refresh_monthly_stats(keys):
+    """
+    Re-aggregate ``MonthlyCourseStats`` for a set of ``(course_id, month)``
+    keys from the daily facts. Payout flags on existing rows are kept.
+    """
+    by_month = {}
+    for course_id, month in keys:
+        by_month.setdefault(month, set()).add(course_id)
+
+    for month, course_ids in by_month.items():
+        rows = (
+            DailyRevenueFact.objects
+            .filter(course_id__in=course_ids, date__gte=month, date__lt=month + relativedelta(months=1))
+            .values("course_id", "instructor_id")
+            .annotate(
+                enrollment_sum=Sum("enrollments"),
+                amount_sum=Sum("gross_amount"),
+                instructor_share_sum=Sum("instructor_share"),
+                platform_share_sum=Sum("platform_share"),
+            )
+        )
+        stats = [
+            MonthlyCourseStats(
+                course_id=row["course_id"],
+                instructor_id=row["instructor_id"],
+                month=month,
+                total_enrollments=row["enrollment_sum"],
+                total_amount=row["amount_sum"],
+                instructor_share=row["instructor_share_sum"],
+                platform_share=row["platform_share_sum"],
+            )
+            for row in rows
+        ]
+        MonthlyCourseStats.objects.bulk_create(
+            stats,
+            update_conflicts=True,
+            unique_fields=["instructor", "course", "month"],
+            update_fields=["total_enrollments", "total_amount", "instructor_share", "platform_share"],
+        )
+        present = {row.course_id for row in stats}
+        MonthlyCourseStats.objects.filter(month=month, course_id__in=course_ids - present).update(
+            total_enrollments=0, total_amount=0, instructor_share=0, platform_share=0
+        )
+
+
+def run_rollup(batch_size=10000, lag=SAFETY_LAG):
+    """
+    Materialize facts for up to ``batch_size`` new ledger entries.
+    Returns the number of entries consumed (0 when caught up).
+    """
+    with transaction.atomic():
+        cursor, _ = RollupCursor.objects.select_for_update().get_or_create(name=CURSOR_NAME)
+        entries = list(
+            RevenueEntry.objects
+            .filter(id__gt=cursor.position, created_at__lt=now() - lag)
+            .order_by("id")
+            .values_list("id", "course_id", "occurred_at")[:batch_size]
+        )
+        if not entries:
+            return 0
+
+        refresh_daily_facts({
+            (course_id, occurred_at.date()) for _, course_id, occurred_at in entries
+        })
+        cursor.position = entries[-1][0]
+        cursor.save(update_fields=["position", "updated_at"])
+
+    return len(entries)
+
+
+def backfill(batch_size=10000, progress=None):
+    """
+    Create ledger entries for every successful payment that has none, then
+    rebuild all daily facts and monthly stats from the full ledger.
+    """
+    missing = (
+        Payment.objects
+        .filter(status="success", revenue_entry__isnull=True)
+        .select_related("course")
+        .order_by("id")
+    )
+    batch, created = [], 0
+    for payment in missing.iterator(chunk_size=batch_size):
+        batch.append(payment)
+        if len(batch) == batch_size:
+            created += len(record_revenue(batch))
+            batch = []
+    if batch:
+        created += len(record_revenue(batch))
+    if progress:
+        progress(f"Created {created} ledger entries")
+
+    with transaction.atomic():
+        DailyRevenueFact.objects.all().delete()
+        RollupCursor.objects.update_or_create(name=CURSOR_NAME, defaults={"position": 0})
+
+    consumed = 0
+    while True:
+        processed = run_rollup(batch_size, lag=timedelta(0))
+        if not processed:
+            break
+        consumed += processed
+        if progress:
+            progress(f"Rolled up {consumed} ledger entries")
+    return created, consumed
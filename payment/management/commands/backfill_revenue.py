@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from payment.ledger import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Create revenue ledger entries for historical payments and rebuild all "
+        "daily revenue facts and monthly course stats from the ledger."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        created, consumed = backfill(options["batch_size"], progress=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfill done: {created} new ledger entries, {consumed} entries rolled up."
+        ))
@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.timezone import now
+
+from accounts.models import CustomUser
+from Courses.models import Course
+from payment.ledger import refresh_daily_facts, run_rollup
+from payment.models import Payment, MonthlyCourseStats
+from payment.services import fulfil_payment
+
+
+class Command(BaseCommand):
+    help = (
+        "Run N payment verifications for one course in parallel, roll up the "
+        "ledger and check that MonthlyCourseStats lost no updates. Point it at a "
+        "scratch PostgreSQL database; SQLite serialises writers and will report "
+        "lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id", type=int)
+        parser.add_argument("--parallel", type=int, default=200)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated users, payments and stats increments.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(id=options["course_id"])
+        except Course.DoesNotExist:
+            raise CommandError("Course not found")
+
+        parallel = options["parallel"]
+        run_id = uuid.uuid4().hex[:8]
+        CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f"bench-{run_id}-{i}",
+                email=f"bench-{run_id}-{i}@example.invalid",
+                password=make_password(None),
+            )
+            for i in range(parallel)
+        ])
+        users = list(CustomUser.objects.filter(username__startswith=f"bench-{run_id}-"))
+
+        while run_rollup(lag=timedelta(0)):
+            pass
+        today = now().date()
+        month_stats = MonthlyCourseStats.objects.filter(course=course, month=today.replace(day=1))
+        stats = month_stats.first()
+        before = stats.total_enrollments if stats else 0
+        barrier = threading.Barrier(parallel)
+
+        def verify(index):
+            try:
+                barrier.wait()
+                fulfil_payment(
+                    user=users[index],
+                    course=course,
+                    transaction_id=f"bench-{run_id}-{index}",
+                    amount=float(course.price),
+                    method="benchmark",
+                )
+                return None
+            except Exception as e:
+                return str(e)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            errors = [error for error in executor.map(verify, range(parallel)) if error]
+        elapsed = time.perf_counter() - started
+
+        while run_rollup(lag=timedelta(0)):
+            pass
+        stats = month_stats.first()
+        after = stats.total_enrollments if stats else 0
+        succeeded = parallel - len(errors)
+
+        self.stdout.write(
+            f"{succeeded}/{parallel} verifications in {elapsed:.2f}s "
+            f"({succeeded / elapsed:.0f}/s)"
+        )
+        for error in set(errors):
+            self.stdout.write(self.style.WARNING(f"  error: {error}"))
+
+        if not options["keep"]:
+            Payment.objects.filter(transaction_id__startswith=f"bench-{run_id}-").delete()
+            CustomUser.objects.filter(username__startswith=f"bench-{run_id}-").delete()
+            refresh_daily_facts({(course.id, today)})
+
+        if after - before != succeeded:
+            raise CommandError(
+                f"Lost updates: stats grew by {after - before}, expected {succeeded}"
+            )
+        self.stdout.write(self.style.SUCCESS("No lost updates."))
@@ -0,0 +1,44 @@
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+
+from payment.payouts import MonthNotReady, close_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Create payouts for every instructor for a month and mark its stats "
+        "paid. Run it again for a closed month to pay late revenue as "
+        "adjustment payouts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            help="Month to close as YYYY-MM. Defaults to the previous month.",
+        )
+        parser.add_argument("--method", default="bank_transfer", help="Payout method recorded on each payout.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["month"]:
+            try:
+                month = datetime.strptime(options["month"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("Invalid month. Use YYYY-MM.")
+        else:
+            month = date.today().replace(day=1) - relativedelta(months=1)
+
+        try:
+            created, marked = close_month(
+                month,
+                payout_method=options["method"],
+                batch_size=options["batch_size"],
+                progress=lambda count: self.stdout.write(f"  {count} payouts created"),
+            )
+        except MonthNotReady as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed {month:%B %Y}: {created} payouts created, {marked} stats rows marked paid."
+        ))
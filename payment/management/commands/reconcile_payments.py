@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payment.reconciliation import reconcile_batch
+
+
+class Command(BaseCommand):
+    help = "Process pending payment webhook events in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the inbox instead of exiting once it is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep between polls of an empty inbox when looping.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = reconcile_batch(options["batch_size"])
+            total += processed
+            if processed:
+                self.stdout.write(f"Processed {processed} events ({total} total)")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Inbox empty, {total} events processed."))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payment.ledger import run_rollup
+
+
+class Command(BaseCommand):
+    help = "Roll new revenue ledger entries up into daily facts and monthly stats."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep following the ledger instead of exiting once caught up.",
+        )
+        parser.add_argument("--interval", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = run_rollup(options["batch_size"])
+            total += processed
+            if processed:
+                self.stdout.write(f"Rolled up {processed} entries ({total} total)")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Ledger caught up, {total} entries rolled up."))
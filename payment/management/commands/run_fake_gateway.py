@@ -0,0 +1,108 @@
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class FakeGatewayHandler(BaseHTTPRequestHandler):
+    """Answers the subset of the Razorpay REST API the backend uses."""
+    latency = 0.0
+    failure_rate = 0.0
+    # Orders by id. A payment "pay_<x>" belongs to order "order_<x>".
+    orders = {}
+
+    def _inject(self):
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            self._respond(503, {"error": {"code": "SERVER_ERROR", "description": "Injected failure"}})
+            return True
+        return False
+
+    def do_GET(self):
+        if self._inject():
+            return
+
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) == 3 and parts[:2] == ["v1", "payments"] and parts[2].startswith("pay_"):
+            payment_id = parts[2]
+            order = self.orders.get("order_" + payment_id[len("pay_"):])
+            if order is not None:
+                self._respond(200, {
+                    "id": payment_id,
+                    "entity": "payment",
+                    "amount": order["amount"],
+                    "currency": order["currency"],
+                    "status": "captured",
+                    "order_id": order["id"],
+                    "method": "card",
+                    "notes": order["notes"],
+                    "created_at": int(time.time()),
+                })
+                return
+
+        self._respond(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+
+    def do_POST(self):
+        if self._inject():
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.rstrip("/") == "/v1/orders":
+            order = {
+                "id": f"order_{uuid.uuid4().hex[:14]}",
+                "entity": "order",
+                "amount": body.get("amount"),
+                "amount_paid": 0,
+                "amount_due": body.get("amount"),
+                "currency": body.get("currency", "INR"),
+                "receipt": body.get("receipt"),
+                "notes": body.get("notes", {}),
+                "status": "created",
+                "attempts": 0,
+                "created_at": int(time.time()),
+            }
+            self.orders[order["id"]] = order
+            self._respond(200, order)
+            return
+
+        self._respond(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+
+    def _respond(self, status_code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local stand-in for the Razorpay API for tests and load runs. "
+        "Set RAZORPAY_BASE_URL=http://127.0.0.1:<port>/v1 to use it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=9090)
+        parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per request.")
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+
+    def handle(self, *args, **options):
+        FakeGatewayHandler.latency = options["latency"]
+        FakeGatewayHandler.failure_rate = options["failure_rate"]
+        server = ThreadingHTTPServer(("127.0.0.1", options["port"]), FakeGatewayHandler)
+        self.stdout.write(f"Fake gateway listening on http://127.0.0.1:{options['port']}/v1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
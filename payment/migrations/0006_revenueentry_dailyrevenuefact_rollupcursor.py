@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Courses', '0013_remove_studentcourseprogress_total_lessons'),
+        ('payment', '0005_paymentevent'),
+        ('teacher', '0004_delete_instructorpayment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RevenueEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('instructor_share', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('platform_share', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('occurred_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Courses.course')),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='teacher.instructor')),
+                ('payment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_entry', to='payment.payment')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'occurred_at'], name='revenue_entry_course_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenueFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('enrollments', models.PositiveIntegerField(default=0)),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('instructor_share', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('platform_share', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Courses.course')),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='teacher.instructor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='revenue_fact_date_idx'), models.Index(fields=['instructor', 'date'], name='revenue_fact_instr_date_idx')],
+                'unique_together': {('course', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0006_revenueentry_dailyrevenuefact_rollupcursor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monthlycoursestats',
+            index=models.Index(fields=['month', 'instructor'], name='course_stats_month_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0007_monthlycoursestats_course_stats_month_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instructorpayout',
+            name='adjustment',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterUniqueTogether(
+            name='instructorpayout',
+            unique_together={('instructor', 'month', 'adjustment')},
+        ),
+    ]
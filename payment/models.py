@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from accounts.models import CustomUser as User
 from Courses.models import Course
@@ -23,6 +25,9 @@ class Payment(models.Model):
         return f"Payment {self.transaction_id} - {self.status}"
 
 
+INSTRUCTOR_PERCENT = Decimal('0.60')
+PLATFORM_PERCENT = Decimal('0.40')
+
 
 class MonthlyCourseStats(models.Model):
     instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
@@ -39,6 +44,9 @@ class MonthlyCourseStats(models.Model):
 
     class Meta:
         unique_together = ('instructor', 'course', 'month')
+        indexes = [
+            models.Index(fields=['month', 'instructor'], name='course_stats_month_idx'),
+        ]
 
     def __str__(self):
         return f"{self.course.title} - {self.month.strftime('%B %Y')}"
@@ -48,6 +56,9 @@ class MonthlyCourseStats(models.Model):
 class InstructorPayout(models.Model):
     instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
     month = models.DateField() 
+    # 0 for the month's payout; 1, 2, ... for later payouts of revenue that
+    # arrived after the month was closed.
+    adjustment = models.PositiveSmallIntegerField(default=0)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     payout_method = models.CharField(max_length=50)
     payout_reference = models.CharField(max_length=100, blank=True, null=True)  
@@ -57,8 +68,92 @@ class InstructorPayout(models.Model):
     
 
     class Meta:
-        unique_together = ('instructor', 'month')
+        unique_together = ('instructor', 'month', 'adjustment')
 
     def __str__(self):
         return f"Payout to {self.instructor.user.username} for {self.month.strftime('%B %Y')}"
-    
\ No newline at end of file
+    
+
+
+class PaymentEvent(models.Model):
+    """
+    Inbox of gateway webhook events. Rows are appended by the webhook view
+    and processed later, in batches, by the payment reconciler.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    )
+
+    event_id = models.CharField(max_length=100, unique=True)
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='payment_event_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} - {self.status}"
+
+
+
+class RevenueEntry(models.Model):
+    """
+    Append-only revenue ledger with one row per successful Payment. Amounts
+    are what the student actually paid, not the course's current price.
+    """
+    payment = models.OneToOneField(Payment, on_delete=models.CASCADE, related_name="revenue_entry")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    instructor_share = models.DecimalField(max_digits=12, decimal_places=2)
+    platform_share = models.DecimalField(max_digits=12, decimal_places=2)
+    occurred_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'occurred_at'], name='revenue_entry_course_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} +{self.amount} @ {self.occurred_at:%Y-%m-%d}"
+
+
+class DailyRevenueFact(models.Model):
+    """Per-course, per-day revenue rolled up from the ledger."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
+    date = models.DateField()
+    enrollments = models.PositiveIntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    instructor_share = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    platform_share = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('course', 'date')
+        indexes = [
+            models.Index(fields=['date'], name='revenue_fact_date_idx'),
+            models.Index(fields=['instructor', 'date'], name='revenue_fact_instr_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} {self.date}: {self.gross_amount}"
+
+
+class RollupCursor(models.Model):
+    """Ledger position up to which a rollup job has materialized facts."""
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
@@ -0,0 +1,138 @@
+"""
+Month-close payout computation.
+
+``close_month`` first runs the revenue rollup and refuses to close a month
+whose ledger entries are not all materialized, so no revenue can land on
+stats after they are paid. It then pays every instructor what the month's
+``MonthlyCourseStats`` owe them minus what their earlier payouts for the
+month already covered, using one grouped aggregate per table. The payouts
+are written with ``bulk_create`` in committed batches, and the stats are
+then marked paid with a single range-filtered UPDATE.
+
+The first payout of a month has ``adjustment=0``. Revenue that still
+arrives for a closed month, e.g. from a payment verified late, is paid by
+closing the month again, which adds an adjustment payout numbered 1, 2, ...
+Instructors who are owed nothing are skipped, so an interrupted run can
+simply be started again.
+"""
+from datetime import datetime, time
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils.timezone import make_aware, now
+
+from .ledger import CURSOR_NAME, SAFETY_LAG, run_rollup
+from .models import MonthlyCourseStats, InstructorPayout, RevenueEntry, RollupCursor
+
+
+class MonthNotReady(Exception):
+    """The month still has revenue the rollup has not materialized."""
+
+
+def month_bounds(month):
+    start = month.replace(day=1)
+    return start, start + relativedelta(months=1)
+
+
+def ensure_rolled_up(month):
+    """
+    Run the revenue rollup and raise MonthNotReady unless every ledger
+    entry of ``month`` is reflected in ``MonthlyCourseStats``.
+    """
+    start, end = month_bounds(month)
+    opens_at = make_aware(datetime.combine(start, time.min))
+    closes_at = make_aware(datetime.combine(end, time.min))
+    if now() < closes_at + SAFETY_LAG:
+        raise MonthNotReady(f"{month:%B %Y} has not ended yet")
+
+    while run_rollup():
+        pass
+    cursor = RollupCursor.objects.filter(name=CURSOR_NAME).values_list("position", flat=True).first() or 0
+    pending = RevenueEntry.objects.filter(
+        id__gt=cursor, occurred_at__gte=opens_at, occurred_at__lt=closes_at
+    ).count()
+    if pending:
+        raise MonthNotReady(
+            f"{pending} ledger entries of {month:%B %Y} are not rolled up yet; try again shortly"
+        )
+
+
+def close_month(month, payout_method="bank_transfer", batch_size=1000, progress=None):
+    """
+    Create payouts and adjustment payouts for ``month`` and mark its stats
+    as paid.
+
+    Raises:
+        MonthNotReady: If the month's revenue is not fully rolled up
+
+    Returns:
+        tuple: (payouts created, stats rows marked paid)
+    """
+    ensure_rolled_up(month)
+    start, end = month_bounds(month)
+    paid = {
+        row["instructor_id"]: (row["paid"], row["last"] + 1)
+        for row in (
+            InstructorPayout.objects
+            .filter(month__gte=start, month__lt=end)
+            .values("instructor_id")
+            .annotate(paid=Sum("total_amount"), last=Max("adjustment"))
+            .order_by()
+        )
+    }
+    totals = (
+        MonthlyCourseStats.objects
+        .filter(month__gte=start, month__lt=end)
+        .values("instructor_id")
+        .annotate(total=Sum("instructor_share"))
+        .filter(total__gt=0)
+        .order_by("instructor_id")
+    )
+
+    created, batch = 0, []
+    for row in totals.iterator(chunk_size=batch_size):
+        already_paid, adjustment = paid.get(row["instructor_id"], (0, 0))
+        owed = row["total"] - already_paid
+        if owed <= 0:
+            continue
+        batch.append(InstructorPayout(
+            instructor_id=row["instructor_id"],
+            month=start,
+            adjustment=adjustment,
+            total_amount=owed,
+            payout_method=payout_method,
+            notes="Late revenue for a closed month" if adjustment else "",
+        ))
+        if len(batch) == batch_size:
+            created += _save_batch(batch)
+            batch = []
+            if progress:
+                progress(created)
+    if batch:
+        created += _save_batch(batch)
+        if progress:
+            progress(created)
+
+    marked = MonthlyCourseStats.objects.filter(
+        month__gte=start,
+        month__lt=end,
+        paid_to_instructor=False,
+    ).update(paid_to_instructor=True, paid_on=start)
+
+    return created, marked
+
+
+def _save_batch(payouts):
+    """Insert payouts, skipping existing ones; returns how many were inserted."""
+    # ignore_conflicts leaves the skipped rows indistinguishable from the
+    # inserted ones, so count the batch's keys before and after. A racing
+    # run that computed the same adjustment number is skipped here.
+    existing = InstructorPayout.objects.filter(
+        month__in={payout.month for payout in payouts},
+        instructor_id__in={payout.instructor_id for payout in payouts},
+    )
+    with transaction.atomic():
+        before = existing.count()
+        InstructorPayout.objects.bulk_create(payouts, ignore_conflicts=True)
+        return existing.count() - before
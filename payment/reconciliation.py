@@ -0,0 +1,143 @@
+"""
+Batch reconciliation of gateway webhook events.
+
+Events are read from the ``PaymentEvent`` inbox in id order. Each batch
+creates the missing Payment, Enrollment and StudentCourseProgress rows and
+their revenue ledger entries with bulk inserts. This keeps enrollment working
+when the browser never calls ``VerifyPaymentView``.
+"""
+from datetime import datetime, timezone
+
+from django.db import IntegrityError, transaction
+from django.utils.timezone import now
+
+from accounts.models import CustomUser
+from Courses.models import Course, Enrollment, StudentCourseProgress
+from .models import Payment, PaymentEvent, RevenueEntry
+from .ledger import build_entry
+from .services import fulfil_payment, gateway_amount
+
+
+HANDLED_EVENTS = {"payment.captured", "order.paid"}
+
+
+def _payment_entity(event):
+    return ((event.payload.get("payload") or {}).get("payment") or {}).get("entity") or {}
+
+
+def reconcile_batch(batch_size=500):
+    """
+    Process up to ``batch_size`` pending events. Returns the number of
+    events taken from the inbox (0 when the inbox is empty).
+    """
+    with transaction.atomic():
+        events = list(
+            PaymentEvent.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        ignored, failed, captured, copies = [], {}, {}, {}
+        seen_event_ids = set()
+        for event in events:
+            if event.event_id in seen_event_ids:
+                ignored.append(event.id)
+                continue
+            seen_event_ids.add(event.event_id)
+            entity = _payment_entity(event)
+            notes = entity.get("notes") or {}
+            if event.event_type not in HANDLED_EVENTS or not entity.get("id"):
+                ignored.append(event.id)
+            elif not notes.get("course_id") or not notes.get("user_id"):
+                failed[event.id] = "Payment has no course_id/user_id notes"
+            else:
+                # order.paid and payment.captured both carry the payment entity;
+                # later copies share the outcome of the first.
+                if entity["id"] in captured:
+                    copies.setdefault(captured[entity["id"]][0].id, []).append(event.id)
+                else:
+                    captured[entity["id"]] = (event, entity, notes)
+
+        courses = Course.objects.in_bulk({int(n["course_id"]) for _, _, n in captured.values()})
+        users = CustomUser.objects.in_bulk({int(n["user_id"]) for _, _, n in captured.values()})
+        already_recorded = set(
+            Payment.objects.filter(transaction_id__in=captured).values_list("transaction_id", flat=True)
+        )
+
+        payments = []
+        for transaction_id, (event, entity, notes) in captured.items():
+            course = courses.get(int(notes["course_id"]))
+            user = users.get(int(notes["user_id"]))
+            if course is None or user is None:
+                failed[event.id] = "Unknown course or user"
+            elif transaction_id not in already_recorded:
+                payments.append(Payment(
+                    user=user,
+                    course=course,
+                    amount=gateway_amount(entity),
+                    method=entity.get("method") or "unknown",
+                    transaction_id=transaction_id,
+                    status="success",
+                ))
+
+        _record_payments(payments, captured)
+
+        for event_id, error in list(failed.items()):
+            for copy_id in copies.get(event_id, ()):
+                failed[copy_id] = error
+        processed_ids = [
+            copy_id
+            for event, _, _ in captured.values() if event.id not in failed
+            for copy_id in [event.id, *copies.get(event.id, ())]
+        ]
+        PaymentEvent.objects.filter(id__in=processed_ids).update(status="processed", processed_at=now())
+        PaymentEvent.objects.filter(id__in=ignored).update(status="ignored", processed_at=now())
+        for event_id, error in failed.items():
+            PaymentEvent.objects.filter(id=event_id).update(status="failed", error=error, processed_at=now())
+
+    return len(events)
+
+
+def _record_payments(payments, captured):
+    """Insert payments plus their enrollments and ledger entries in bulk."""
+    if not payments:
+        return
+
+    try:
+        with transaction.atomic():
+            Payment.objects.bulk_create(payments)
+    except IntegrityError:
+        # A concurrent VerifyPaymentView call recorded one of these payments;
+        # fall back to the row-by-row idempotent path for this batch.
+        for payment in payments:
+            fulfil_payment(payment.user, payment.course, payment.transaction_id,
+                           payment.amount, payment.method)
+        return
+
+    pairs = {(payment.user_id, payment.course_id) for payment in payments}
+    enrolled = set(
+        Enrollment.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            course_id__in={course_id for _, course_id in pairs},
+        ).values_list("user_id", "course_id")
+    )
+    Enrollment.objects.bulk_create([
+        Enrollment(user_id=user_id, course_id=course_id, payment=True, status="active")
+        for user_id, course_id in pairs - enrolled
+    ])
+    StudentCourseProgress.objects.bulk_create(
+        [StudentCourseProgress(student_id=user_id, course_id=course_id) for user_id, course_id in pairs],
+        ignore_conflicts=True,
+    )
+
+    entries = []
+    for payment in payments:
+        entry = build_entry(payment)
+        _, entity, _ = captured[payment.transaction_id]
+        if entity.get("created_at"):
+            # Book the revenue when the gateway captured it, not when we caught up.
+            entry.occurred_at = datetime.fromtimestamp(entity["created_at"], tz=timezone.utc)
+        entries.append(entry)
+    RevenueEntry.objects.bulk_create(entries)
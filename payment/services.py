@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from accounts.models import CustomUser
+from Courses.models import Enrollment, StudentCourseProgress
+from .models import Payment
+from .ledger import record_revenue
+
+
+def gateway_amount(entity):
+    """Amount actually paid for a gateway payment entity, in rupees."""
+    return Decimal(entity.get("amount") or 0) / 100
+
+
+@transaction.atomic
+def fulfil_payment(user, course, transaction_id, amount, method="unknown"):
+    """
+    Record a successful payment and enroll the user, all in one transaction.
+
+    Idempotent on ``transaction_id``: replaying a payment that was already
+    recorded leaves the database untouched and returns ``(payment, False)``.
+
+    Returns:
+        tuple: (Payment instance, whether it was created by this call)
+    """
+    payment, created = Payment.objects.get_or_create(
+        transaction_id=transaction_id,
+        defaults={
+            "user": user,
+            "course": course,
+            "amount": amount,
+            "method": method,
+            "status": "success",
+        },
+    )
+    if not created:
+        return payment, False
+
+    # Enrollment has no unique (user, course) constraint, so serialise this
+    # user's payments on their row; otherwise two payments for the same
+    # course could both pass the check below and enroll twice.
+    list(CustomUser.objects.select_for_update().filter(pk=user.pk).values_list("pk", flat=True))
+    if not Enrollment.objects.filter(user=user, course=course).exists():
+        Enrollment.objects.create(
+            user=user,
+            course=course,
+            payment=True,
+            status="active",
+        )
+    StudentCourseProgress.objects.get_or_create(
+        student=user,
+        course=course,
+        defaults={
+            "completed_lessons_count": 0,
+            "progress": 0.00,
+            "is_completed": False,
+        },
+    )
+    record_revenue([payment])
+
+    return payment, True
@@ -1,3 +1,52 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from Courses.models import Course
+from accounts.models import CustomUser
+from teacher.models import Instructor
+
+from .models import InstructorPayout, MonthlyCourseStats
+from .payouts import MonthNotReady, close_month
+
+
+class CloseMonthTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(
+            email="teacher@example.com", username="teacher", password="password123"
+        )
+        self.instructor = Instructor.objects.create(
+            user=user, name="Teacher", phone=9999999999, bio="Bio", experience="5 years", organisation="School"
+        )
+        course = Course.objects.create(instructor=self.instructor, title="Algebra", description="Course", price=100)
+        self.month = date(2024, 1, 1)
+        self.stats = MonthlyCourseStats.objects.create(
+            instructor=self.instructor, course=course, month=self.month,
+            total_enrollments=1, total_amount=Decimal("200"), instructor_share=Decimal("100"),
+        )
+
+    def test_close_pays_the_month_once(self):
+        self.assertEqual(close_month(self.month), (1, 1))
+        self.assertEqual(close_month(self.month), (0, 0))
+        payout = InstructorPayout.objects.get()
+        self.assertEqual((payout.adjustment, payout.total_amount), (0, Decimal("100")))
+        self.stats.refresh_from_db()
+        self.assertTrue(self.stats.paid_to_instructor)
+
+    def test_late_revenue_is_paid_as_an_adjustment(self):
+        close_month(self.month)
+        # A payment of the month rolled up after it was closed.
+        MonthlyCourseStats.objects.filter(id=self.stats.id).update(instructor_share=Decimal("130"))
+
+        self.assertEqual(close_month(self.month)[0], 1)
+        self.assertEqual(close_month(self.month)[0], 0)
+        self.assertEqual(
+            list(InstructorPayout.objects.order_by("adjustment").values_list("adjustment", "total_amount")),
+            [(0, Decimal("100")), (1, Decimal("30"))],
+        )
+
+    def test_month_in_progress_is_refused(self):
+        with self.assertRaises(MonthNotReady):
+            close_month(date.today())
+        self.assertFalse(InstructorPayout.objects.exists())
@@ -0,0 +1,141 @@
+"""
+Time-series aggregation over arbitrary date ranges.
+
+``series`` groups any queryset by a day/week/month bucket (and optionally a
+dimension such as course or instructor) in a single query, then fills the
+empty buckets. Revenue series read the pre-aggregated ``DailyRevenueFact``
+table, so cost depends on the number of buckets, not on order history.
+"""
+from datetime import datetime, time, timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import models
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from django.utils.timezone import localdate, make_aware
+
+from .models import DailyRevenueFact
+
+
+BUCKETS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+DIMENSIONS = {
+    "course": "course_id",
+    "instructor": "instructor_id",
+}
+# Largest number of buckets one request may ask for.
+MAX_BUCKETS = 1000
+
+REVENUE_METRICS = {
+    "revenue": Sum("gross_amount"),
+    "enrollments": Sum("enrollments"),
+    "instructor_share": Sum("instructor_share"),
+    "platform_share": Sum("platform_share"),
+}
+
+
+def bucket_start(day, bucket):
+    """Return the first day of the bucket that contains ``day``."""
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def bucket_range(start, end, bucket):
+    """List the start dates of every bucket between ``start`` and ``end``."""
+    step = relativedelta(months=1) if bucket == "month" else timedelta(days=7 if bucket == "week" else 1)
+    current, last = bucket_start(start, bucket), bucket_start(end, bucket)
+    periods = []
+    while current <= last:
+        periods.append(current)
+        current += step
+    return periods
+
+
+def validate_range(start, end, bucket):
+    """Raise ValueError for an unknown bucket, a reversed or too long range."""
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'")
+    if start > end:
+        raise ValueError("'from' must not be after 'to'")
+    if len(bucket_range(start, end, bucket)) > MAX_BUCKETS:
+        raise ValueError(f"Range spans more than {MAX_BUCKETS} {bucket} buckets")
+
+
+def series(queryset, date_field, metrics, start, end, bucket="month", dimension=None):
+    """
+    Aggregate ``queryset`` into gap-filled buckets.
+
+    Args:
+        queryset: Rows to aggregate
+        date_field: DateField or DateTimeField to bucket on
+        metrics: Mapping of output name to aggregate expression
+        start, end: Inclusive date range
+        bucket: "day", "week" or "month"
+        dimension: Optional field to split the series by
+
+    Returns:
+        list: One ``{"key": ..., "points": [...]}`` entry per dimension value
+        (a single entry with key None when there is no dimension). Each point
+        has a "period" date plus one value per metric, zero where empty.
+    """
+    validate_range(start, end, bucket)
+
+    field = queryset.model._meta.get_field(date_field)
+    if isinstance(field, models.DateTimeField):
+        lower = make_aware(datetime.combine(start, time.min))
+        upper = make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        queryset = queryset.filter(**{f"{date_field}__gte": lower, f"{date_field}__lt": upper})
+    else:
+        queryset = queryset.filter(**{f"{date_field}__gte": start, f"{date_field}__lte": end})
+
+    group_by = ["period"] + ([dimension] if dimension else [])
+    rows = (
+        queryset
+        .annotate(period=BUCKETS[bucket](date_field))
+        .values(*group_by)
+        .annotate(**metrics)
+        .order_by(*group_by)
+    )
+
+    found = {}
+    for row in rows:
+        period = row["period"]
+        if isinstance(period, datetime):
+            period = period.date()
+        found[(row[dimension] if dimension else None, period)] = row
+
+    keys = sorted({key for key, _ in found}, key=lambda key: (key is None, key)) if dimension else [None]
+    periods = bucket_range(start, end, bucket)
+    result = []
+    for key in keys:
+        points = []
+        for period in periods:
+            row = found.get((key, period), {})
+            points.append({"period": period, **{name: row.get(name) or 0 for name in metrics}})
+        result.append({"key": key, "points": points})
+    return result
+
+
+def revenue_series(start, end, bucket="month", dimension=None, course_ids=None, instructor_id=None):
+    """Revenue, enrollments and shares from the daily revenue facts."""
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{dimension}'")
+
+    facts = DailyRevenueFact.objects.all()
+    if course_ids:
+        facts = facts.filter(course_id__in=course_ids)
+    if instructor_id is not None:
+        facts = facts.filter(instructor_id=instructor_id)
+    return series(facts, "date", REVENUE_METRICS, start, end, bucket, DIMENSIONS.get(dimension))
+
+
+def year_to_date(today=None):
+    """The ``(start, end)`` range from January 1st to today."""
+    today = today or localdate()
+    return today.replace(month=1, day=1), today
@@ -4,7 +4,10 @@ from .views import *
 urlpatterns = [
     path("create-payment/", CreatePaymentView.as_view(), name="create_order"),
     path("verify-payment/", VerifyPaymentView.as_view(), name="verify-payment"),
+    path("webhook/", RazorpayWebhookView.as_view(), name="payment-webhook"),
     path('payment-details/', PaymentListView.as_view(), name='payment-list'),
+    path('payment-details/export/', PaymentExportView.as_view(), name='payment-export'),
+    path('revenue/timeseries/', RevenueTimeSeriesView.as_view(), name='revenue-timeseries'),
     path('enrollments/<int:instructor_id>/', InstructorEnrollmentStats.as_view(), name='instructor-enrollments'),
     path('<int:instructor_id>/monthly-stats/', InstructorMonthlyStatsView.as_view(), name='instructor-monthly-stats'),
     path('payout-summary/<int:instructor_id>/', InstructorPayoutSummary.as_view(), name='instructor-payout-summary'),
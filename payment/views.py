@@ -13,24 +13,26 @@ from decimal import Decimal
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework import generics
 
-from .models import Payment, MonthlyCourseStats, InstructorPayout
+from .models import Payment, MonthlyCourseStats, InstructorPayout, PaymentEvent
+from .services import fulfil_payment, gateway_amount
+from .payouts import month_bounds
+from .timeseries import revenue_series, year_to_date
+from .idempotency import idempotent
+from .gateway import get_gateway, GatewayUnavailable
+from backend.exports import EXPORT_FORMATS, date_range_filter, export_response
 from accounts.models import CustomUser as User
 from Courses.models import Course, Enrollment, StudentCourseProgress
 from teacher.models import Instructor
+from teacher.instructors import require_instructor
 from .serializers import (
     PaymentSerializer,
     MonthlyCourseStatsSerializer,
     InstructorPayoutSerializer
 )
 
-# Initialize Razorpay client
-razorpay_client = razorpay.Client(
-    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-)
-
 
 class CreatePaymentView(APIView):
     """
@@ -39,6 +41,7 @@ class CreatePaymentView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         """
         Create a Razorpay payment order.
@@ -65,11 +68,18 @@ class CreatePaymentView(APIView):
                 "amount": amount,
                 "currency": "INR",
                 "payment_capture": "1",
+                # Read back by the webhook reconciler to enroll the user.
+                "notes": {"course_id": str(course_id), "user_id": str(user_id)},
             }
             
-            order = razorpay_client.order.create(order_data)
+            order = get_gateway().create_order(order_data)
             return JsonResponse(order)
-        
+
+        except GatewayUnavailable:
+            return JsonResponse(
+                {"success": False, "message": "Payment gateway unavailable, please retry"},
+                status=503
+            )
         except Exception as e:
             return JsonResponse(
                 {"success": False, "error": str(e)},
@@ -83,6 +93,7 @@ class VerifyPaymentView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         """
         Verify payment signature and process course enrollment.
@@ -113,7 +124,7 @@ class VerifyPaymentView(APIView):
             }
             
             try:
-                razorpay_client.utility.verify_payment_signature(params_dict)
+                get_gateway().verify_payment_signature(params_dict)
             except razorpay.errors.SignatureVerificationError:
                 return JsonResponse(
                     {"success": False, "message": "Invalid payment signature"},
@@ -122,36 +133,30 @@ class VerifyPaymentView(APIView):
             
             user = request.user
             course = Course.objects.get(id=course_id)
-            
-            # Save payment details
-            payment = Payment.objects.create(
-                user=user,
-                course=course,
-                amount=data.get("amount", 0),
-                method=data.get("method", "unknown"),
-                transaction_id=data.get("transaction_id"),
-                status="success",
-            )
-            
-            # Enroll user in course
-            Enrollment.objects.create(
+
+            # Amount and method come from the gateway, never from the client,
+            # so the revenue ledger records what was actually paid.
+            entity = get_gateway().fetch_payment(payment_id)
+            notes = entity.get("notes") or {}
+            if entity.get("order_id") != order_id or notes.get("course_id") not in (None, str(course.id)):
+                return JsonResponse(
+                    {"success": False, "message": "Payment does not match this order"},
+                    status=400
+                )
+
+            _, created = fulfil_payment(
                 user=user,
                 course=course,
-                payment=True,
-                status="active"
+                transaction_id=payment_id,
+                amount=gateway_amount(entity),
+                method=entity.get("method") or "unknown",
             )
 
-            StudentCourseProgress.objects.create(
-                student=user,
-                course=course,
-                completed_lessons_count=0,
-                progress=0.00,
-                is_completed=False
-            )
-            
-            # Update monthly stats
-            self._update_monthly_stats(course)
-            
+            if not created:
+                return JsonResponse(
+                    {"success": True, "message": "Payment already verified."}
+                )
+
             return JsonResponse(
                 {"success": True, "message": "Payment verified successfully!"}
             )
@@ -161,38 +166,66 @@ class VerifyPaymentView(APIView):
                 {"success": False, "message": "Course not found"},
                 status=404
             )
+        except GatewayUnavailable:
+            return JsonResponse(
+                {"success": False, "message": "Payment gateway unavailable, please retry"},
+                status=503
+            )
         except Exception as e:
             return JsonResponse(
                 {"success": False, "error": str(e)},
                 status=500
             )
-    
-    def _update_monthly_stats(self, course):
-        """Helper method to update monthly enrollment statistics."""
-        INSTRUCTOR_PERCENT = Decimal('0.60')
-        PLATFORM_PERCENT = Decimal('0.40')
-        today = date.today()
-        month_start = today.replace(day=1)
-        course_price = Decimal(course.price)
-
-        stats, created = MonthlyCourseStats.objects.get_or_create(
-            instructor=course.instructor,
-            course=course,
-            month=month_start,
-            defaults={
-                "total_enrollments": 1,
-                "total_amount": course_price,
-                "instructor_share": course_price * INSTRUCTOR_PERCENT,
-                "platform_share": course_price * PLATFORM_PERCENT,
-            }
-        )
 
-        if not created:
-            stats.total_enrollments += 1
-            stats.total_amount += course_price
-            stats.instructor_share += course_price * INSTRUCTOR_PERCENT
-            stats.platform_share += course_price * PLATFORM_PERCENT
-            stats.save()
+
+class RazorpayWebhookView(APIView):
+    """
+    Receives Razorpay webhooks. The event is verified and appended to the
+    PaymentEvent inbox, then acknowledged immediately; the reconciler
+    (manage.py reconcile_payments) does the actual enrollment work.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        Store a signed gateway event.
+
+        Returns:
+            JsonResponse: Acknowledgement, 400 for a bad signature, or 503
+                when no webhook secret is configured
+        """
+        if not settings.RAZORPAY_WEBHOOK_SECRET:
+            return JsonResponse(
+                {"success": False, "message": "Webhook secret is not configured"},
+                status=503
+            )
+
+        body = request.body.decode()
+        signature = request.headers.get("X-Razorpay-Signature", "")
+
+        try:
+            get_gateway().verify_webhook_signature(body, signature)
+        except razorpay.errors.SignatureVerificationError:
+            return JsonResponse(
+                {"success": False, "message": "Invalid webhook signature"},
+                status=400
+            )
+
+        payload = json.loads(body)
+        event_id = request.headers.get("X-Razorpay-Event-Id") or payload.get("id")
+        if not event_id:
+            return JsonResponse(
+                {"success": False, "message": "Missing event id"},
+                status=400
+            )
+
+        # ignore_conflicts turns gateway redeliveries into a no-op insert.
+        PaymentEvent.objects.bulk_create(
+            [PaymentEvent(event_id=event_id, event_type=payload.get("event", ""), payload=payload)],
+            ignore_conflicts=True
+        )
+        return JsonResponse({"success": True})
 
 
 class InstructorMonthlyStatsView(APIView):
@@ -233,6 +266,108 @@ class PaymentListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
 
+class PaymentExportView(APIView):
+    """
+    API endpoint to stream every payment as CSV or NDJSON.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        Stream payments, newest first.
+
+        Query params:
+            fmt: "csv" (default) or "ndjson"
+            from, to: Optional inclusive YYYY-MM-DD bounds on created_at
+
+        Returns:
+            StreamingHttpResponse: Export file, or 400 for bad parameters
+        """
+        export_format = request.query_params.get("fmt", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"fmt must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            filters = date_range_filter(request, "created_at")
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        payments = (
+            Payment.objects.filter(**filters)
+            .select_related('user', 'course')
+            .order_by('-created_at')
+        )
+        columns = [
+            ('id', lambda p: p.id),
+            ('user', lambda p: str(p.user)),
+            ('course', lambda p: str(p.course)),
+            ('method', lambda p: p.method),
+            ('amount', lambda p: p.amount),
+            ('status', lambda p: p.status),
+            ('created_at', lambda p: p.created_at.isoformat()),
+            ('updated_at', lambda p: p.updated_at.isoformat()),
+            ('transaction_id', lambda p: p.transaction_id),
+        ]
+        return export_response(payments, columns, export_format, "payments")
+
+
+class RevenueTimeSeriesView(APIView):
+    """
+    API endpoint for revenue time series over any date range.
+    Admins see every course; instructors only their own.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Bucketed revenue, enrollments and shares from the revenue facts.
+
+        Query params:
+            from, to: Inclusive YYYY-MM-DD range (default: this year to date)
+            bucket: "day", "week" or "month" (default)
+            dimension: Optional "course" or "instructor" split
+            course: Optional comma-separated course ids
+
+        Returns:
+            Response: ``{"bucket", "from", "to", "series"}``, 400 for bad
+            parameters or 404 for a non-admin without an instructor profile
+        """
+        instructor_id = None
+        if not request.user.is_staff:
+            try:
+                instructor_id = require_instructor(request).id
+            except Instructor.DoesNotExist:
+                return Response(
+                    {"error": "Instructor not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+        params = request.query_params
+        default_start, default_end = year_to_date()
+        try:
+            start = date.fromisoformat(params["from"]) if params.get("from") else default_start
+            end = date.fromisoformat(params["to"]) if params.get("to") else default_end
+            course_ids = [int(course_id) for course_id in params.get("course", "").split(",") if course_id]
+            bucket = params.get("bucket", "month")
+            data = revenue_series(
+                start,
+                end,
+                bucket=bucket,
+                dimension=params.get("dimension") or None,
+                course_ids=course_ids,
+                instructor_id=instructor_id,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"bucket": bucket, "from": start, "to": end, "series": data})
+
+
 class InstructorEnrollmentStats(APIView):
     """
     API endpoint for enrollment statistics by instructor.
@@ -333,10 +468,11 @@ class InstructorPayoutCreateView(APIView):
             payout = serializer.save()
             
             # Update monthly stats
+            start, end = month_bounds(payout.month)
             MonthlyCourseStats.objects.filter(
-                instructor=payout.instructor.id,
-                month__year=payout.month.year,
-                month__month=payout.month.month
+                instructor=payout.instructor_id,
+                month__gte=start,
+                month__lt=end
             ).update(
                 paid_to_instructor=True,
                 paid_on=payout.month
@@ -369,10 +505,12 @@ class InstructorPayoutStatusView(APIView):
         try:
             parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date()
             
+            start, end = month_bounds(parsed_date)
             payout = InstructorPayout.objects.get(
                 instructor__id=instructor_id,
-                month__year=parsed_date.year,
-                month__month=parsed_date.month
+                month__gte=start,
+                month__lt=end,
+                adjustment=0
             )
             
             serializer = InstructorPayoutSerializer(payout)
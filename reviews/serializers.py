@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Review
+from accounts.avatars import avatar_url
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -43,5 +44,5 @@ class ReviewSerializer(serializers.ModelSerializer):
             "id": obj.user.id,
             "username": obj.user.username,
             "email": obj.user.email,
-            "profile": obj.user.profile_picture.url if obj.user.profile_picture else None,
+            "profile": avatar_url(obj.user),
         }
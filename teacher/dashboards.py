@@ -0,0 +1,119 @@
+"""Instructor dashboard metrics, served through ``backend.snapshots``."""
+import calendar
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Avg, Case, Count, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.utils.timezone import localdate
+
+from backend.snapshots import snapshot
+from Courses.models import Enrollment
+from payment.models import InstructorPayout, MonthlyCourseStats
+from payment.serializers import MonthlyCourseStatsSerializer
+from payment.timeseries import revenue_series, year_to_date
+from reviews.models import Review
+from .models import Instructor
+
+
+@snapshot("instructor:payout-stats", ttl=60)
+def payout_stats(instructor_id):
+    stats = InstructorPayout.objects.filter(
+        instructor_id=instructor_id
+    ).aggregate(
+        total_revenue=Sum('total_amount'),
+        payout_count=Count('id'),
+        paid_payout_count=Sum(
+            Case(
+                When(is_paid=True, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        ),
+        unpaid_payout_count=Sum(
+            Case(
+                When(is_paid=False, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        )
+    )
+    return {
+        'total_revenue': stats['total_revenue'] or 0,
+        'payout_count': stats['payout_count'] or 0,
+        'paid_payout_count': stats['paid_payout_count'] or 0,
+        'unpaid_payout_count': stats['unpaid_payout_count'] or 0,
+    }
+
+
+@snapshot("instructor:avg-rating", ttl=300)
+def avg_course_rating(instructor_id):
+    return Review.objects.filter(
+        course__instructor__id=instructor_id
+    ).aggregate(avg_rating=Avg('rating'))
+
+
+@snapshot("instructor:sales-data", ttl=300)
+def sales_data(instructor_id):
+    """Purchases and earnings per month of the current year."""
+    start, end = year_to_date()
+    points = revenue_series(start, end, bucket="month", instructor_id=instructor_id)[0]["points"]
+    return [
+        {
+            'month': calendar.month_abbr[point["period"].month],
+            'year': point["period"].year,
+            'purchases': point["enrollments"],
+            'earnings': point["revenue"],
+        }
+        for point in points
+    ]
+
+
+@snapshot("instructor:dashboard", ttl=120)
+def instructor_dashboard(instructor_id):
+    """
+    Every instructor dashboard section in one payload. Rating and student
+    count share one Instructor query; the rest is one query per section.
+    """
+    today = localdate()
+    previous_month = today.replace(day=1) - relativedelta(months=1)
+
+    profile = Instructor.objects.filter(id=instructor_id).annotate(
+        avg_rating=Subquery(
+            Review.objects.filter(course__instructor=OuterRef('pk'))
+            .order_by().values('course__instructor')
+            .annotate(value=Avg('rating')).values('value')[:1],
+            output_field=FloatField(),
+        ),
+        student_count=Subquery(
+            Enrollment.objects.filter(course__instructor=OuterRef('pk'))
+            .order_by().values('course__instructor')
+            .annotate(value=Count('user', distinct=True)).values('value')[:1],
+            output_field=IntegerField(),
+        ),
+    ).values('avg_rating', 'student_count').get()
+
+    recent_stats = MonthlyCourseStats.objects.filter(
+        instructor_id=instructor_id
+    ).select_related('course').order_by('-month')[:5]
+
+    summary = MonthlyCourseStats.objects.filter(
+        instructor_id=instructor_id,
+        month=previous_month,
+    ).aggregate(
+        total_amount=Sum('total_amount'),
+        instructor_share=Sum('instructor_share'),
+        platform_share=Sum('platform_share'),
+    )
+
+    return {
+        'payout_stats': payout_stats.func(instructor_id),
+        'avg_rating': profile['avg_rating'],
+        'student_count': profile['student_count'] or 0,
+        'sales_data': sales_data.func(instructor_id),
+        'monthly_stats': [dict(row) for row in MonthlyCourseStatsSerializer(recent_stats, many=True).data],
+        'payout_summary': {
+            'month': previous_month.strftime('%B %Y'),
+            'total_amount': float(summary['total_amount'] or 0),
+            'instructor_share': float(summary['instructor_share'] or 0),
+            'platform_share': float(summary['platform_share'] or 0),
+        },
+    }
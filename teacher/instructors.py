@@ -0,0 +1,90 @@
+"""
+Cached Instructor profile lookup.
+
+``get_instructor_for_user`` checks a small per-process LRU first, then the
+shared cache, and only then the database. Users without a profile are
+cached too. Saving or deleting an Instructor clears the shared entry and
+this process's LRU entry; other processes drop theirs after
+``INSTRUCTOR_LOCAL_CACHE_TTL`` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Instructor
+
+
+LOCAL_CACHE_SIZE = 1024
+# Shared-cache marker for "this user has no instructor profile".
+NO_INSTRUCTOR = "none"
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _cache_key(user_id):
+    return f"instructor:user:{user_id}"
+
+
+def _local_get(user_id):
+    with _local_lock:
+        entry = _local.get(user_id)
+        if entry is None:
+            return False, None
+        instructor, expires = entry
+        if expires < time.monotonic():
+            del _local[user_id]
+            return False, None
+        _local.move_to_end(user_id)
+        return True, instructor
+
+
+def _local_set(user_id, instructor):
+    with _local_lock:
+        _local[user_id] = (instructor, time.monotonic() + settings.INSTRUCTOR_LOCAL_CACHE_TTL)
+        _local.move_to_end(user_id)
+        while len(_local) > LOCAL_CACHE_SIZE:
+            _local.popitem(last=False)
+
+
+def get_instructor_for_user(user):
+    """Return the user's Instructor profile, or None if they have none."""
+    if user is None or not user.is_authenticated:
+        return None
+
+    found, instructor = _local_get(user.pk)
+    if found:
+        return instructor
+
+    cached = cache.get(_cache_key(user.pk))
+    if cached is None:
+        instructor = Instructor.objects.filter(user_id=user.pk).first()
+        cache.set(_cache_key(user.pk), instructor or NO_INSTRUCTOR, settings.INSTRUCTOR_CACHE_TTL)
+    else:
+        instructor = None if cached == NO_INSTRUCTOR else cached
+
+    _local_set(user.pk, instructor)
+    return instructor
+
+
+def invalidate_instructor(user_id):
+    cache.delete(_cache_key(user_id))
+    with _local_lock:
+        _local.pop(user_id, None)
+
+
+def require_instructor(request):
+    """
+    Return ``request.instructor``, raising Instructor.DoesNotExist when the
+    user has no instructor profile.
+    """
+    instructor = getattr(request, "instructor", None)
+    if instructor is None:
+        # InstructorMiddleware is not installed for this request.
+        instructor = get_instructor_for_user(request.user)
+    if not instructor:
+        raise Instructor.DoesNotExist("User has no instructor profile")
+    return instructor
@@ -0,0 +1,19 @@
+from django.utils.functional import SimpleLazyObject
+
+from .instructors import get_instructor_for_user
+
+
+class InstructorMiddleware:
+    """
+    Adds a lazy ``request.instructor``: the user's Instructor profile, or
+    a falsy value when they have none.
+
+    It is resolved on first access, after DRF has authenticated the request,
+    so it sees the JWT user. The lookup runs at most once per request.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.instructor = SimpleLazyObject(lambda: get_instructor_for_user(request.user))
+        return self.get_response(request)
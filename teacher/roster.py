@@ -0,0 +1,69 @@
+"""
+Distinct student roster for an instructor.
+
+Each student appears once, found with an ``EXISTS`` over the instructor's
+enrollments, and carries per-student aggregates from correlated
+subqueries. Pages are keyset-paginated on the user id, so the first page
+costs the same for ten students or a hundred thousand.
+"""
+from django.db.models import Avg, Count, DecimalField, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from accounts.models import CustomUser
+from Courses.models import Enrollment, StudentCourseProgress
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def _aggregate(queryset, user_field, aggregate, output_field):
+    subquery = (
+        queryset.filter(**{user_field: OuterRef("pk")})
+        .order_by()
+        .values(user_field)
+        .annotate(value=aggregate)
+        .values("value")[:1]
+    )
+    return Coalesce(Subquery(subquery, output_field=output_field), Value(0), output_field=output_field)
+
+
+def roster_queryset(instructor_id, search=None):
+    """Students enrolled in any of the instructor's courses, by user id."""
+    enrollments = Enrollment.objects.filter(course__instructor_id=instructor_id)
+    progress = StudentCourseProgress.objects.filter(course__instructor_id=instructor_id)
+
+    students = CustomUser.objects.filter(Exists(enrollments.filter(user=OuterRef("pk"))))
+    if search:
+        students = students.filter(
+            Q(username__icontains=search)
+            | Q(email__icontains=search)
+            | Q(first_name__icontains=search)
+            | Q(last_name__icontains=search)
+        )
+    return students.annotate(
+        enrollment_count=_aggregate(enrollments, "user", Count("id"), IntegerField()),
+        avg_progress=_aggregate(progress, "student", Avg("progress"), DecimalField(max_digits=5, decimal_places=2)),
+        completed_courses=_aggregate(
+            progress.filter(is_completed=True), "student", Count("id"), IntegerField()
+        ),
+    ).order_by("id")
+
+
+def roster_page(instructor_id, search=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    Return up to ``limit`` students after the user id ``after``.
+
+    Returns:
+        tuple: (list of annotated users, id to pass as ``after`` for the
+        next page or None on the last page)
+    """
+    students = roster_queryset(instructor_id, search)
+    if after is not None:
+        students = students.filter(id__gt=after)
+
+    page = list(students[:limit + 1])
+    if len(page) > limit:
+        page = page[:limit]
+        return page, page[-1].id
+    return page, None
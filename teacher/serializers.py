@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from .models import Instructor
 from payment.models import InstructorPayout
 from Courses.models import Enrollment
+from accounts.avatars import avatar_url
 
 User = get_user_model()
 
@@ -59,25 +60,29 @@ class InstructorPayoutStatsSerializer(serializers.Serializer):
 class InstructorStudentListSerializer(serializers.ModelSerializer):
     """
     Serializer for listing students enrolled with an instructor.
-    Includes student name, email, and profile picture URL.
+    Includes student name, email, profile picture URL and the roster
+    aggregates annotated by ``teacher.roster``.
     """
+    student_id = serializers.IntegerField(source='id', read_only=True)
     student_name = serializers.CharField(source='username')
     students_email = serializers.EmailField(source='email')
     student_profile = serializers.SerializerMethodField()
+    enrollment_count = serializers.IntegerField(read_only=True)
+    avg_progress = serializers.DecimalField(max_digits=5, decimal_places=2, read_only=True)
+    completed_courses = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
-        fields = ['student_name', 'students_email', 'student_profile']
+        fields = [
+            'student_id', 'student_name', 'students_email', 'student_profile',
+            'enrollment_count', 'avg_progress', 'completed_courses',
+        ]
 
     def get_student_profile(self, obj):
         """
         Returns the absolute URL of the student's profile picture.
         """
-        if obj.profile_picture:
-            request = self.context.get('request')
-            profile_url = obj.profile_picture.url
-            return request.build_absolute_uri(profile_url) if request else profile_url
-        return None
+        return avatar_url(obj, request=self.context.get('request'))
 
 
 class InstructorAvgRatingSerializer(serializers.Serializer):
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .instructors import invalidate_instructor
+from .models import Instructor
+
+
+@receiver(post_save, sender=Instructor)
+@receiver(post_delete, sender=Instructor)
+def clear_cached_instructor(sender, instance, **kwargs):
+    invalidate_instructor(instance.user_id)
@@ -11,8 +11,10 @@ urlpatterns = [
     path('average-rating/',InstructorAvgCourseRatingView.as_view(),name='instructor-avg-rating'),
     path('students/list',InstructorStudentListView.as_view(),name='instructor-paid-students'),
 
+    path('dashboard/', InstructorDashboardView.as_view(), name='instructor-dashboard'),
     path('sales-data/', InstructorSalesDataView.as_view(), name='instructor-sales-data'),
     path('course-sales/', InstructorCourseSalesView.as_view(), name='instructor-course-sales'),
+    path('course-sales/export/', InstructorCourseSalesExportView.as_view(), name='instructor-course-sales-export'),
 
 
 ]
@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework import generics, permissions, status
 from rest_framework.permissions import IsAuthenticated
 from .serializers import *
-from payment.models import InstructorPayout
+from payment.models import InstructorPayout, DailyRevenueFact
 from rest_framework import serializers
 from rest_framework.generics import ListAPIView
 from rest_framework.exceptions import NotFound
@@ -14,6 +14,14 @@ from django.db.models import Avg
 from django.db.models.functions import TruncMonth
 from datetime import datetime
 import calendar
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .instructors import require_instructor
+from .roster import roster_page, roster_queryset, DEFAULT_LIMIT, MAX_LIMIT
+from .dashboards import payout_stats, avg_course_rating, sales_data, instructor_dashboard
+from backend.exports import EXPORT_FORMATS, date_range_filter, export_response
 
 
 class CreateInstructorView(APIView):
@@ -126,38 +134,15 @@ class InstructorPayoutStatsView(APIView):
             - 404 Not Found if instructor doesn't exist
         """
         try:
-            instructor = Instructor.objects.get(user=request.user)
+            instructor = require_instructor(request)
             
-            # Calculate stats
-            stats = InstructorPayout.objects.filter(
-                instructor=instructor
-            ).aggregate(
-                total_revenue=Sum('total_amount'),
-                payout_count=Count('id'),
-                paid_payout_count=Sum(
-                    Case(
-                        When(is_paid=True, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField()
-                    )
-                ),
-                unpaid_payout_count=Sum(
-                    Case(
-                        When(is_paid=False, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField()
-                    )
-                )
-            )
+            stats = payout_stats.get(instructor.id)
             
             # Prepare response data
             data = {
                 'instructor_id': instructor.id,
                 'instructor_name': instructor.user.username,
-                'total_revenue': stats['total_revenue'] or 0,
-                'payout_count': stats['payout_count'] or 0,
-                'paid_payout_count': stats['paid_payout_count'] or 0,
-                'unpaid_payout_count': stats['unpaid_payout_count'] or 0,
+                **stats,
             }
             
             serializer = InstructorPayoutStatsSerializer(data)
@@ -175,21 +160,52 @@ class InstructorStudentListView(APIView):
 
     def get(self, request):
         """
-        Get list of unique students enrolled in the instructor's courses.
-        
+        Get the unique students enrolled in the instructor's courses.
+
+        Without ``q``, ``after`` or ``limit`` the response is the plain list
+        of all students, as before pagination was added. With any of them
+        it is a page.
+
+        Query params:
+            q: Optional search on username, name or email
+            after: Cursor from the previous page's ``next``
+            limit: Page size (default 50, max 200)
+
         Returns:
-            - 200 OK with student list if instructor exists
+            - 200 OK with the student list, or ``{"results": [...], "next":
+              cursor or null}`` for a page
+            - 400 Bad Request for a malformed cursor or limit
             - 404 Not Found if instructor doesn't exist
         """
         try:
-            instructor = Instructor.objects.get(user=request.user)
-            enrolled_courses = Enrollment.objects.filter(
-                course__instructor__id=instructor.id
-            )
-            students = list({enrollment.user for enrollment in enrolled_courses})
+            instructor = require_instructor(request)
+            params = request.query_params
+            if not any(name in params for name in ('q', 'after', 'limit')):
+                serializer = InstructorStudentListSerializer(
+                    roster_queryset(instructor.id), many=True, context={'request': request}
+                )
+                return Response(serializer.data)
 
-            serializer = InstructorStudentListSerializer(students, many=True)
-            return Response(serializer.data)
+            try:
+                after = request.query_params.get('after')
+                after = int(after) if after else None
+                limit = min(max(int(request.query_params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+            except ValueError:
+                return Response(
+                    {'error': 'after and limit must be integers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            students, next_cursor = roster_page(
+                instructor.id,
+                search=request.query_params.get('q') or None,
+                after=after,
+                limit=limit,
+            )
+            serializer = InstructorStudentListSerializer(
+                students, many=True, context={'request': request}
+            )
+            return Response({'results': serializer.data, 'next': next_cursor})
 
         except Instructor.DoesNotExist:
             return Response(
@@ -210,11 +226,8 @@ class InstructorAvgCourseRatingView(APIView):
             - 404 Not Found if instructor doesn't exist
         """
         try:
-            instructor = Instructor.objects.get(user=request.user)
-            avg_rating = Review.objects.filter(
-                course__instructor__id=instructor.id
-            ).aggregate(avg_rating=Avg('rating'))
-            serializer = InstructorAvgRatingSerializer(avg_rating)
+            instructor = require_instructor(request)
+            serializer = InstructorAvgRatingSerializer(avg_course_rating.get(instructor.id))
             return Response(serializer.data)
 
         except Instructor.DoesNotExist:
@@ -236,44 +249,8 @@ class InstructorSalesDataView(APIView):
             - 404 Not Found if instructor doesn't exist
         """
         try:
-            current_year = datetime.now().year
-            current_month = datetime.now().month
-        
-            instructor = Instructor.objects.get(user=request.user)
-            instructor_courses = Course.objects.filter(instructor_id=instructor.id)
-        
-            enrollments = Enrollment.objects.filter(
-                course__in=instructor_courses,
-                enrolled_at__year=current_year,
-                payment=True
-            ).annotate(
-                month=TruncMonth('enrolled_at')
-            ).values('month').annotate(
-                purchases=Count('id'),
-                earnings=Sum('course__price') 
-            ).order_by('month')
-        
-            existing_months = {e['month'].month: e for e in enrollments}
-        
-            sales_data = []
-            for month_num in range(1, current_month + 1):
-                month_name = calendar.month_abbr[month_num]
-                if month_num in existing_months:
-                    sales_data.append({
-                        'month': month_name,
-                        'year': current_year,
-                        'purchases': existing_months[month_num]['purchases'],
-                        'earnings': existing_months[month_num]['earnings']
-                    })
-                else:
-                    sales_data.append({
-                        'month': month_name,
-                        'year': current_year,
-                        'purchases': 0,
-                        'earnings': 0
-                    })
-        
-            serializer = SalesDataSerializer(sales_data, many=True)
+            instructor = require_instructor(request)
+            serializer = SalesDataSerializer(sales_data.get(instructor.id), many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         except Instructor.DoesNotExist:
@@ -283,6 +260,45 @@ class InstructorSalesDataView(APIView):
             )
 
 
+class InstructorDashboardView(APIView):
+    """API view returning every instructor dashboard section in one response."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Return payout stats, rating, student count, sales data, recent monthly
+        stats and last month's payout summary from a cached snapshot.
+
+        Returns:
+            - 200 OK with the dashboard and an ETag header
+            - 304 Not Modified if If-None-Match matches the current ETag
+            - 404 Not Found if instructor doesn't exist
+        """
+        try:
+            instructor = require_instructor(request)
+        except Instructor.DoesNotExist:
+            return Response(
+                {'error': 'Instructor not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        data = {
+            'instructor_id': instructor.id,
+            'instructor_name': request.user.username,
+            **instructor_dashboard.get(instructor.id),
+        }
+        payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        etag = '"%s"' % hashlib.md5(payload.encode()).hexdigest()
+
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
 class InstructorCourseSalesView(ListAPIView):
     """API view to list all sales for instructor's courses."""
     serializer_class = InstructorSalesSerializer
@@ -299,9 +315,61 @@ class InstructorCourseSalesView(ListAPIView):
         if not user.is_authenticated:
             return Enrollment.objects.none()
         try:
-            instructor = Instructor.objects.get(user=user)
+            instructor = require_instructor(self.request)
             return Enrollment.objects.filter(
                 course__instructor=instructor
             ).order_by('-enrolled_at')
         except Instructor.DoesNotExist:
-            return Enrollment.objects.none()
\ No newline at end of file
+            return Enrollment.objects.none()
+
+
+class InstructorCourseSalesExportView(APIView):
+    """API view to stream all sales of the instructor's courses as CSV or NDJSON."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Stream the authenticated instructor's enrollments, newest first.
+
+        Query params:
+            fmt: "csv" (default) or "ndjson"
+            from, to: Optional inclusive YYYY-MM-DD bounds on enrolled_at
+
+        Returns:
+            - 200 OK with the export file
+            - 400 Bad Request for an unknown format or malformed date
+            - 404 Not Found if instructor doesn't exist
+        """
+        export_format = request.query_params.get('fmt', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"fmt must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            filters = date_range_filter(request, 'enrolled_at')
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            instructor = require_instructor(request)
+        except Instructor.DoesNotExist:
+            return Response(
+                {'error': 'Instructor not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        enrollments = Enrollment.objects.filter(
+            course__instructor=instructor,
+            **filters
+        ).select_related('user', 'course').order_by('-enrolled_at')
+        columns = [
+            ('id', lambda e: e.id),
+            ('username', lambda e: e.user.username),
+            ('course_title', lambda e: e.course.title),
+            ('enrolled_at', lambda e: e.enrolled_at.isoformat()),
+        ]
+        return export_response(enrollments, columns, export_format, 'course-sales')